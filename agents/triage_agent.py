@@ -1,233 +1,346 @@
-import os
-import json
-import requests
-import re
-import sqlite3
-import pickle
-import pandas as pd
-
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-
-# Load ML model for differential diagnosis
-try:
-    with open('final_disease_model.pkl', 'rb') as f:
-        disease_model = pickle.load(f)
-    with open('final_vectorizer.pkl', 'rb') as f:
-        vectorizer = pickle.load(f)
-    remedy_df = pd.read_csv('final_remedy_dataset.csv')
-    ML_MODEL_LOADED = True
-except:
-    ML_MODEL_LOADED = False
-    print("Warning: ML model not loaded for differential diagnosis")
-
-def get_db_connection():
-    conn = sqlite3.connect('health.db', check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def check_critical_vitals(patient_id: int) -> dict:
-    """Checks the patient's latest BP and SUGAR readings."""
-    conn = get_db_connection()
-    try:
-        latest_bp = conn.execute(
-            "SELECT value1, value2 FROM readings WHERE patient_id = ? AND reading_type = 'BP' ORDER BY timestamp DESC LIMIT 1",
-            (patient_id,)
-        ).fetchone()
-        latest_sugar = conn.execute(
-            "SELECT value1 FROM readings WHERE patient_id = ? AND reading_type = 'SUGAR' ORDER BY timestamp DESC LIMIT 1",
-            (patient_id,)
-        ).fetchone()
-        
-        bp_status = f"{latest_bp['value1']}/{latest_bp['value2']}" if latest_bp else "N/A"
-        sugar_status = f"{latest_sugar['value1']} mg/dL" if latest_sugar else "N/A"
-        
-        return {
-            "latest_bp": bp_status,
-            "latest_sugar": sugar_status,
-            "risk_check": "High" if (latest_bp and latest_bp['value1'] >= 160) or (latest_sugar and latest_sugar['value1'] >= 250) else "Normal"
-        }
-    finally:
-        conn.close()
-
-def get_differential_diagnosis(symptoms_text: str, top_n: int = 3) -> list:
-    """
-    Get differential diagnosis using local ML model
-    
-    Returns:
-        List of (disease, confidence) tuples
-    """
-    if not ML_MODEL_LOADED:
-        return []
-    
-    try:
-        # Vectorize symptoms
-        input_vector = vectorizer.transform([symptoms_text])
-        
-        # Get prediction probabilities
-        probabilities = disease_model.predict_proba(input_vector)[0]
-        classes = disease_model.classes_
-        
-        # Get top N predictions
-        top_indices = probabilities.argsort()[-top_n:][::-1]
-        
-        differential = []
-        for idx in top_indices:
-            differential.append({
-                "disease": classes[idx],
-                "confidence": float(probabilities[idx])
-            })
-        
-        return differential
-    except Exception as e:
-        print(f"Differential diagnosis error: {e}")
-        return []
-
-def detect_red_flags(symptoms: list, notes: str) -> list:
-    """Detect emergency keywords in symptoms and notes"""
-    red_flag_keywords = [
-        "chest pain", "difficulty breathing", "severe headache", "unconscious",
-        "bleeding", "stroke", "seizure", "severe abdominal pain", "vomiting blood"
-    ]
-    
-    text = " ".join(symptoms).lower() + " " + notes.lower()
-    detected_flags = []
-    
-    for keyword in red_flag_keywords:
-        if keyword in text:
-            detected_flags.append(keyword)
-    
-    return detected_flags
-
-def extract_json(text):
-    """Safely extract JSON object from LLM output"""
-    match = re.search(r"\{.*\}", text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group())
-        except Exception:
-            return None
-    return None
-
-def triage_agent(input_data: dict) -> dict:
-    """
-    Enhanced Triage Agent with differential diagnosis
-    
-    Args:
-        input_data: Patient data with symptoms, vitals, etc.
-        
-    Returns:
-        Comprehensive triage assessment
-    """
-    # Check vitals
-    vitals = check_critical_vitals(input_data["patient_id"])
-    
-    # Get differential diagnosis
-    symptoms_text = input_data.get("chief_complaint", "") + " " + " ".join(input_data.get("symptoms", []))
-    differential = get_differential_diagnosis(symptoms_text, top_n=3)
-    
-    # Detect red flags
-    red_flags = detect_red_flags(input_data.get("symptoms", []), input_data.get("notes", ""))
-    
-    # Build enhanced prompt
-    # Build enhanced prompt
-    differential_text = "\n".join([f"- {d['disease']} ({d['confidence']*100:.1f}%)" for d in differential]) if differential else "Not available"
-    
-    # Get home remedies if available (for Low/Moderate risk suggestions)
-    from agents.chat_agent import get_home_remedies
-    suggested_remedies = get_home_remedies(input_data.get("symptoms", []), "en")
-
-    prompt = f"""
-You are a clinical triage AI for rural India. Your decisions must be safe but BALANCED. Do not be overly alarmist for common, mild symptoms.
-
-Patient details:
-Age: {input_data.get("age")}
-Chief complaint: {input_data.get("chief_complaint")}
-Symptoms: {", ".join(input_data.get("symptoms", []))}
-Notes: {input_data.get("notes")}
-
-CRITICAL VITALS:
-- Latest BP: {vitals['latest_bp']}
-- Latest Sugar: {vitals['latest_sugar']}
-- Vitals Risk: {vitals['risk_check']}
-
-DIFFERENTIAL DIAGNOSIS (ML Model):
-{differential_text}
-
-RED FLAGS DETECTED: {", ".join(red_flags) if red_flags else "None"}
-
-AVAILABLE HOME REMEDIES (Reference):
-{suggested_remedies}
-
-TASK:
-1. Assess risk: Low / Moderate / High / Critical
-   - LOW: Mild symptoms (cold, cough, mild headache) with NORMAL vitals and NO red flags.
-   - MODERATE: Persistent symptoms, moderate pain, or slightly abnormal vitals.
-   - HIGH: Red flags present, or Vitals are Critical (BP >= 160/100 or Sugar >= 250).
-   - CRITICAL: Life-threatening (chest pain, unconsciousness, severe bleeding).
-
-2. Decide next action: Home Care / ASHA Follow-up / Doctor Consultation / Emergency
-3. Provide medical reasoning.
-4. List ASHA instructions.
-5. List Home Remedies (if Risk is LOW or MODERATE).
-
-RULES:
-- If RED FLAGS detected, risk must be at least High.
-- If Vitals Risk is High, final risk must be at least High.
-- For LOW risk, suggest "Home Care" or "ASHA Follow-up".
-- Respond ONLY in valid JSON.
-
-FORMAT:
-{{
-  "risk": "Low/Moderate/High/Critical",
-  "decision": "Next Action",
-  "reasoning": "Explanation",
-  "primary_diagnosis": "Likely condition",
-  "asha_instructions": ["Step 1", "Step 2"],
-  "home_remedies": ["Remedy 1", "Remedy 2"],
-  "red_flags_to_watch": ["Flag 1"]
-}}
-"""
-    
-    payload = {
-        "model": "google/gemini-2.0-flash-001",
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1
-    }
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    try:
-        response = requests.post(
-            OPENROUTER_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        content = response.json()["choices"][0]["message"]["content"]
-        parsed = extract_json(content)
-        
-        if parsed:
-            # Add differential diagnosis to output
-            parsed["differential_diagnosis"] = differential
-            parsed["detected_red_flags"] = red_flags
-            return parsed
-        else:
-            raise ValueError("JSON parse failed")
-    
-    except Exception as e:
-        print("Triage agent fallback:", e)
-        return {
-            "risk": "High" if red_flags or vitals['risk_check'] == "High" else "Moderate",
-            "decision": "Emergency" if red_flags else "ASHA Follow-up",
-            "reasoning": f"AI triage fallback. Red flags: {red_flags}. Vitals: {vitals['risk_check']}",
-            "primary_diagnosis": differential[0]["disease"] if differential else "Unknown",
-            "differential_diagnosis": differential,
-            "detected_red_flags": red_flags,
-            "asha_instructions": ["Monitor patient closely", "Check vitals daily", "Report any worsening"],
-            "red_flags_to_watch": ["Severe symptoms", "High fever", "Difficulty breathing"]
-        }
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import NamedTuple, Optional
+
+from db import get_db_connection
+from services.diagnosis_engine import ForestEngine, LinearEngine
+from services.llm_cache import age_band, describe_bp, describe_sugar, triage_cache_key
+from services.llm_client import llm_client
+from services.triage_outcome import HIGH_RISK_LEVELS, normalize_risk
+
+# Time the deterministic parts (vitals, ML differential, remedies) get before the provisional
+# assessment is made with whatever has finished
+TRIAGE_BUDGET_SECONDS = float(os.getenv("TRIAGE_BUDGET_SECONDS", "3"))
+TRIAGE_PARALLELISM = int(os.getenv("TRIAGE_PARALLELISM", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=TRIAGE_PARALLELISM, thread_name_prefix="triage")
+
+# Used for a part that did not finish within the budget
+UNKNOWN_VITALS = {"latest_bp": "N/A", "latest_sugar": "N/A", "risk_check": "Unknown"}
+
+# ML model for differential diagnosis (train_model_remedies.py output), loaded on first use.
+# TRIAGE_DIAGNOSIS_ENGINE picks the backend: "forest" (pickled RandomForest + vectorizer) or
+# "linear" (exported arrays, see services/diagnosis_engine.py)
+DIAGNOSIS_ENGINE = os.getenv("TRIAGE_DIAGNOSIS_ENGINE", "forest")
+DISEASE_MODEL_PATH = os.getenv("TRIAGE_MODEL_PATH", "final_disease_model.pkl")
+VECTORIZER_PATH = os.getenv("TRIAGE_VECTORIZER_PATH", "final_vectorizer.pkl")
+LINEAR_MODEL_PATH = os.getenv("TRIAGE_LINEAR_MODEL_PATH", "final_diagnosis_linear.npz")
+
+
+class DiagnosisModel(NamedTuple):
+    engine: object         # ForestEngine or LinearEngine
+
+
+_model_lock = threading.Lock()
+_model: Optional[DiagnosisModel] = None
+# not_loaded -> loading -> ready | unavailable (missing files are not retried on every call)
+_model_status = {"state": "not_loaded", "engine": DIAGNOSIS_ENGINE, "load_ms": None, "loaded_at": None,
+                 "error": None, "identity": None}
+
+
+def _engine_identity(paths: list) -> str:
+    """Engine kind plus name, mtime and size of each model file ("forest:a.pkl@<mtime_ns>/<size>,...")"""
+    files = []
+    for path in paths:
+        stat = os.stat(path)
+        files.append(f"{os.path.basename(path)}@{stat.st_mtime_ns}/{stat.st_size}")
+    return f"{DIAGNOSIS_ENGINE}:{','.join(files)}"
+
+
+def _load_model():
+    global _model
+    _model_status.update(state="loading", engine=DIAGNOSIS_ENGINE)
+    start = time.perf_counter()
+    try:
+        if DIAGNOSIS_ENGINE == "linear":
+            paths = [LINEAR_MODEL_PATH]
+            engine = LinearEngine.load(LINEAR_MODEL_PATH)
+        elif DIAGNOSIS_ENGINE == "forest":
+            paths = [DISEASE_MODEL_PATH, VECTORIZER_PATH]
+            engine = ForestEngine.load(DISEASE_MODEL_PATH, VECTORIZER_PATH)
+        else:
+            raise ValueError(f"Unknown TRIAGE_DIAGNOSIS_ENGINE {DIAGNOSIS_ENGINE!r} (expected forest or linear)")
+        _model = DiagnosisModel(engine)
+        _model_status.update(state="ready", error=None, identity=_engine_identity(paths))
+    except Exception as e:
+        _model_status.update(state="unavailable", error=str(e), identity=None)
+        print(f"Warning: ML model not loaded for differential diagnosis: {e}")
+    _model_status["load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    _model_status["loaded_at"] = time.time()
+
+
+def get_diagnosis_model() -> Optional[DiagnosisModel]:
+    """
+    The diagnosis engine, loaded on first use
+
+    Thread-safe: concurrent first callers wait for a single load.
+
+    Returns:
+        DiagnosisModel, or None if the model files could not be loaded
+    """
+    if _model_status["state"] in ("ready", "unavailable"):
+        return _model
+    with _model_lock:
+        if _model_status["state"] == "not_loaded":
+            _load_model()
+    return _model
+
+
+def warm_up() -> dict:
+    """Load the model now (process start of production workers) instead of on the first triage"""
+    get_diagnosis_model()
+    return model_status()
+
+
+def model_ready() -> bool:
+    """True once the model is loaded and differential diagnosis is available"""
+    return _model_status["state"] == "ready"
+
+
+def model_status() -> dict:
+    return {**_model_status, "ready": model_ready()}
+
+
+def check_critical_vitals(patient_id: int) -> dict:
+    """Checks the patient's latest BP and SUGAR readings."""
+    conn = get_db_connection()
+    try:
+        latest_bp = conn.execute(
+            "SELECT value1, value2 FROM readings WHERE patient_id = ? AND reading_type = 'BP' ORDER BY timestamp DESC LIMIT 1",
+            (patient_id,)
+        ).fetchone()
+        latest_sugar = conn.execute(
+            "SELECT value1 FROM readings WHERE patient_id = ? AND reading_type = 'SUGAR' ORDER BY timestamp DESC LIMIT 1",
+            (patient_id,)
+        ).fetchone()
+        
+        bp_status = f"{latest_bp['value1']}/{latest_bp['value2']}" if latest_bp else "N/A"
+        sugar_status = f"{latest_sugar['value1']} mg/dL" if latest_sugar else "N/A"
+        
+        return {
+            "latest_bp": bp_status,
+            "latest_sugar": sugar_status,
+            "risk_check": "High" if (latest_bp and latest_bp['value1'] >= 160) or (latest_sugar and latest_sugar['value1'] >= 250) else "Normal"
+        }
+    finally:
+        conn.close()
+
+def get_differential_diagnosis(symptoms_text: str, top_n: int = 3) -> list:
+    """
+    Get differential diagnosis using local ML model
+    
+    Returns:
+        List of {"disease", "confidence"} dicts, most likely first
+    """
+    loaded = get_diagnosis_model()
+    if loaded is None:
+        return []
+    
+    try:
+        return loaded.engine.top_n(symptoms_text, top_n)
+    except Exception as e:
+        print(f"Differential diagnosis error: {e}")
+        return []
+
+def detect_red_flags(symptoms: list, notes: str) -> list:
+    """Detect emergency keywords in symptoms and notes"""
+    red_flag_keywords = [
+        "chest pain", "difficulty breathing", "severe headache", "unconscious",
+        "bleeding", "stroke", "seizure", "severe abdominal pain", "vomiting blood"
+    ]
+    
+    text = " ".join(symptoms).lower() + " " + notes.lower()
+    detected_flags = []
+    
+    for keyword in red_flag_keywords:
+        if keyword in text:
+            detected_flags.append(keyword)
+    
+    return detected_flags
+
+def extract_json(text):
+    """Safely extract JSON object from LLM output"""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group())
+        except Exception:
+            return None
+    return None
+
+def gather_triage_context(input_data: dict, budget_seconds: float = TRIAGE_BUDGET_SECONDS) -> dict:
+    """
+    Run the deterministic triage steps concurrently within a time budget
+
+    Red flags are a keyword scan and are always available. Vitals, the ML differential and
+    home remedies run on the triage pool; any that miss the budget are left empty and named
+    in 'timed_out'.
+
+    Args:
+        input_data: Patient data with symptoms, vitals, etc.
+        budget_seconds: Time allowed for the concurrent steps
+
+    Returns:
+        Dict with vitals, differential, red_flags, remedies, timed_out, elapsed_ms
+        (JSON-serializable, so it can be kept for the LLM upgrade)
+    """
+    from agents.chat_agent import get_home_remedies
+
+    start = time.monotonic()
+    symptoms = input_data.get("symptoms", [])
+    symptoms_text = (input_data.get("chief_complaint") or "") + " " + " ".join(symptoms)
+    futures = {
+        "vitals": _executor.submit(check_critical_vitals, input_data["patient_id"]),
+        "differential": _executor.submit(get_differential_diagnosis, symptoms_text, 3),
+        "remedies": _executor.submit(get_home_remedies, symptoms, "en"),
+    }
+    defaults = {"vitals": UNKNOWN_VITALS, "differential": [], "remedies": ""}
+
+    context = {"red_flags": detect_red_flags(symptoms, input_data.get("notes") or ""), "timed_out": []}
+    deadline = start + budget_seconds
+    for name, future in futures.items():
+        try:
+            context[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeout:
+            context[name] = defaults[name]
+            context["timed_out"].append(name)
+        except Exception as e:
+            print(f"Triage step {name} failed: {e}")
+            context[name] = defaults[name]
+    context["elapsed_ms"] = round((time.monotonic() - start) * 1000, 1)
+    return context
+
+def rule_based_assessment(context: dict) -> dict:
+    """Risk and next action from red flags and vitals alone (provisional result and LLM fallback)"""
+    red_flags = context["red_flags"]
+    vitals = context["vitals"]
+    differential = context["differential"]
+    return {
+        "risk": "High" if red_flags or vitals['risk_check'] == "High" else "Moderate",
+        "decision": "Emergency" if red_flags else "ASHA Follow-up",
+        "reasoning": f"Rule-based triage. Red flags: {red_flags}. Vitals: {vitals['risk_check']}",
+        "primary_diagnosis": differential[0]["disease"] if differential else "Unknown",
+        "differential_diagnosis": differential,
+        "detected_red_flags": red_flags,
+        "asha_instructions": ["Monitor patient closely", "Check vitals daily", "Report any worsening"],
+        "red_flags_to_watch": ["Severe symptoms", "High fever", "Difficulty breathing"]
+    }
+
+def apply_risk_floor(assessment: dict, context: dict) -> dict:
+    """Red flags or high vitals keep the risk at High or above, whatever the LLM answered"""
+    if context["red_flags"] or context["vitals"]['risk_check'] == "High":
+        risk = normalize_risk(assessment.get("risk"))
+        if risk not in HIGH_RISK_LEVELS:
+            assessment["risk"] = "High"
+    return assessment
+
+def llm_assessment(input_data: dict, context: dict) -> Optional[dict]:
+    """
+    Full LLM triage assessment built on the deterministic context
+
+    Args:
+        input_data: Patient data with symptoms, vitals, etc.
+        context: gather_triage_context() output
+
+    Returns:
+        Assessment dict, or None if the LLM is unavailable or its answer unusable
+    """
+    vitals = context["vitals"]
+    differential = context["differential"]
+    red_flags = context["red_flags"]
+    differential_text = "\n".join([f"- {d['disease']} ({d['confidence']*100:.1f}%)" for d in differential]) if differential else "Not available"
+    suggested_remedies = context["remedies"]
+
+    prompt = f"""
+You are a clinical triage AI for rural India. Your decisions must be safe but BALANCED. Do not be overly alarmist for common, mild symptoms.
+
+Patient details:
+Age group: {age_band(input_data.get("age"))} years
+Chief complaint: {input_data.get("chief_complaint")}
+Symptoms: {", ".join(input_data.get("symptoms", []))}
+Notes: {input_data.get("notes")}
+
+CRITICAL VITALS:
+- Latest BP: {describe_bp(vitals['latest_bp'])}
+- Latest Sugar: {describe_sugar(vitals['latest_sugar'])}
+- Vitals Risk: {vitals['risk_check']}
+
+DIFFERENTIAL DIAGNOSIS (ML Model):
+{differential_text}
+
+RED FLAGS DETECTED: {", ".join(red_flags) if red_flags else "None"}
+
+AVAILABLE HOME REMEDIES (Reference):
+{suggested_remedies}
+
+TASK:
+1. Assess risk: Low / Moderate / High / Critical
+   - LOW: Mild symptoms (cold, cough, mild headache) with NORMAL vitals and NO red flags.
+   - MODERATE: Persistent symptoms, moderate pain, or slightly abnormal vitals.
+   - HIGH: Red flags present, or Vitals are Critical (BP >= 160/100 or Sugar >= 250).
+   - CRITICAL: Life-threatening (chest pain, unconsciousness, severe bleeding).
+
+2. Decide next action: Home Care / ASHA Follow-up / Doctor Consultation / Emergency
+3. Provide medical reasoning.
+4. List ASHA instructions.
+5. List Home Remedies (if Risk is LOW or MODERATE).
+
+RULES:
+- If RED FLAGS detected, risk must be at least High.
+- If Vitals Risk is High, final risk must be at least High.
+- For LOW risk, suggest "Home Care" or "ASHA Follow-up".
+- Respond ONLY in valid JSON.
+
+FORMAT:
+{{
+  "risk": "Low/Moderate/High/Critical",
+  "decision": "Next Action",
+  "reasoning": "Explanation",
+  "primary_diagnosis": "Likely condition",
+  "asha_instructions": ["Step 1", "Step 2"],
+  "home_remedies": ["Remedy 1", "Remedy 2"],
+  "red_flags_to_watch": ["Flag 1"]
+}}
+"""
+    
+    try:
+        content = llm_client.chat(
+            "triage",
+            [{"role": "user", "content": prompt}],
+            model="google/gemini-2.0-flash-001",
+            temperature=0.1,
+            cache_key=triage_cache_key(input_data.get("age"), input_data.get("chief_complaint"),
+                                       input_data.get("symptoms", []), vitals, red_flags,
+                                       notes=input_data.get("notes"), differential=differential,
+                                       remedies=suggested_remedies, engine=_model_status.get("identity"))
+        )
+        parsed = extract_json(content)
+        
+        if parsed:
+            # Add differential diagnosis to output
+            parsed["differential_diagnosis"] = differential
+            parsed["detected_red_flags"] = red_flags
+            return apply_risk_floor(parsed, context)
+        else:
+            raise ValueError("JSON parse failed")
+    
+    except Exception as e:
+        print("Triage agent fallback:", e)
+        return None
+
+def triage_agent(input_data: dict) -> dict:
+    """
+    Enhanced Triage Agent with differential diagnosis
+    
+    Args:
+        input_data: Patient data with symptoms, vitals, etc.
+        
+    Returns:
+        Comprehensive triage assessment
+    """
+    context = gather_triage_context(input_data)
+    return llm_assessment(input_data, context) or rule_based_assessment(context)
@@ -0,0 +1,125 @@
+"""
+Differential Diagnosis Engine Benchmark
+Compares TRIAGE_DIAGNOSIS_ENGINE=forest (pickled RandomForest) with =linear (exported arrays)
+
+Both engines are trained on the same TF-IDF features as train_model_remedies.py, on synthetic
+symptom text (bench_model_load.synthetic_records, 100 diseases). The held-out set uses short
+complaints (3 disease terms + 3 unrelated terms), closer to what a worker types than the
+training records. Each engine is measured in a fresh interpreter through
+get_differential_diagnosis(), one string per call as in triage:
+
+- top-1 / top-3 accuracy on the held-out set
+- per-call latency p50 / p95
+- load time (warm_up) and RSS growth from import to after scoring the whole set
+- artifact size on disk
+
+Usage:
+    python bench_diagnosis_engine.py [--train 4000] [--test 1000]
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from bench_model_load import ARTIFACTS, REPO_DIR, synthetic_records
+
+LINEAR_ARTIFACT = "final_diagnosis_linear.npz"
+
+PROBE = r"""
+import json, resource, statistics, sys, time
+import agents.orchestrator
+from agents import triage_agent
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1e6
+
+with open(sys.argv[1]) as f:
+    texts, labels = json.load(f)
+result = {"rss_import_mb": rss_mb()}
+start = time.perf_counter()
+triage_agent.warm_up()
+result["load_ms"] = (time.perf_counter() - start) * 1000
+latencies, top1, top3 = [], 0, 0
+for text, label in zip(texts, labels):
+    start = time.perf_counter()
+    differential = triage_agent.get_differential_diagnosis(text, top_n=3)
+    latencies.append((time.perf_counter() - start) * 1000)
+    diseases = [d["disease"] for d in differential]
+    top1 += diseases[:1] == [label]
+    top3 += label in diseases
+latencies.sort()
+result.update(
+    engine=triage_agent.model_status()["engine"],
+    top1=top1 / len(labels), top3=top3 / len(labels),
+    p50_ms=latencies[len(latencies) // 2], p95_ms=latencies[int(len(latencies) * 0.95)],
+    rss_growth_mb=rss_mb() - result["rss_import_mb"],
+)
+print(json.dumps(result))
+"""
+
+
+def build_artifacts(directory, train_samples):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from services.diagnosis_engine import export_linear_model
+
+    texts, labels = synthetic_records(train_samples)
+    vectorizer = TfidfVectorizer(max_features=1500, stop_words="english")
+    X = vectorizer.fit_transform(texts)
+    forest = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, labels)
+    linear = LogisticRegression(C=10, max_iter=1000).fit(X, labels)
+
+    with open(os.path.join(directory, ARTIFACTS[0]), "wb") as f:
+        pickle.dump(forest, f)
+    with open(os.path.join(directory, ARTIFACTS[1]), "wb") as f:
+        pickle.dump(vectorizer, f)
+    export_linear_model(os.path.join(directory, LINEAR_ARTIFACT), vectorizer, linear)
+
+
+def probe(directory, engine, test_file):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, TRIAGE_DIAGNOSIS_ENGINE=engine,
+               HEALTH_DB_PATH=os.path.join(REPO_DIR, "health.db"),
+               TRIAGE_LINEAR_MODEL_PATH=os.path.join(directory, LINEAR_ARTIFACT),
+               **{key: os.path.join(directory, name) for key, name in zip(
+                   ("TRIAGE_MODEL_PATH", "TRIAGE_VECTORIZER_PATH"), ARTIFACTS)})
+    out = subprocess.run([sys.executable, "-c", PROBE, test_file], cwd=directory, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train", type=int, default=4000)
+    parser.add_argument("--test", type=int, default=1000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="diagnosis_engine_")
+    try:
+        print(f"Training both engines on {args.train} synthetic records...")
+        build_artifacts(directory, args.train)
+        test_file = os.path.join(directory, "held_out.json")
+        with open(test_file, "w") as f:
+            json.dump(synthetic_records(args.test, profile_terms=3, noise_terms=3, seed=7), f)
+
+        sizes = {
+            "forest": sum(os.path.getsize(os.path.join(directory, n)) for n in ARTIFACTS) / 1e6,
+            "linear": os.path.getsize(os.path.join(directory, LINEAR_ARTIFACT)) / 1e6,
+        }
+        print(f"\n{'engine':<8} {'size MB':>8} {'load ms':>8} {'RSS +MB':>8} {'p50 ms':>7} {'p95 ms':>7} "
+              f"{'top-1':>6} {'top-3':>6}")
+        for engine in ("forest", "linear"):
+            r = probe(directory, engine, test_file)
+            print(f"{engine:<8} {sizes[engine]:>8.2f} {r['load_ms']:>8.1f} {r['rss_growth_mb']:>8.1f} "
+                  f"{r['p50_ms']:>7.3f} {r['p95_ms']:>7.3f} {r['top1']:>6.3f} {r['top3']:>6.3f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
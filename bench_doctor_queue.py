@@ -0,0 +1,124 @@
+"""
+Doctor High-Risk Queue Benchmark
+Compares the doctor dashboard's high-risk query before and after migration 013
+
+The legacy query joined every open alert to every report of the patient and let
+DISTINCT / UNION collapse the result; the rewritten query (services/doctor_queue.py)
+reads both filters from indexes and the latest triage from latest_triage.
+
+Usage:
+    python bench_doctor_queue.py [--patients 3000] [--reports 12] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from migrate import run_migrations
+from services.doctor_queue import HIGH_RISK_PATIENTS_SQL
+from services.triage_outcome import HIGH_RISK_SQL
+
+# The dashboard query before migration 013: alerts joined to every report of the patient
+LEGACY_HIGH_RISK_SQL = f"""
+    SELECT DISTINCT p.*,
+           COALESCE(tr.ai_prediction, '') as latest_triage,
+           tr.chief_complaint as latest_complaint,
+           tr.timestamp as triage_time,
+           'ALERT' as source
+    FROM patients p
+    JOIN patient_alerts a ON p.id = a.patient_id
+    LEFT JOIN triage_reports tr ON p.id = tr.patient_id
+    WHERE a.severity = 'HIGH' AND a.is_acknowledged = 0
+
+    UNION
+
+    SELECT DISTINCT p.*,
+           tr.ai_prediction as latest_triage,
+           tr.chief_complaint as latest_complaint,
+           tr.timestamp as triage_time,
+           'TRIAGE' as source
+    FROM patients p
+    JOIN triage_reports tr ON p.id = tr.patient_id
+    WHERE tr.risk IN {HIGH_RISK_SQL}
+    AND tr.timestamp >= datetime('now', '-7 days')
+    AND tr.doctor_reviewed = 0
+    ORDER BY triage_time DESC
+"""
+
+
+def ts(days_ago: float) -> str:
+    return (datetime.utcnow() - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def seed(conn, patients=3000, reports=12, alerted=400, recent=300):
+    """
+    Patients with `reports` old Low reports each; `alerted` of them get two open HIGH
+    alerts and `recent` an unreviewed High/Critical report from the last 6 days
+    """
+    rng = random.Random(7)
+    conn.execute("DELETE FROM patient_alerts")  # demo alert from migration 002
+    for pid in range(1, patients + 1):
+        conn.execute("INSERT INTO patients (id, name, phone_number, password_hash, age, village) "
+                     "VALUES (?, ?, ?, 'x', 40, 'Songir')", (pid, f"P{pid}", f"ph{pid}"))
+        conn.executemany(
+            "INSERT INTO triage_reports (patient_id, chief_complaint, risk, doctor_reviewed, ai_prediction, timestamp) "
+            "VALUES (?, 'fever', 'Low', 0, ?, ?)",
+            [(pid, "<p>" + "x" * 500 + "</p>", ts(30 + day * 5 + rng.random())) for day in range(reports)]
+        )
+    for pid in rng.sample(range(1, patients + 1), alerted):
+        for _ in range(2):
+            conn.execute("INSERT INTO patient_alerts (patient_id, alert_type, severity, message) "
+                         "VALUES (?, 'BP', 'HIGH', 'bp high')", (pid,))
+    for pid in rng.sample(range(1, patients + 1), recent):
+        conn.execute(
+            "INSERT INTO triage_reports (patient_id, chief_complaint, risk, doctor_reviewed, ai_prediction, timestamp) "
+            "VALUES (?, 'chest pain', ?, 0, '<p>x</p>', ?)",
+            (pid, rng.choice(["High", "Critical"]), ts(rng.random() * 6))
+        )
+    conn.commit()
+
+
+def timed(conn, sql, repeat=5):
+    """Rows of the query and its best wall time over `repeat` runs (ms)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return rows, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=3000)
+    parser.add_argument("--reports", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="doctor_queue_bench_")
+    try:
+        conn = sqlite3.connect(os.path.join(workdir, "health.db"))
+        conn.row_factory = sqlite3.Row
+        run_migrations(conn, verbose=False)
+        seed(conn, args.patients, args.reports)
+
+        legacy_rows, legacy_ms = timed(conn, LEGACY_HIGH_RISK_SQL, args.repeat)
+        rows, new_ms = timed(conn, HIGH_RISK_PATIENTS_SQL, args.repeat)
+        conn.close()
+
+        print(f"{args.patients} patients x {args.reports} reports\n")
+        print(f"{'query':<12}{'rows':>8}{'patients':>10}{'best ms':>10}")
+        print(f"{'legacy':<12}{len(legacy_rows):>8}{len({r['id'] for r in legacy_rows}):>10}{legacy_ms:>10.1f}")
+        print(f"{'rewritten':<12}{len(rows):>8}{len({r['id'] for r in rows}):>10}{new_ms:>10.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Triage Model Cold-Start Benchmark
+Measures what importing the triage agent costs, and when the disease model is paid for
+
+Each measurement runs in a fresh interpreter:
+- import: `import agents.orchestrator` (what app.py, scheduler.py and every test pay)
+- warm-up: triage_agent.warm_up() right after the import
+- first / second call: get_differential_diagnosis() without a warm-up
+
+Uses final_disease_model.pkl / final_vectorizer.pkl from the working directory when present; otherwise trains stand-ins of the same shape as
+train_model_remedies.py (TF-IDF with 1500 features, 100-tree RandomForest, 100 diseases)
+on synthetic symptom text.
+
+Usage:
+    python bench_model_load.py [--runs 3] [--samples 4000]
+"""
+import argparse
+import os
+import pickle
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS = ("final_disease_model.pkl", "final_vectorizer.pkl")
+
+PROBE = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+import agents.orchestrator
+from agents import triage_agent
+result = {"import_ms": (time.perf_counter() - start) * 1000,
+          "import_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+if sys.argv[1] == "warm":
+    start = time.perf_counter()
+    triage_agent.warm_up()
+    result["warm_up_ms"] = (time.perf_counter() - start) * 1000
+for name in ("first_call_ms", "second_call_ms"):
+    start = time.perf_counter()
+    triage_agent.get_differential_diagnosis("fever cough headache body pain", top_n=3)
+    result[name] = (time.perf_counter() - start) * 1000
+result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+"""
+
+
+def synthetic_records(samples, profile_terms=8, noise_terms=4, seed=42):
+    """
+    Symptom texts and labels: 100 diseases, each a profile of 25 of 2500 terms
+
+    Each record takes profile_terms from its disease's profile plus noise_terms at random.
+    The profiles are fixed; the seed only picks the records, so a different seed gives a held-out set.
+    """
+    profile_rng, rng = random.Random(0), random.Random(seed)
+    vocabulary = [f"symptom{i}" for i in range(2500)]
+    diseases = [f"Disease {i}" for i in range(100)]
+    profiles = {d: profile_rng.sample(vocabulary, 25) for d in diseases}
+    texts, labels = [], []
+    for _ in range(samples):
+        disease = rng.choice(diseases)
+        words = rng.sample(profiles[disease], profile_terms) + rng.sample(vocabulary, noise_terms)
+        texts.append(" ".join(words))
+        labels.append(disease)
+    return texts, labels
+
+
+def build_standin_artifacts(directory, samples):
+    """Train synthetic model files shaped like train_model_remedies.py output"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    texts, labels = synthetic_records(samples)
+    vectorizer = TfidfVectorizer(max_features=1500, stop_words="english")
+    X = vectorizer.fit_transform(texts)
+    model = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, labels)
+    with open(os.path.join(directory, ARTIFACTS[0]), "wb") as f:
+        pickle.dump(model, f)
+    with open(os.path.join(directory, ARTIFACTS[1]), "wb") as f:
+        pickle.dump(vectorizer, f)
+
+
+def probe(directory, mode):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR,
+               HEALTH_DB_PATH=os.path.join(REPO_DIR, "health.db"),
+               **{key: os.path.join(directory, name) for key, name in zip(
+                   ("TRIAGE_MODEL_PATH", "TRIAGE_VECTORIZER_PATH"), ARTIFACTS)})
+    out = subprocess.run([sys.executable, "-c", PROBE, mode], cwd=directory, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return __import__("json").loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--samples", type=int, default=4000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="triage_model_")
+    try:
+        if all(os.path.exists(name) for name in ARTIFACTS):
+            for name in ARTIFACTS:
+                shutil.copy(name, directory)
+            print("Using the trained model files from the working directory")
+        else:
+            print(f"Model files not found; training stand-ins on {args.samples} synthetic samples...")
+            build_standin_artifacts(directory, args.samples)
+        size_mb = sum(os.path.getsize(os.path.join(directory, n)) for n in ARTIFACTS) / 1e6
+        print(f"Artifacts: {size_mb:.1f} MB\n")
+
+        for mode, label in (("cold", "lazy (no warm-up)"), ("warm", "warm-up after import")):
+            runs = [probe(directory, mode) for _ in range(args.runs)]
+            print(f"{label}:")
+            for key in runs[0]:
+                print(f"  {key:<16} {statistics.median(r[key] for r in runs):>9.1f}")
+            print()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Triage Report Storage Benchmark
+Compares pre-rendered HTML in ai_prediction with the compact JSON assessment column
+
+Seeds a database with legacy HTML reports, copies it, converts the copy with the
+migrations (then VACUUMs it) and reports file size and read latency for both.
+
+Usage:
+    python bench_triage_storage.py [--reports 20000] [--patients 2000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from migrate import run_migrations
+from services.triage_outcome import decode_assessment
+
+try:
+    from jinja2 import Environment, FileSystemLoader
+    JINJA_AVAILABLE = True
+except ImportError:
+    JINJA_AVAILABLE = False
+
+DIAGNOSES = ["Viral Fever", "Hypertension", "Gastroenteritis", "Pneumonia", "Dengue Suspected", "Migraine"]
+RED_FLAGS = ["chest pain", "breathlessness", "blurred vision", "persistent vomiting", "confusion"]
+REMEDIES = ["Drink ORS every 2 hours", "Rest and light diet", "Steam inhalation twice daily", "Cold compress"]
+INSTRUCTIONS = ["Check temperature twice daily", "Recheck BP in 3 days", "Ensure medication adherence",
+                "Refer to PHC if symptoms worsen", "Counsel family on danger signs"]
+
+
+def legacy_html(risk, decision, diagnosis, red_flags, reasoning, instructions, remedies):
+    """The card markup add_triage_report used to persist"""
+    remedies_html = ""
+    if remedies and risk in ["Low", "Moderate"]:
+        remedies_html = f"""
+                <div class="mt-3 p-3 bg-light rounded border-start border-4 border-success">
+                    <h6 class="text-success fw-bold"><i class="fa-solid fa-house-medical"></i> Home Remedies</h6>
+                    <ul class="mb-0 ps-3">
+                        {''.join([f'<li>{r}</li>' for r in remedies])}
+                    </ul>
+                </div>
+                """
+    instructions_html = "<ul>" + "".join([f"<li>{i}</li>" for i in instructions]) + "</ul>"
+    badge = 'bg-danger' if risk in ['High', 'Critical'] else 'bg-warning' if risk == 'Moderate' else 'bg-success'
+    return f"""
+            <div class="triage-report-content">
+                <div class="row g-3">
+                    <div class="col-md-6">
+                        <div class="mb-2">
+                            <h6 class="fw-bold text-muted text-uppercase small">Diagnosis</h6>
+                            <p class="fw-bold mb-0 text-primary">{diagnosis}</p>
+                        </div>
+                        <div class="mb-2">
+                             <h6 class="fw-bold text-muted text-uppercase small">Decision</h6>
+                             <p class="mb-0">{decision}</p>
+                        </div>
+                    </div>
+                    <div class="col-md-6">
+                        <div class="mb-2">
+                            <h6 class="fw-bold text-muted text-uppercase small">Risk Level</h6>
+                            <span class="badge {badge}">{risk}</span>
+                        </div>
+                        <div class="mb-2">
+                            <h6 class="fw-bold text-muted text-uppercase small">Red Flags</h6>
+                            <p class="mb-0 {'text-danger fw-bold' if red_flags else 'text-muted'}">{red_flags if red_flags else 'None Detected'}</p>
+                        </div>
+                    </div>
+                </div>
+
+                <div class="mt-3">
+                    <h6 class="fw-bold text-muted text-uppercase small">Reasoning</h6>
+                    <p class="text-muted small">{reasoning}</p>
+                </div>
+
+                <div class="mt-3">
+                    <h6 class="fw-bold text-muted text-uppercase small">ASHA Task List</h6>
+                    <div class="small">{instructions_html}</div>
+                </div>
+
+                {remedies_html}
+            </div>
+            """
+
+
+def seed(path, reports, patients):
+    conn = sqlite3.connect(path)
+    run_migrations(conn, verbose=False)
+    # Mark 009 as pending so the copy converts the seeded HTML rows like a pre-009 database
+    conn.execute("DELETE FROM schema_version WHERE version = 9")
+    conn.commit()
+
+    rng = random.Random(42)
+    rows = []
+    for _ in range(reports):
+        risk = rng.choices(["Low", "Moderate", "High", "Critical"], weights=[40, 35, 20, 5])[0]
+        decision = {"Low": "Home Care", "Moderate": "ASHA Follow-up",
+                    "High": "Doctor Consultation", "Critical": "Emergency"}[risk]
+        diagnosis = rng.choice(DIAGNOSES)
+        flags = ", ".join(rng.sample(RED_FLAGS, rng.randint(0, 2))) if risk in ("High", "Critical") else ""
+        reasoning = (f"Patient presents with symptoms consistent with {diagnosis.lower()}. "
+                     f"Vitals reviewed; risk assessed as {risk.lower()} based on age, history and red flags.")
+        html_card = legacy_html(risk, decision, diagnosis, flags, reasoning,
+                                rng.sample(INSTRUCTIONS, 3), rng.sample(REMEDIES, 2))
+        rows.append((rng.randint(1, patients), "fever and body ache", "fever, cough", "seeded",
+                     html_card, risk, decision, diagnosis))
+    conn.executemany(
+        "INSERT INTO triage_reports (patient_id, chief_complaint, symptoms, notes, ai_prediction, "
+        "timestamp, risk, decision, primary_diagnosis) "
+        "VALUES (?, ?, ?, ?, ?, datetime('now', '-' || abs(random() % 30) || ' days'), ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def time_reads(path, patients, render=None):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    rng = random.Random(7)
+    samples = []
+    for _ in range(2000):
+        start = time.perf_counter()
+        rows = conn.execute(
+            "SELECT * FROM triage_reports WHERE patient_id = ? ORDER BY timestamp DESC LIMIT 3",
+            (rng.randint(1, patients),)
+        ).fetchall()
+        if render:
+            for row in rows:
+                render(row)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    total = sum(1 for _ in conn.execute("SELECT * FROM triage_reports"))
+    full_scan_ms = (time.perf_counter() - start) * 1000
+    conn.close()
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95)],
+        "full_select_ms": full_scan_ms,
+        "rows": total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--patients", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="triage_bench_")
+    legacy_db = os.path.join(workdir, "legacy.db")
+    json_db = os.path.join(workdir, "json.db")
+    try:
+        seed(legacy_db, args.reports, args.patients)
+        shutil.copy(legacy_db, json_db)
+
+        conn = sqlite3.connect(json_db)
+        start = time.perf_counter()
+        run_migrations(conn, verbose=False)
+        migrate_ms = (time.perf_counter() - start) * 1000
+        conn.execute("VACUUM")
+        conn.close()
+
+        render_card = None
+        if JINJA_AVAILABLE:
+            env = Environment(loader=FileSystemLoader("english/templates"), autoescape=True)
+            env.filters["triage_assessment"] = decode_assessment
+            card = env.get_template("triage_report_card.html").module.triage_card
+            render_card = card
+
+        results = {
+            "HTML (ai_prediction)": (os.path.getsize(legacy_db), time_reads(legacy_db, args.patients, render_card)),
+            "JSON (assessment)": (os.path.getsize(json_db), time_reads(json_db, args.patients, render_card)),
+        }
+
+        print(f"{args.reports} reports / {args.patients} patients "
+              f"(card rendering {'included' if render_card else 'skipped: jinja2 not installed'})")
+        print(f"Migration 009 converted the reports in {migrate_ms:.0f} ms\n")
+        print(f"{'storage':<22}{'db size':>12}{'p50 ms':>10}{'p95 ms':>10}{'SELECT * ms':>14}")
+        for label, (size, stats) in results.items():
+            print(f"{label:<22}{size / 1024 / 1024:>10.2f}MB{stats['p50_ms']:>10.3f}"
+                  f"{stats['p95_ms']:>10.3f}{stats['full_select_ms']:>14.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Vitals Store Benchmark
+Compares the SQL readings path with the memory-mapped NumPy vitals store
+
+Seeds a database with BP / SUGAR readings, builds the store from it and times
+per-patient 7-day history reads and the population-wide trend scan that
+analyze_all_patients runs (trend classification only, no alerts written).
+
+Usage:
+    python bench_vitals_store.py [--patients 5000] [--days 60] [--per-day 2]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import db
+from migrate import run_migrations
+from services.vitals_store import NUMPY_AVAILABLE, VitalsStore
+
+
+def seed(path, patients, days, per_day):
+    conn = sqlite3.connect(path)
+    run_migrations(conn, verbose=False)
+    rng = random.Random(42)
+    now = datetime.now()
+    batch = []
+    for patient_id in range(1, patients + 1):
+        slope = rng.choice([0, 0, 0, 1, 2])
+        for step in range(days * per_day):
+            ts = (now - timedelta(hours=step * 24 / per_day)).strftime("%Y-%m-%d %H:%M:%S")
+            age_days = step / per_day
+            batch.append((patient_id, "BP", int(125 - slope * age_days) + rng.randint(-4, 4), 82, ts))
+            batch.append((patient_id, "SUGAR", int(115 - 2 * slope * age_days) + rng.randint(-6, 6), None, ts))
+        if len(batch) > 50000:
+            conn.executemany("INSERT INTO readings (patient_id, reading_type, value1, value2, timestamp) "
+                             "VALUES (?, ?, ?, ?, ?)", batch)
+            batch = []
+    conn.executemany("INSERT INTO readings (patient_id, reading_type, value1, value2, timestamp) "
+                     "VALUES (?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--per-day", type=int, default=2)
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("numpy is not installed; the vitals store is unavailable")
+        return 1
+
+    # Imported after db is configured below would also work; the agent reads the pool lazily
+    from agents import vital_trend_analyzer as vta
+
+    workdir = tempfile.mkdtemp(prefix="vitals_bench_")
+    path = os.path.join(workdir, "health.db")
+    previous = db.pool_stats()["path"]
+    try:
+        seed(path, args.patients, args.days, args.per_day)
+        db.configure(path=path)
+
+        store = VitalsStore(os.path.join(workdir, "store"), enabled=True)
+        start = time.perf_counter()
+        rows = store.rebuild()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(7)
+        since = datetime.now() - timedelta(days=7)
+        sql_samples, store_samples = [], []
+        for _ in range(2000):
+            patient_id = rng.randint(1, args.patients)
+            start = time.perf_counter()
+            sql_rows = vta.get_readings(patient_id, "BP", since=since)
+            sql_samples.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            store_rows = store.history(patient_id, "BP", since=since)
+            store_samples.append((time.perf_counter() - start) * 1000)
+            assert len(sql_rows) == len(store_rows)
+
+        # Population scan: per-patient SQL (as analyze_all_patients did) vs one vectorized pass
+        start = time.perf_counter()
+        conn = db.get_db_connection()
+        patient_ids = [r[0] for r in conn.execute(
+            "SELECT DISTINCT patient_id FROM readings WHERE timestamp >= ?", (since.strftime("%Y-%m-%d %H:%M:%S"),)
+        ).fetchall()]
+        conn.close()
+        sql_flagged = 0
+        for patient_id in patient_ids:
+            for vital_type in ("BP", "SUGAR"):
+                history = [{"value1": r["value1"], "value2": r["value2"]}
+                           for r in vta.get_readings(patient_id, vital_type, since=since)]
+                if vta.detect_trend(history, vital_type)["severity"] != "NONE":
+                    sql_flagged += 1
+        sql_scan_ms = (time.perf_counter() - start) * 1000
+
+        import numpy as np
+        start = time.perf_counter()
+        windows = store.trend_endpoints(["BP", "SUGAR"], since=since)
+        change = windows["last_value1"] - windows["first_value1"]
+        thresholds = np.array([vta.TREND_THRESHOLDS[t] for t in windows["type"]], dtype=float)
+        store_flagged = int(((windows["count"] >= 2) & (np.abs(change) >= thresholds)).sum())
+        store_scan_ms = (time.perf_counter() - start) * 1000
+
+        sql_p50, sql_p95 = percentiles(sql_samples)
+        store_p50, store_p95 = percentiles(store_samples)
+        print(f"{rows} readings / {args.patients} patients; store built in {build_ms:.0f} ms "
+              f"({os.path.getsize(os.path.join(workdir, 'store', 'readings.bin')) / 1024 / 1024:.1f} MB)\n")
+        print(f"{'7-day BP history':<28}{'p50 ms':>10}{'p95 ms':>10}")
+        print(f"{'SQL (get_readings)':<28}{sql_p50:>10.3f}{sql_p95:>10.3f}")
+        print(f"{'vitals store':<28}{store_p50:>10.3f}{store_p95:>10.3f}\n")
+        print(f"{'population trend scan':<28}{'ms':>10}{'flagged':>10}")
+        print(f"{'SQL, per patient':<28}{sql_scan_ms:>10.0f}{sql_flagged:>10}")
+        print(f"{'vitals store, one pass':<28}{store_scan_ms:>10.0f}{store_flagged:>10}")
+    finally:
+        db.configure(path=previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Shared SQLite data-access module
+Pools reusable, pre-configured connections to health.db for routes, agents and the scheduler
+"""
+import os
+import sqlite3
+import threading
+import time
+import atexit
+from typing import Dict, Optional
+
+DB_PATH = os.getenv("HEALTH_DB_PATH", "health.db")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "8"))
+POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))     # 16 MB page cache per connection
+MMAP_SIZE_BYTES = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE", "256"))
+
+
+class PooledConnection:
+    """
+    Thin proxy around a sqlite3.Connection.
+
+    Behaves like the connection returned by sqlite3.connect(), except that
+    close() hands the connection back to the pool instead of closing it.
+    Uncommitted work is rolled back on release, matching sqlite3 close semantics.
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw: sqlite3.Connection, owner: int):
+        self._pool = pool
+        self._raw = raw
+        self._owner = owner
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._raw, name, value)
+
+    def __enter__(self):
+        self._raw.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._raw.__exit__(exc_type, exc, tb)
+
+    def close(self):
+        # Safe to call more than once (several routes close in both except and finally)
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._raw, self._owner)
+
+    def __del__(self):
+        # A caller that forgot close() (e.g. an exception before conn.close())
+        # must not permanently shrink the pool.
+        if not getattr(self, "_released", True):
+            self._released = True
+            self._pool.release(self._raw, self._owner, leaked=True)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of configured SQLite connections.
+
+    - Idle connections are reused LIFO so hot connections keep a warm page cache.
+    - Up to pool_size connections are kept open; up to max_overflow more may be
+      opened under load and are closed again when returned.
+    - A thread that already holds a connection never blocks waiting for a second
+      one (nested helper calls inside a request), it gets an overflow connection
+      instead. Other threads wait up to timeout seconds.
+    """
+
+    def __init__(self, path: str = DB_PATH, pool_size: int = POOL_SIZE,
+                 max_overflow: int = MAX_OVERFLOW, timeout: float = POOL_TIMEOUT_SECONDS):
+        self.path = path
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+
+        self._idle = []
+        self._in_use = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._holders = {}  # thread ident -> connections currently checked out by it
+        self._stats = {
+            "checkouts": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "overflow_checkouts": 0,
+            "waits": 0,
+            "wait_time_ms_total": 0.0,
+            "wait_time_ms_max": 0.0,
+            "timeouts": 0,
+            "leaked_returns": 0,
+        }
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def connect(self) -> PooledConnection:
+        """Check out a connection. Call close() on it to return it to the pool."""
+        start = time.perf_counter()
+        owner = threading.get_ident()
+        waited = False
+        raw = None
+        create = False
+
+        with self._cond:
+            deadline = start + self.timeout
+            while True:
+                if self._idle:
+                    raw = self._idle.pop()
+                    self._stats["connections_reused"] += 1
+                    break
+                total_open = self._in_use + len(self._idle)
+                if total_open < self.pool_size + self.max_overflow or self._holders.get(owner, 0) > 0:
+                    create = True
+                    if total_open >= self.pool_size:
+                        self._stats["overflow_checkouts"] += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise sqlite3.OperationalError(
+                        f"Connection pool exhausted ({self._in_use} in use, timeout {self.timeout}s)"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self._holders[owner] = self._holders.get(owner, 0) + 1
+            self._stats["checkouts"] += 1
+
+        if create:
+            try:
+                raw = self._open()
+            except Exception:
+                with self._cond:
+                    self._in_use -= 1
+                    self._forget_holder(owner)
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["connections_created"] += 1
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._cond:
+            if waited:
+                self._stats["waits"] += 1
+            self._stats["wait_time_ms_total"] += elapsed_ms
+            self._stats["wait_time_ms_max"] = max(self._stats["wait_time_ms_max"], elapsed_ms)
+
+        return PooledConnection(self, raw, owner)
+
+    def _forget_holder(self, owner: int):
+        remaining = self._holders.get(owner, 0) - 1
+        if remaining > 0:
+            self._holders[owner] = remaining
+        else:
+            self._holders.pop(owner, None)
+
+    def release(self, raw: sqlite3.Connection, owner: int, leaked: bool = False):
+        """Return a raw connection to the pool (called by PooledConnection.close)."""
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+            healthy = True
+        except sqlite3.Error:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            self._forget_holder(owner)
+            if leaked:
+                self._stats["leaked_returns"] += 1
+            if healthy and len(self._idle) < self.pool_size:
+                self._idle.append(raw)
+                raw = None
+            self._cond.notify()
+
+        if raw is not None:
+            raw.close()
+
+    def close_all(self):
+        """Close every idle connection (connections in use are closed on release)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for raw in idle:
+            try:
+                raw.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["in_use"] = self._in_use
+            stats["idle"] = len(self._idle)
+        checkouts = stats["checkouts"] or 1
+        stats["wait_time_ms_avg"] = round(stats["wait_time_ms_total"] / checkouts, 3)
+        stats["wait_time_ms_total"] = round(stats["wait_time_ms_total"], 3)
+        stats["wait_time_ms_max"] = round(stats["wait_time_ms_max"], 3)
+        stats["path"] = self.path
+        return stats
+
+
+_pool = ConnectionPool()
+_pool_lock = threading.Lock()
+
+
+def configure(path: Optional[str] = None, pool_size: Optional[int] = None,
+              max_overflow: Optional[int] = None):
+    """Point the shared pool at another database file (tests, scripts, benchmarks)."""
+    global _pool
+    with _pool_lock:
+        old = _pool
+        _pool = ConnectionPool(
+            path=path or old.path,
+            pool_size=pool_size if pool_size is not None else old.pool_size,
+            max_overflow=max_overflow if max_overflow is not None else old.max_overflow,
+        )
+    old.close_all()
+
+
+def get_db_connection() -> PooledConnection:
+    """Get a pooled database connection (rows are sqlite3.Row)"""
+    return _pool.connect()
+
+
+def pool_stats() -> Dict:
+    """Connection checkout / wait counters for monitoring"""
+    return _pool.stats()
+
+
+def close_pool():
+    _pool.close_all()
+
+
+atexit.register(close_pool)
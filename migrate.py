@@ -0,0 +1,298 @@
+"""
+Versioned Migration Runner
+Applies numbered migrations from migrations/ in order and records them in schema_version
+
+Migration files are named NNN_description.sql or NNN_description.py.
+A .py migration must define upgrade(conn). Unnumbered files in migrations/
+(e.g. add_care_workflows.py) are legacy one-off scripts and are ignored.
+
+Usage:
+    python migrate.py            # apply pending migrations
+    python migrate.py --status   # list applied / pending versions
+    python migrate.py --check    # EXPLAIN QUERY PLAN the hot queries, fail on full scans
+"""
+import importlib.util
+import os
+import re
+import sys
+from typing import Dict, List, Tuple
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE_RE = re.compile(r"^(\d{3})_([A-Za-z0-9_]+)\.(sql|py)$")
+
+# Migrations that predate this runner and were applied by hand through
+# run_migration.py. When an existing database is adopted they are recorded
+# as applied instead of being re-run (they insert sample rows).
+LEGACY_VERSIONS = {2, 6}
+
+# The app's hot read paths, checked with EXPLAIN QUERY PLAN by --check.
+# (label, sql, params)
+HOT_QUERIES: List[Tuple[str, str, tuple]] = [
+    ("latest BP reading (triage vitals)",
+     "SELECT value1, value2 FROM readings WHERE patient_id = ? AND reading_type = 'BP' ORDER BY timestamp DESC LIMIT 1",
+     (1,)),
+    ("vital history window (trend analyzer)",
+     "SELECT value1, value2, timestamp FROM readings WHERE patient_id = ? AND reading_type = ? AND timestamp >= ? ORDER BY timestamp ASC",
+     (1, "BP", "2025-01-01")),
+    ("latest readings (monitoring dashboard)",
+     "SELECT * FROM readings WHERE patient_id = ? ORDER BY timestamp DESC LIMIT 5",
+     (1,)),
+    ("patients with recent readings (analyze_all_patients)",
+     "SELECT DISTINCT patient_id FROM readings WHERE timestamp >= datetime('now', '-7 days')",
+     ()),
+    ("latest triage reports (monitoring dashboard)",
+     "SELECT * FROM triage_reports WHERE patient_id = ? ORDER BY timestamp DESC LIMIT 3",
+     (1,)),
+    ("active prescriptions",
+     "SELECT pr.*, ph.name AS pharmacy_name FROM prescriptions pr LEFT JOIN pharmacies ph ON pr.dispensed_by = ph.id "
+     "WHERE pr.patient_id = ? AND pr.is_active = 1",
+     (1,)),
+    ("ASHA caseload",
+     "SELECT * FROM patients WHERE asha_worker_phone = ? ORDER BY id DESC",
+     ("+919834358534",)),
+    ("open alerts for ASHA caseload",
+     "SELECT a.*, p.name FROM patient_alerts a JOIN patients p ON a.patient_id = p.id "
+     "WHERE p.asha_worker_phone = ? AND a.is_acknowledged = 0",
+     ("+919834358534",)),
+    ("open HIGH alerts for patient",
+     "SELECT COUNT(*) FROM patient_alerts WHERE patient_id = ? AND severity = 'HIGH' AND is_acknowledged = 0",
+     (1,)),
+    ("latest care workflow",
+     "SELECT current_state, next_action, status, created_at FROM care_workflows WHERE patient_id = ? ORDER BY created_at DESC LIMIT 1",
+     (1,)),
+    ("overdue follow-up",
+     "SELECT id, scheduled_date FROM follow_up_schedule WHERE patient_id = ? AND status = 'PENDING' "
+     "AND scheduled_date < DATE('now') ORDER BY scheduled_date ASC LIMIT 1",
+     (1,)),
+    ("pending referrals (doctor queue)",
+     "SELECT r.*, p.name FROM referrals r JOIN patients p ON r.patient_id = p.id "
+     "WHERE r.doctor_id IS NULL AND r.status = 'Pending' ORDER BY r.created_at DESC",
+     ()),
+    ("advisories for ASHA villages",
+     "SELECT DISTINCT ma.* FROM ministry_advisories ma JOIN patients p ON ma.village = p.village "
+     "WHERE p.asha_worker_phone = ? ORDER BY ma.sent_at DESC",
+     ("+919834358534",)),
+    ("advisory responses by worker",
+     "SELECT advisory_id, status FROM advisory_responses WHERE worker_phone = ?",
+     ("+919834358534",)),
+    ("unreviewed high-risk triage (doctor dashboard)",
+     "SELECT patient_id, MAX(timestamp), chief_complaint FROM triage_reports "
+     "WHERE risk IN ('High', 'Critical') AND doctor_reviewed = 0 AND timestamp >= datetime('now', '-7 days') "
+     "GROUP BY patient_id",
+     ()),
+    ("open HIGH alerts (doctor dashboard)",
+     "SELECT DISTINCT patient_id FROM patient_alerts WHERE is_acknowledged = 0 AND severity = 'HIGH'",
+     ()),
+    ("latest triage per patient",
+     "SELECT chief_complaint, timestamp, risk FROM latest_triage WHERE patient_id = ?",
+     (1,)),
+    ("mark patient attended",
+     "UPDATE triage_reports SET doctor_reviewed = 1 WHERE patient_id = ? AND risk IN ('High', 'Critical') AND doctor_reviewed = 0",
+     (1,)),
+    ("high-risk villages (outbreak check)",
+     "SELECT p.village, COUNT(*) FROM triage_reports tr JOIN patients p ON tr.patient_id = p.id "
+     "WHERE tr.risk IN ('High', 'Critical') AND tr.timestamp >= date('now', '-7 days') GROUP BY p.village",
+     ()),
+    ("district patient count",
+     "SELECT COUNT(*) FROM patients WHERE district = ?",
+     ("Dhule",)),
+    ("village day buckets (hotspot detection)",
+     "SELECT village, day, high_risk FROM village_daily WHERE district = ? AND day >= ? AND day <= ? AND high_risk > 0",
+     ("Dhule", "2025-01-01", "2025-02-04")),
+    ("district symptom counts (ministry dashboard)",
+     "SELECT category, SUM(reports) FROM symptom_daily WHERE district = ? AND day >= ? GROUP BY category",
+     ("Dhule", "2025-01-01")),
+    ("ready triage job (job workers)",
+     "SELECT id FROM triage_jobs WHERE (status = 'queued' AND next_run_at <= ?) OR (status = 'running' AND lease_until < ?) "
+     "ORDER BY stage = 'upgrade', next_run_at LIMIT 1",
+     (0, 0)),
+    ("LLM cache LRU eviction",
+     "SELECT cache_key FROM llm_cache ORDER BY last_used LIMIT ?",
+     (10,)),
+]
+
+
+def discover_migrations(directory: str = MIGRATIONS_DIR) -> List[Dict]:
+    """Return numbered migrations sorted by version"""
+    migrations = []
+    seen = {}
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE_RE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in seen:
+            raise ValueError(f"Duplicate migration version {version}: {seen[version]} and {filename}")
+        seen[version] = filename
+        migrations.append({
+            "version": version,
+            "name": match.group(2),
+            "kind": match.group(3),
+            "path": os.path.join(directory, filename),
+        })
+    return sorted(migrations, key=lambda m: m["version"])
+
+
+def _table_exists(conn, table: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def ensure_version_table(conn) -> None:
+    """Create schema_version, adopting databases built before the runner existed"""
+    if _table_exists(conn, "schema_version"):
+        return
+
+    adopt_existing = _table_exists(conn, "patients")
+    conn.execute("""
+        CREATE TABLE schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    if adopt_existing:
+        for migration in discover_migrations():
+            if migration["version"] in LEGACY_VERSIONS:
+                conn.execute(
+                    "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                    (migration["version"], f"{migration['name']} (adopted)")
+                )
+    conn.commit()
+
+
+def applied_versions(conn) -> set:
+    ensure_version_table(conn)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_version").fetchall()}
+
+
+def _load_python_migration(path: str):
+    spec = importlib.util.spec_from_file_location(f"migration_{os.path.basename(path)[:-3]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, "upgrade"):
+        raise AttributeError(f"{path} does not define upgrade(conn)")
+    return module
+
+
+def apply_migration(conn, migration: Dict) -> None:
+    """Apply one migration and record it, all in a single transaction"""
+    if migration["kind"] == "sql":
+        with open(migration["path"], "r", encoding="utf-8") as f:
+            sql = f.read()
+        name = migration["name"].replace("'", "''")
+        try:
+            conn.executescript(
+                "BEGIN;\n" + sql +
+                f"\nINSERT INTO schema_version (version, name) VALUES ({migration['version']}, '{name}');\nCOMMIT;"
+            )
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    else:
+        module = _load_python_migration(migration["path"])
+        try:
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute("BEGIN")
+            module.upgrade(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (migration["version"], migration["name"])
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def run_migrations(conn=None, verbose: bool = True) -> List[int]:
+    """
+    Apply all pending migrations
+
+    Args:
+        conn: Open connection (defaults to a pooled connection to health.db)
+        verbose: Print each applied migration
+
+    Returns:
+        Versions applied by this call
+    """
+    own_connection = conn is None
+    if own_connection:
+        from db import get_db_connection
+        conn = get_db_connection()
+
+    try:
+        done = applied_versions(conn)
+        applied = []
+        for migration in discover_migrations():
+            if migration["version"] in done:
+                continue
+            if verbose:
+                print(f"⏳ Applying migration {migration['version']:03d}_{migration['name']}...")
+            apply_migration(conn, migration)
+            applied.append(migration["version"])
+        if verbose:
+            print(f"✅ Schema up to date ({len(applied)} migration(s) applied)")
+        return applied
+    finally:
+        if own_connection:
+            conn.close()
+
+
+def explain(conn, sql: str, params: tuple = ()) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+
+
+def is_full_scan(detail: str) -> bool:
+    """A plan step that reads a whole table without any index"""
+    return detail.startswith("SCAN ") and " USING " not in detail and "CONSTANT ROW" not in detail
+
+
+def check_query_plans(conn, queries=None) -> List[Dict]:
+    """
+    EXPLAIN QUERY PLAN every hot query
+
+    Returns:
+        One entry per query that full-scans a table (empty list = all good)
+    """
+    failures = []
+    for label, sql, params in (queries if queries is not None else HOT_QUERIES):
+        plan = explain(conn, sql, params)
+        scans = [d for d in plan if is_full_scan(d)]
+        if scans:
+            failures.append({"query": label, "scans": scans, "plan": plan})
+    return failures
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    from db import get_db_connection
+    conn = get_db_connection()
+    try:
+        if "--status" in argv:
+            done = applied_versions(conn)
+            for migration in discover_migrations():
+                state = "applied" if migration["version"] in done else "pending"
+                print(f"{migration['version']:03d}_{migration['name']:<30} {state}")
+            return 0
+
+        run_migrations(conn)
+
+        if "--check" in argv:
+            failures = check_query_plans(conn)
+            for failure in failures:
+                print(f"❌ Full scan in '{failure['query']}': {failure['scans']}")
+            if failures:
+                return 1
+            print(f"✅ All {len(HOT_QUERIES)} hot queries are index-driven")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+-- Migration 001: Baseline Schema
+-- Description: Consolidates the tables created by setup_database.py, app.init_db,
+--              the sql/ scripts and the fix_*.py / update_*.py helpers.
+-- Every statement is idempotent so it is safe on databases built the old way.
+
+CREATE TABLE IF NOT EXISTS asha_workers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    phone_number TEXT UNIQUE NOT NULL,
+    village TEXT,
+    district TEXT DEFAULT 'Dhule'
+);
+
+CREATE TABLE IF NOT EXISTS patients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    phone_number TEXT UNIQUE NOT NULL,
+    email TEXT,
+    password_hash TEXT NOT NULL,
+    active_call_link TEXT,
+    age INTEGER,
+    gender TEXT,
+    village TEXT,
+    district TEXT DEFAULT 'Dhule',
+    asha_worker_phone TEXT
+);
+
+CREATE TABLE IF NOT EXISTS pharmacies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    district TEXT,
+    location TEXT,
+    email TEXT UNIQUE,
+    password_hash TEXT
+);
+
+CREATE TABLE IF NOT EXISTS pharmacy_inventory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pharmacy_id INTEGER,
+    medication TEXT NOT NULL,
+    stock_status TEXT,
+    last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (pharmacy_id) REFERENCES pharmacies (id)
+);
+
+CREATE TABLE IF NOT EXISTS prescriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER,
+    medication_name TEXT,
+    medication TEXT,
+    dosage TEXT,
+    notes TEXT,
+    is_active INTEGER DEFAULT 1,
+    status TEXT DEFAULT 'Pending',
+    dispensing_pharmacy_id INTEGER,
+    dispensed_by INTEGER,
+    dispensed_at DATETIME,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients (id),
+    FOREIGN KEY (dispensing_pharmacy_id) REFERENCES pharmacies (id)
+);
+
+CREATE TABLE IF NOT EXISTS readings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER,
+    reading_type TEXT NOT NULL,
+    value1 INTEGER NOT NULL,
+    value2 INTEGER,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients (id)
+);
+
+CREATE TABLE IF NOT EXISTS triage_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER,
+    chief_complaint TEXT NOT NULL,
+    symptoms TEXT,
+    notes TEXT,
+    ai_prediction TEXT,
+    follow_up_date DATE,
+    doctor_reviewed INTEGER DEFAULT 0,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients (id)
+);
+
+CREATE TABLE IF NOT EXISTS agent_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    agent_name TEXT NOT NULL,
+    input_data TEXT,
+    output_data TEXT,
+    execution_time_ms INTEGER,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients(id)
+);
+
+CREATE TABLE IF NOT EXISTS patient_alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    alert_type TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    message TEXT NOT NULL,
+    vital_name TEXT,
+    trend_data TEXT,
+    is_acknowledged BOOLEAN DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    acknowledged_at DATETIME,
+    acknowledged_by TEXT,
+    FOREIGN KEY (patient_id) REFERENCES patients(id)
+);
+
+CREATE TABLE IF NOT EXISTS follow_up_schedule (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    scheduled_date DATE NOT NULL,
+    visit_type TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    status TEXT DEFAULT 'PENDING',
+    created_by_agent TEXT,
+    notes TEXT,
+    completed_at DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients(id)
+);
+
+CREATE TABLE IF NOT EXISTS care_workflows (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    current_state TEXT,
+    next_action TEXT,
+    status TEXT DEFAULT 'active',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients(id)
+);
+
+CREATE TABLE IF NOT EXISTS ministry_advisories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT,
+    content TEXT,
+    message TEXT,
+    village TEXT,
+    district TEXT DEFAULT 'Dhule',
+    urgency TEXT,
+    sent_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS advisory_responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    advisory_id INTEGER NOT NULL,
+    worker_phone TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT,
+    responded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (advisory_id) REFERENCES ministry_advisories (id)
+);
+
+CREATE TABLE IF NOT EXISTS referrals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    referred_by_asha TEXT NOT NULL,
+    doctor_id INTEGER,
+    reason TEXT NOT NULL,
+    priority TEXT DEFAULT 'Routine', -- Routine, Urgent, Emergency
+    status TEXT DEFAULT 'Pending', -- Pending, Attended
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients (id)
+);
+
+CREATE TABLE IF NOT EXISTS hospitals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    district TEXT NOT NULL,
+    location TEXT NOT NULL,
+    type TEXT DEFAULT 'Government',
+    contact_number TEXT
+);
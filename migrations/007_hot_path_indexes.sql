@@ -0,0 +1,45 @@
+-- Migration 007: Hot Path Indexes
+-- Description: Composite and covering indexes for the dashboard and agent queries.
+-- Verified with: python migrate.py --check
+
+-- Readings: vitals by patient + type in time order (trend analyzer, charts, triage vitals check).
+-- value1/value2 are included so those lookups never touch the table.
+CREATE INDEX IF NOT EXISTS idx_readings_patient_type_ts ON readings(patient_id, reading_type, timestamp, value1, value2);
+-- Latest readings of any type for a patient (monitoring dashboard, case timeline)
+CREATE INDEX IF NOT EXISTS idx_readings_patient_ts ON readings(patient_id, timestamp);
+-- Patients with recent readings (analyze_all_patients)
+CREATE INDEX IF NOT EXISTS idx_readings_ts_patient ON readings(timestamp, patient_id);
+
+-- Triage reports by patient in time order, and recent reports across patients
+CREATE INDEX IF NOT EXISTS idx_triage_reports_patient_ts ON triage_reports(patient_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_triage_reports_ts ON triage_reports(timestamp);
+
+-- Prescriptions: active list per patient, and pharmacy queues by status
+CREATE INDEX IF NOT EXISTS idx_prescriptions_patient_active ON prescriptions(patient_id, is_active, timestamp);
+CREATE INDEX IF NOT EXISTS idx_prescriptions_active_ts ON prescriptions(is_active, timestamp);
+
+-- Patients: ASHA caseload, district/village rollups
+CREATE INDEX IF NOT EXISTS idx_patients_asha ON patients(asha_worker_phone);
+CREATE INDEX IF NOT EXISTS idx_patients_district_village ON patients(district, village, asha_worker_phone);
+CREATE INDEX IF NOT EXISTS idx_patients_village ON patients(village);
+
+-- Referrals: doctor queue
+CREATE INDEX IF NOT EXISTS idx_referrals_status_doctor ON referrals(status, doctor_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_referrals_patient ON referrals(patient_id);
+
+-- Alerts: open alerts per patient (priority fallback, duplicate check in generate_alert)
+CREATE INDEX IF NOT EXISTS idx_patient_alerts_patient_open ON patient_alerts(patient_id, is_acknowledged, severity);
+
+-- Workflows, follow-ups, advisories, inventory
+-- (pharmacy_inventory.medication is not indexed: older databases still name it medication_name)
+CREATE INDEX IF NOT EXISTS idx_care_workflows_patient_created ON care_workflows(patient_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_follow_up_schedule_patient_status ON follow_up_schedule(patient_id, status, scheduled_date);
+CREATE INDEX IF NOT EXISTS idx_ministry_advisories_village ON ministry_advisories(village, sent_at);
+CREATE INDEX IF NOT EXISTS idx_ministry_advisories_district ON ministry_advisories(district);
+CREATE INDEX IF NOT EXISTS idx_advisory_responses_worker ON advisory_responses(worker_phone);
+CREATE INDEX IF NOT EXISTS idx_advisory_responses_advisory ON advisory_responses(advisory_id);
+CREATE INDEX IF NOT EXISTS idx_pharmacy_inventory_pharmacy ON pharmacy_inventory(pharmacy_id);
+
+-- No ANALYZE here: on a freshly created (near-empty) database the statistics would
+-- tell the planner every table has one row and steer it away from these indexes.
+-- Run ANALYZE on a populated database (python migrate.py --check reports the plans).
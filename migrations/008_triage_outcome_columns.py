@@ -0,0 +1,40 @@
+"""
+Migration 008: Triage Outcome Columns
+Adds typed risk / decision / primary_diagnosis / red_flag_count / doctor_reviewed
+columns to triage_reports, backfills them from the ai_prediction HTML and
+indexes them so high-risk filters no longer need LIKE '%High%' scans.
+"""
+from services.triage_outcome import parse_legacy_prediction
+
+NEW_COLUMNS = [
+    ("risk", "TEXT"),
+    ("decision", "TEXT"),
+    ("primary_diagnosis", "TEXT"),
+    ("red_flag_count", "INTEGER DEFAULT 0"),
+    ("doctor_reviewed", "INTEGER DEFAULT 0"),
+]
+
+
+def upgrade(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(triage_reports)").fetchall()}
+    for name, ddl in NEW_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE triage_reports ADD COLUMN {name} {ddl}")
+
+    rows = conn.execute(
+        "SELECT id, ai_prediction FROM triage_reports WHERE risk IS NULL AND ai_prediction IS NOT NULL"
+    ).fetchall()
+    updates = []
+    for report_id, ai_prediction in rows:
+        fields = parse_legacy_prediction(ai_prediction)
+        updates.append((fields["risk"], fields["decision"], fields["primary_diagnosis"],
+                        fields["red_flag_count"], report_id))
+    conn.executemany(
+        "UPDATE triage_reports SET risk = ?, decision = ?, primary_diagnosis = ?, red_flag_count = ? WHERE id = ?",
+        updates
+    )
+    conn.execute("UPDATE triage_reports SET doctor_reviewed = 0 WHERE doctor_reviewed IS NULL")
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_triage_reports_risk_ts ON triage_reports(risk, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_triage_reports_patient_risk ON triage_reports(patient_id, risk)")
+    print(f"  Backfilled outcome columns for {len(updates)} triage reports")
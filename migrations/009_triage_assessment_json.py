@@ -0,0 +1,27 @@
+"""
+Migration 009: Triage Assessment JSON
+Adds triage_reports.assessment (compact JSON, zlib-compressed when large) and
+converts the pre-rendered ai_prediction HTML of existing reports into it.
+Free-text predictions that are not a recognised report format are left as is.
+Run VACUUM afterwards to return the freed pages to the filesystem.
+"""
+from services.triage_outcome import assessment_from_legacy_html, encode_assessment
+
+
+def upgrade(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(triage_reports)").fetchall()}
+    if "assessment" not in existing:
+        conn.execute("ALTER TABLE triage_reports ADD COLUMN assessment BLOB")
+
+    rows = conn.execute(
+        "SELECT id, ai_prediction FROM triage_reports WHERE assessment IS NULL AND ai_prediction IS NOT NULL"
+    ).fetchall()
+    updates = []
+    for report_id, ai_prediction in rows:
+        assessment = assessment_from_legacy_html(ai_prediction)
+        if assessment:
+            updates.append((encode_assessment(assessment["triage"], assessment["decision"]), report_id))
+    conn.executemany(
+        "UPDATE triage_reports SET assessment = ?, ai_prediction = NULL WHERE id = ?", updates
+    )
+    print(f"  Converted {len(updates)} of {len(rows)} triage reports to JSON assessments")
@@ -0,0 +1,14 @@
+-- Migration 010: Readings Archive Registry
+-- Description: Readings older than READINGS_ARCHIVE_HORIZON_DAYS are moved out of the hot
+--              `readings` table into per-month tables (readings_archive_YYYYMM) by
+--              services/readings_archive.py. This registry lists those tables and the
+--              time range each one covers so queries only touch the months they need.
+
+CREATE TABLE IF NOT EXISTS readings_archive_index (
+    month TEXT PRIMARY KEY,              -- 'YYYY-MM'
+    table_name TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    min_timestamp DATETIME,
+    max_timestamp DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
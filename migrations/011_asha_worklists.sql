@@ -0,0 +1,78 @@
+-- Migration 011: Persisted ASHA Worklists
+-- Description: The prioritized patient list of each ASHA worker (task prioritization agent output)
+--              is stored instead of being recomputed on every dashboard view. Triggers mark a
+--              patient dirty whenever its readings, alerts or follow-ups change, so only those
+--              patients are re-scored (services/worklists.py).
+
+-- One row per patient that needs attention (urgency_score > 0)
+CREATE TABLE IF NOT EXISTS asha_worklists (
+    worker_phone TEXT NOT NULL,
+    patient_id INTEGER NOT NULL,
+    urgency_score INTEGER NOT NULL,
+    priority_level TEXT NOT NULL,
+    patient_data TEXT NOT NULL,          -- JSON: patient info, open alerts, overdue follow-up, latest vitals
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (worker_phone, patient_id)
+);
+CREATE INDEX IF NOT EXISTS idx_asha_worklists_patient ON asha_worklists(patient_id);
+
+-- Last full build per worker; a worklist is rebuilt once per day because overdue days change with the date
+CREATE TABLE IF NOT EXISTS asha_worklist_builds (
+    worker_phone TEXT PRIMARY KEY,
+    built_on DATE NOT NULL,
+    built_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    patient_count INTEGER NOT NULL DEFAULT 0,
+    build_ms INTEGER
+);
+
+-- Patients whose inputs changed since their worklist entry was computed.
+-- version increases on every change so a refresh only clears what it actually saw.
+CREATE TABLE IF NOT EXISTS worklist_dirty (
+    patient_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1
+);
+
+-- Readings: new vitals change latest_vitals (old rows deleted by the archive job do not)
+CREATE TRIGGER IF NOT EXISTS trg_worklist_readings_insert AFTER INSERT ON readings BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_worklist_readings_update AFTER UPDATE ON readings BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Alerts: created, acknowledged or removed
+CREATE TRIGGER IF NOT EXISTS trg_worklist_alerts_insert AFTER INSERT ON patient_alerts BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_worklist_alerts_update AFTER UPDATE ON patient_alerts BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_worklist_alerts_delete AFTER DELETE ON patient_alerts BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (OLD.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Follow-ups: scheduled, completed or removed
+CREATE TRIGGER IF NOT EXISTS trg_worklist_followups_insert AFTER INSERT ON follow_up_schedule BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_worklist_followups_update AFTER UPDATE ON follow_up_schedule BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_worklist_followups_delete AFTER DELETE ON follow_up_schedule BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (OLD.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Patient details shown on the worklist, or the patient moved to another worker
+CREATE TRIGGER IF NOT EXISTS trg_worklist_patients_update
+AFTER UPDATE OF name, phone_number, age, gender, village, asha_worker_phone ON patients BEGIN
+    INSERT INTO worklist_dirty (patient_id) VALUES (NEW.id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
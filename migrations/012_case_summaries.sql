@@ -0,0 +1,80 @@
+-- Migration 012: Precomputed Case Summaries
+-- Description: Doctor case summaries (agents/doctor_case_prep_agent.py) are generated in the
+--              background and stored with the data version they were built from, so the doctor
+--              dashboard reads finished summaries instead of generating one per referral per view.
+--              Triggers bump a patient's version whenever data shown in the summary changes
+--              (services/case_summaries.py).
+
+-- Current data version per patient (no row = version 0, nothing changed since this migration)
+CREATE TABLE IF NOT EXISTS case_summary_versions (
+    patient_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1
+);
+
+-- Latest finished summary per patient; stale when data_version < case_summary_versions.version
+CREATE TABLE IF NOT EXISTS case_summaries (
+    patient_id INTEGER PRIMARY KEY,
+    data_version INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    generated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    generation_ms INTEGER
+);
+
+-- Readings: new vitals appear in the timeline (old rows deleted by the archive job do not)
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_readings_insert AFTER INSERT ON readings BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_readings_update AFTER UPDATE ON readings BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Triage reports: presentation and AI assessment
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_triage_insert AFTER INSERT ON triage_reports BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_triage_update AFTER UPDATE ON triage_reports BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_triage_delete AFTER DELETE ON triage_reports BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (OLD.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Prescriptions: active medications
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_prescriptions_insert AFTER INSERT ON prescriptions BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_prescriptions_update AFTER UPDATE ON prescriptions BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_prescriptions_delete AFTER DELETE ON prescriptions BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (OLD.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Alerts
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_alerts_insert AFTER INSERT ON patient_alerts BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_alerts_update AFTER UPDATE ON patient_alerts BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_alerts_delete AFTER DELETE ON patient_alerts BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (OLD.patient_id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Patient details in the overview section
+CREATE TRIGGER IF NOT EXISTS trg_case_summary_patients_update
+AFTER UPDATE OF name, age, gender, village, asha_worker_phone ON patients BEGIN
+    INSERT INTO case_summary_versions (patient_id) VALUES (NEW.id)
+    ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;
+END;
@@ -0,0 +1,66 @@
+-- Migration 013: Latest Triage Per Patient
+-- Description: latest_triage keeps one row per patient with their most recent triage report,
+--              maintained by triggers on triage_reports, so "latest triage" lookups join a single
+--              row per patient instead of every report. Also indexes the filters of the doctor
+--              dashboard's high-risk patient query (services/doctor_queue.py).
+
+CREATE TABLE IF NOT EXISTS latest_triage (
+    patient_id INTEGER PRIMARY KEY,
+    report_id INTEGER NOT NULL,
+    timestamp DATETIME,
+    chief_complaint TEXT,
+    risk TEXT,
+    decision TEXT,
+    doctor_reviewed INTEGER
+);
+
+INSERT OR REPLACE INTO latest_triage (patient_id, report_id, timestamp, chief_complaint, risk, decision, doctor_reviewed)
+SELECT patient_id, id, timestamp, chief_complaint, risk, decision, doctor_reviewed
+FROM (
+    SELECT tr.*, ROW_NUMBER() OVER (PARTITION BY tr.patient_id ORDER BY tr.timestamp DESC, tr.id DESC) AS rn
+    FROM triage_reports tr
+)
+WHERE rn = 1;
+
+-- New report: replaces the entry unless it is older than the current one (back-dated imports)
+CREATE TRIGGER IF NOT EXISTS trg_latest_triage_insert AFTER INSERT ON triage_reports BEGIN
+    INSERT INTO latest_triage (patient_id, report_id, timestamp, chief_complaint, risk, decision, doctor_reviewed)
+    VALUES (NEW.patient_id, NEW.id, NEW.timestamp, NEW.chief_complaint, NEW.risk, NEW.decision, NEW.doctor_reviewed)
+    ON CONFLICT(patient_id) DO UPDATE SET
+        report_id = excluded.report_id,
+        timestamp = excluded.timestamp,
+        chief_complaint = excluded.chief_complaint,
+        risk = excluded.risk,
+        decision = excluded.decision,
+        doctor_reviewed = excluded.doctor_reviewed
+    WHERE excluded.timestamp > latest_triage.timestamp
+       OR (excluded.timestamp = latest_triage.timestamp AND excluded.report_id > latest_triage.report_id)
+       OR latest_triage.timestamp IS NULL;
+END;
+
+-- Updated or deleted report: recompute the patient's entry from their reports
+CREATE TRIGGER IF NOT EXISTS trg_latest_triage_update AFTER UPDATE ON triage_reports BEGIN
+    DELETE FROM latest_triage WHERE patient_id IN (OLD.patient_id, NEW.patient_id);
+    INSERT INTO latest_triage (patient_id, report_id, timestamp, chief_complaint, risk, decision, doctor_reviewed)
+    SELECT patient_id, id, timestamp, chief_complaint, risk, decision, doctor_reviewed
+    FROM (
+        SELECT tr.*, ROW_NUMBER() OVER (PARTITION BY tr.patient_id ORDER BY tr.timestamp DESC, tr.id DESC) AS rn
+        FROM triage_reports tr
+        WHERE tr.patient_id IN (OLD.patient_id, NEW.patient_id)
+    )
+    WHERE rn = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_latest_triage_delete AFTER DELETE ON triage_reports BEGIN
+    DELETE FROM latest_triage WHERE patient_id = OLD.patient_id;
+    INSERT INTO latest_triage (patient_id, report_id, timestamp, chief_complaint, risk, decision, doctor_reviewed)
+    SELECT patient_id, id, timestamp, chief_complaint, risk, decision, doctor_reviewed
+    FROM triage_reports
+    WHERE patient_id = OLD.patient_id
+    ORDER BY timestamp DESC, id DESC
+    LIMIT 1;
+END;
+
+-- High-risk query filters: open HIGH alerts, and recent unreviewed high-risk reports
+CREATE INDEX IF NOT EXISTS idx_patient_alerts_open_severity ON patient_alerts(is_acknowledged, severity, patient_id);
+CREATE INDEX IF NOT EXISTS idx_triage_reports_risk_review_ts ON triage_reports(risk, doctor_reviewed, timestamp, patient_id);
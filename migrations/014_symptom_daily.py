@@ -0,0 +1,20 @@
+"""
+Migration 014: Symptom Daily Counters
+Creates symptom_daily (report counts per district / day / symptom chart category)
+and backfills it from the existing triage reports.
+"""
+from services.symptom_stats import rebuild_symptom_counts
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS symptom_daily (
+            district TEXT NOT NULL,
+            day TEXT NOT NULL,
+            category TEXT NOT NULL,
+            reports INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (district, day, category)
+        ) WITHOUT ROWID
+    """)
+    rows = rebuild_symptom_counts(conn)
+    print(f"  Backfilled {rows} symptom counter rows")
@@ -0,0 +1,83 @@
+-- Migration 015: Village Daily Buckets
+-- Description: village_daily keeps triage report and high-risk report counts per district / village / day,
+--              maintained by triggers on triage_reports and patients, so hotspot detection
+--              (services/hotspots.py) reads day buckets instead of rescanning triage_reports.
+--              Patients without a district or village are bucketed under ''.
+
+CREATE TABLE IF NOT EXISTS village_daily (
+    district TEXT NOT NULL,
+    village TEXT NOT NULL,
+    day TEXT NOT NULL,
+    reports INTEGER NOT NULL DEFAULT 0,
+    high_risk INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (district, village, day)
+) WITHOUT ROWID;
+
+INSERT OR REPLACE INTO village_daily (district, village, day, reports, high_risk)
+SELECT COALESCE(p.district, ''), COALESCE(p.village, ''), substr(tr.timestamp, 1, 10),
+       COUNT(*), SUM(CASE WHEN tr.risk IN ('High', 'Critical') THEN 1 ELSE 0 END)
+FROM triage_reports tr
+JOIN patients p ON p.id = tr.patient_id
+WHERE tr.timestamp IS NOT NULL
+GROUP BY 1, 2, 3;
+
+CREATE TRIGGER IF NOT EXISTS trg_village_daily_insert AFTER INSERT ON triage_reports
+WHEN NEW.timestamp IS NOT NULL BEGIN
+    INSERT INTO village_daily (district, village, day, reports, high_risk)
+    SELECT COALESCE(district, ''), COALESCE(village, ''), substr(NEW.timestamp, 1, 10),
+           1, CASE WHEN NEW.risk IN ('High', 'Critical') THEN 1 ELSE 0 END
+    FROM patients WHERE id = NEW.patient_id
+    ON CONFLICT(district, village, day) DO UPDATE SET
+        reports = reports + excluded.reports,
+        high_risk = high_risk + excluded.high_risk;
+END;
+
+-- Risk, time or patient changed: move the report from its old bucket to its new one
+CREATE TRIGGER IF NOT EXISTS trg_village_daily_update AFTER UPDATE OF risk, timestamp, patient_id ON triage_reports BEGIN
+    INSERT INTO village_daily (district, village, day, reports, high_risk)
+    SELECT COALESCE(district, ''), COALESCE(village, ''), substr(OLD.timestamp, 1, 10),
+           -1, CASE WHEN OLD.risk IN ('High', 'Critical') THEN -1 ELSE 0 END
+    FROM patients WHERE id = OLD.patient_id AND OLD.timestamp IS NOT NULL
+    ON CONFLICT(district, village, day) DO UPDATE SET
+        reports = reports + excluded.reports,
+        high_risk = high_risk + excluded.high_risk;
+    INSERT INTO village_daily (district, village, day, reports, high_risk)
+    SELECT COALESCE(district, ''), COALESCE(village, ''), substr(NEW.timestamp, 1, 10),
+           1, CASE WHEN NEW.risk IN ('High', 'Critical') THEN 1 ELSE 0 END
+    FROM patients WHERE id = NEW.patient_id AND NEW.timestamp IS NOT NULL
+    ON CONFLICT(district, village, day) DO UPDATE SET
+        reports = reports + excluded.reports,
+        high_risk = high_risk + excluded.high_risk;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_village_daily_delete AFTER DELETE ON triage_reports
+WHEN OLD.timestamp IS NOT NULL BEGIN
+    UPDATE village_daily SET
+        reports = reports - 1,
+        high_risk = high_risk - CASE WHEN OLD.risk IN ('High', 'Critical') THEN 1 ELSE 0 END
+    WHERE (district, village, day) = (
+        SELECT COALESCE(district, ''), COALESCE(village, ''), substr(OLD.timestamp, 1, 10)
+        FROM patients WHERE id = OLD.patient_id
+    );
+END;
+
+-- Patient moved village or district: move all of their reports' counts
+CREATE TRIGGER IF NOT EXISTS trg_village_daily_patient_move AFTER UPDATE OF district, village ON patients
+WHEN COALESCE(OLD.district, '') != COALESCE(NEW.district, '') OR COALESCE(OLD.village, '') != COALESCE(NEW.village, '') BEGIN
+    INSERT INTO village_daily (district, village, day, reports, high_risk)
+    SELECT COALESCE(OLD.district, ''), COALESCE(OLD.village, ''), substr(timestamp, 1, 10),
+           -COUNT(*), -SUM(CASE WHEN risk IN ('High', 'Critical') THEN 1 ELSE 0 END)
+    FROM triage_reports WHERE patient_id = OLD.id AND timestamp IS NOT NULL
+    GROUP BY substr(timestamp, 1, 10)
+    ON CONFLICT(district, village, day) DO UPDATE SET
+        reports = reports + excluded.reports,
+        high_risk = high_risk + excluded.high_risk;
+    INSERT INTO village_daily (district, village, day, reports, high_risk)
+    SELECT COALESCE(NEW.district, ''), COALESCE(NEW.village, ''), substr(timestamp, 1, 10),
+           COUNT(*), SUM(CASE WHEN risk IN ('High', 'Critical') THEN 1 ELSE 0 END)
+    FROM triage_reports WHERE patient_id = NEW.id AND timestamp IS NOT NULL
+    GROUP BY substr(timestamp, 1, 10)
+    ON CONFLICT(district, village, day) DO UPDATE SET
+        reports = reports + excluded.reports,
+        high_risk = high_risk + excluded.high_risk;
+END;
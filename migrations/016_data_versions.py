@@ -0,0 +1,71 @@
+"""
+Migration 016: Data Version Counters
+Creates data_versions (one counter per page scope) and the triggers that bump it, so
+dashboards can answer conditional GETs with 304 after a single version lookup
+(services/data_versions.py). Scopes:
+    worker:<phone>   - the ASHA monitoring dashboard of that worker
+    doctor_queue     - the doctor dashboard (high-risk patients, referrals, case summaries)
+    district:<name>  - the Health Ministry district dashboard
+"""
+
+BUMP = "INSERT INTO data_versions (scope) {source} ON CONFLICT(scope) DO UPDATE SET version = version + 1;"
+
+
+def worker_of_patient(ref: str) -> str:
+    return (f"SELECT 'worker:' || asha_worker_phone FROM patients "
+            f"WHERE id = {ref}.patient_id AND asha_worker_phone IS NOT NULL")
+
+
+def worker(ref: str, column: str = "worker_phone") -> str:
+    return f"SELECT 'worker:' || {ref}.{column} WHERE {ref}.{column} IS NOT NULL"
+
+
+def district(ref: str) -> str:
+    return f"SELECT 'district:' || {ref}.district WHERE {ref}.district IS NOT NULL"
+
+
+DOCTOR_QUEUE = "VALUES ('doctor_queue')"
+
+# (table, events, row reference -> bump sources); the reference is NEW for INSERT/UPDATE, OLD for DELETE
+TRIGGERS = [
+    ("readings", ("INSERT", "UPDATE"), lambda ref: [worker_of_patient(ref)]),
+    ("triage_reports", ("INSERT", "UPDATE", "DELETE"), lambda ref: [worker_of_patient(ref), DOCTOR_QUEUE]),
+    ("patient_alerts", ("INSERT", "UPDATE", "DELETE"), lambda ref: [worker_of_patient(ref), DOCTOR_QUEUE]),
+    ("prescriptions", ("INSERT", "UPDATE", "DELETE"), lambda ref: [worker_of_patient(ref)]),
+    ("care_workflows", ("INSERT", "UPDATE"), lambda ref: [worker_of_patient(ref)]),
+    ("patients", ("INSERT", "UPDATE", "DELETE"), lambda ref: [worker(ref, "asha_worker_phone"), DOCTOR_QUEUE]),
+    ("asha_worklists", ("INSERT", "UPDATE", "DELETE"), lambda ref: [worker(ref)]),
+    ("referrals", ("INSERT", "UPDATE", "DELETE"), lambda ref: [DOCTOR_QUEUE]),
+    ("case_summaries", ("INSERT", "UPDATE"), lambda ref: [DOCTOR_QUEUE]),
+    # District dashboard: hotspot buckets and symptom counters are written for every report
+    ("village_daily", ("INSERT", "UPDATE"), lambda ref: [district(ref)]),
+    ("symptom_daily", ("INSERT", "UPDATE", "DELETE"), lambda ref: [district(ref)]),
+    ("ministry_advisories", ("INSERT",), lambda ref: [
+        district(ref),
+        f"SELECT DISTINCT 'worker:' || asha_worker_phone FROM patients "
+        f"WHERE village = {ref}.village AND asha_worker_phone IS NOT NULL",
+    ]),
+    ("advisory_responses", ("INSERT",), lambda ref: [
+        worker(ref),
+        f"SELECT 'district:' || district FROM ministry_advisories WHERE id = {ref}.advisory_id AND district IS NOT NULL",
+    ]),
+]
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            scope TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 1
+        ) WITHOUT ROWID
+    """)
+    for table, events, sources in TRIGGERS:
+        for event in events:
+            refs = ("OLD", "NEW") if event == "UPDATE" else ("OLD",) if event == "DELETE" else ("NEW",)
+            body = "\n".join(BUMP.format(source=source) for ref in refs for source in sources(ref))
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_data_version_{table}_{event.lower()}
+                AFTER {event} ON {table} BEGIN
+                {body}
+                END
+            """)
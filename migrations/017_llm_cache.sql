@@ -0,0 +1,17 @@
+-- Migration 017: LLM Response Cache
+-- Description: Responses from OpenRouter are kept under a key built from the normalized clinical
+--              inputs of the call (symptoms, age band, vitals bucket, red flags, language), so
+--              repeated triage prompts, symptom extractions and unchanged case summaries are not
+--              sent upstream again (services/llm_cache.py). Entries expire after a TTL and the
+--              least recently used ones are evicted beyond a size limit.
+
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,          -- sha256 of agent, model, temperature and normalized inputs
+    agent TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,            -- unix time; expired after LLM_CACHE_TTL_SECONDS
+    last_used REAL NOT NULL,             -- unix time of the last hit, for LRU eviction
+    hits INTEGER NOT NULL DEFAULT 0,
+    latency_ms REAL                      -- upstream latency of the original call (saved on each hit)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used);
@@ -0,0 +1,36 @@
+"""
+Migration 018: Triage Jobs
+add_triage_report now stores the raw report with status 'processing' and queues a job;
+background workers run the triage workflow and fill in the assessment (services/triage_jobs.py).
+
+Adds triage_reports.status (existing reports are 'complete') and the durable triage_jobs queue.
+"""
+
+
+def upgrade(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(triage_reports)").fetchall()}
+    if "status" not in existing:
+        # processing -> provisional (rule-based, LLM pending) -> complete; failed = manual review
+        conn.execute("ALTER TABLE triage_reports ADD COLUMN status TEXT NOT NULL DEFAULT 'complete'")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS triage_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            report_id INTEGER NOT NULL UNIQUE,
+            patient_id INTEGER NOT NULL,
+            idempotency_key TEXT UNIQUE,          -- from the triage form; a resubmitted form finds its job
+            stage TEXT NOT NULL DEFAULT 'assess', -- assess (provisional workflow) -> upgrade (LLM)
+            status TEXT NOT NULL DEFAULT 'queued',-- queued | running | done | failed
+            payload TEXT NOT NULL,                -- JSON: triage form data, plus triage_context after assess
+            attempts INTEGER NOT NULL DEFAULT 0,  -- attempts of the current stage
+            next_run_at REAL NOT NULL,            -- unix time; retries are pushed back
+            lease_until REAL,                     -- a running job whose lease expired is picked up again
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            finished_at REAL,
+            wait_ms REAL,                         -- queued -> first assess attempt
+            assess_ms REAL,
+            upgrade_ms REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_triage_jobs_ready ON triage_jobs(status, next_run_at)")
@@ -0,0 +1,57 @@
+"""
+Migration 019: Legacy Fix-Script Columns
+Adds the columns that fix_prescriptions_schema.py, fix_db_columns.py,
+update_prescriptions_schema.py, fix_pharmacy_inventory.py and fix_advisory_schema.py
+used to add by hand. Databases built by setup_database.py predate them, and the
+baseline's CREATE TABLE IF NOT EXISTS leaves existing tables alone.
+
+Each column is added only when missing, so databases already patched by the
+scripts (or created from the baseline) are unchanged.
+"""
+
+NEW_COLUMNS = {
+    "prescriptions": [
+        ("medication", "TEXT"),
+        ("dosage", "TEXT"),
+        ("notes", "TEXT"),
+        ("is_active", "INTEGER DEFAULT 1"),
+        ("status", "TEXT DEFAULT 'Pending'"),
+        ("dispensed_by", "INTEGER"),
+        ("dispensed_at", "DATETIME"),
+    ],
+    "pharmacy_inventory": [
+        ("medication", "TEXT"),
+        ("stock_status", "TEXT"),
+        ("last_updated", "DATETIME"),
+    ],
+    "ministry_advisories": [
+        ("title", "TEXT"),
+        ("content", "TEXT"),
+        ("village", "TEXT"),
+        ("district", "TEXT DEFAULT 'Dhule'"),
+        ("urgency", "TEXT"),
+        ("sent_at", "DATETIME"),      # ALTER TABLE cannot add a CURRENT_TIMESTAMP default
+    ],
+}
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def upgrade(conn):
+    for table, columns in NEW_COLUMNS.items():
+        existing = _columns(conn, table)
+        if not existing:
+            continue  # table not created (the baseline creates it with these columns)
+        added = [name for name, _ in columns if name not in existing]
+        for name, ddl in columns:
+            if name in added:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+        if added:
+            print(f"  Added {', '.join(added)} to {table}")
+
+        # setup_database.py stored the drug name in medication_name (migration 006 did the
+        # same copy for prescriptions, but ran before the column existed on these databases)
+        if "medication" in added and "medication_name" in existing:
+            conn.execute(f"UPDATE {table} SET medication = medication_name WHERE medication IS NULL")
@@ -0,0 +1,15 @@
+-- Migration 020: Readings Data Version
+-- Bumps the 'readings' scope in data_versions whenever a reading is corrected (UPDATE) or
+-- removed (DELETE, including the move into the monthly archive tables). Caches of
+-- `readings` that pick up inserts by id (vitals store, chart series) compare this
+-- version to know when rows they already hold have changed.
+
+CREATE TRIGGER IF NOT EXISTS trg_data_version_readings_rows_update AFTER UPDATE ON readings BEGIN
+    INSERT INTO data_versions (scope) VALUES ('readings')
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_data_version_readings_rows_delete AFTER DELETE ON readings BEGIN
+    INSERT INTO data_versions (scope) VALUES ('readings')
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
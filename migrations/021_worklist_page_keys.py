@@ -0,0 +1,123 @@
+"""
+Migration 021: Worklist Page Keys
+The monitoring dashboard pages the whole caseload in card order (services/worker_dashboard.py).
+Instead of computing every patient's priority and latest triage for each page, asha_worklists
+now holds one row per caseload patient with the sort keys stored on it:
+
+- urgency_score / priority_level stay the agent's result (0 / 'LOW' for patients it did not list)
+- high_alert: the patient has an open HIGH alert (kept by triggers on patient_alerts)
+- latest_triage_date: newest triage_reports.timestamp, '' if none (triggers on triage_reports)
+- page_priority / page_score: generated from the above (an open HIGH alert lifts LOW to HIGH / 90)
+
+Triggers on patients add, move and remove the rows, so a page is one seek on
+idx_asha_worklists_page whatever the caseload size.
+"""
+
+HIGH_ALERT_SQL = ("EXISTS (SELECT 1 FROM patient_alerts a WHERE a.patient_id = asha_worklists.patient_id "
+                  "AND a.is_acknowledged = 0 AND a.severity = 'HIGH')")
+LATEST_TRIAGE_SQL = ("COALESCE((SELECT MAX(t.timestamp) FROM triage_reports t "
+                     "WHERE t.patient_id = asha_worklists.patient_id), '')")
+
+NEW_COLUMNS = [
+    ("high_alert", "INTEGER NOT NULL DEFAULT 0"),
+    ("latest_triage_date", "TEXT NOT NULL DEFAULT ''"),
+    ("page_priority", "TEXT GENERATED ALWAYS AS "
+                      "(CASE WHEN priority_level = 'LOW' AND high_alert THEN 'HIGH' ELSE priority_level END) VIRTUAL"),
+    ("page_score", "INTEGER GENERATED ALWAYS AS "
+                   "(CASE WHEN priority_level = 'LOW' AND high_alert THEN 90 ELSE urgency_score END) VIRTUAL"),
+]
+
+# A caseload patient without an agent entry
+EMPTY_ROW = "INSERT OR IGNORE INTO asha_worklists (worker_phone, patient_id, urgency_score, priority_level, patient_data)"
+
+
+def _refresh_keys(patient_ref: str, high_alert: bool = True, latest_triage: bool = True) -> str:
+    columns = []
+    if high_alert:
+        columns.append(f"high_alert = {HIGH_ALERT_SQL}")
+    if latest_triage:
+        columns.append(f"latest_triage_date = {LATEST_TRIAGE_SQL}")
+    return f"UPDATE asha_worklists SET {', '.join(columns)} WHERE patient_id = {patient_ref};"
+
+
+TRIGGERS = {
+    # Any new row (patient added or moved, agent build) starts with its current keys
+    "trg_worklist_keys_row_insert": f"""
+        AFTER INSERT ON asha_worklists BEGIN
+            {_refresh_keys("NEW.patient_id")}
+        END""",
+
+    # Caseload membership follows patients.asha_worker_phone
+    "trg_worklist_rows_patient_insert": f"""
+        AFTER INSERT ON patients WHEN NEW.asha_worker_phone IS NOT NULL BEGIN
+            {EMPTY_ROW} VALUES (NEW.asha_worker_phone, NEW.id, 0, 'LOW', '{{}}');
+        END""",
+    "trg_worklist_rows_patient_move": f"""
+        AFTER UPDATE OF asha_worker_phone ON patients
+        WHEN OLD.asha_worker_phone IS NOT NEW.asha_worker_phone BEGIN
+            DELETE FROM asha_worklists WHERE patient_id = NEW.id;
+            {EMPTY_ROW} SELECT NEW.asha_worker_phone, NEW.id, 0, 'LOW', '{{}}' WHERE NEW.asha_worker_phone IS NOT NULL;
+        END""",
+    "trg_worklist_rows_patient_delete": """
+        AFTER DELETE ON patients BEGIN
+            DELETE FROM asha_worklists WHERE patient_id = OLD.id;
+        END""",
+
+    # Open HIGH alert fallback
+    "trg_worklist_keys_alerts_insert": f"""
+        AFTER INSERT ON patient_alerts BEGIN
+            {_refresh_keys("NEW.patient_id", latest_triage=False)}
+        END""",
+    "trg_worklist_keys_alerts_update": f"""
+        AFTER UPDATE OF patient_id, severity, is_acknowledged ON patient_alerts BEGIN
+            {_refresh_keys("OLD.patient_id", latest_triage=False)}
+            {_refresh_keys("NEW.patient_id", latest_triage=False)}
+        END""",
+    "trg_worklist_keys_alerts_delete": f"""
+        AFTER DELETE ON patient_alerts BEGIN
+            {_refresh_keys("OLD.patient_id", latest_triage=False)}
+        END""",
+
+    # Latest triage date (a new report can only move it forward)
+    "trg_worklist_keys_triage_insert": """
+        AFTER INSERT ON triage_reports BEGIN
+            UPDATE asha_worklists SET latest_triage_date = NEW.timestamp
+            WHERE patient_id = NEW.patient_id AND NEW.timestamp > latest_triage_date;
+        END""",
+    "trg_worklist_keys_triage_update": f"""
+        AFTER UPDATE OF patient_id, timestamp ON triage_reports BEGIN
+            {_refresh_keys("OLD.patient_id", high_alert=False)}
+            {_refresh_keys("NEW.patient_id", high_alert=False)}
+        END""",
+    "trg_worklist_keys_triage_delete": f"""
+        AFTER DELETE ON triage_reports BEGIN
+            {_refresh_keys("OLD.patient_id", high_alert=False)}
+        END""",
+}
+
+
+def upgrade(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_xinfo(asha_worklists)").fetchall()}
+    for name, ddl in NEW_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE asha_worklists ADD COLUMN {name} {ddl}")
+
+    # One row per caseload patient: drop entries of reassigned patients, add the unlisted ones
+    conn.execute("""
+        DELETE FROM asha_worklists
+        WHERE NOT EXISTS (SELECT 1 FROM patients p
+                          WHERE p.id = asha_worklists.patient_id AND p.asha_worker_phone = asha_worklists.worker_phone)
+    """)
+    conn.execute(f"""
+        {EMPTY_ROW}
+        SELECT asha_worker_phone, id, 0, 'LOW', '{{}}' FROM patients WHERE asha_worker_phone IS NOT NULL
+    """)
+    conn.execute(f"UPDATE asha_worklists SET high_alert = {HIGH_ALERT_SQL}, latest_triage_date = {LATEST_TRIAGE_SQL}")
+
+    for name, body in TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_asha_worklists_page
+        ON asha_worklists(worker_phone, page_score DESC, latest_triage_date DESC, patient_id DESC)
+    """)
@@ -0,0 +1,71 @@
+"""
+Migration 022: Symptom Daily Triggers
+Keeps symptom_daily (migration 014) current with triggers on triage_reports and patients,
+like village_daily (migration 015): a report is counted when it is inserted, moved between
+buckets when its patient, symptoms or time change, and uncounted when it is deleted, and a
+patient's reports follow them when their district changes. The table is rebuilt once here,
+since add_triage_report used to be the only writer.
+"""
+from services.symptom_stats import CATEGORIES_SQL, category_condition_sql, rebuild_symptom_counts
+
+
+def _delta(sign: str, reports: str, district: str, where: str = "1") -> str:
+    """Add (sign '') or remove (sign '-') the reports in `reports` (aliased tr) from `district`'s counters"""
+    return f"""
+            INSERT INTO symptom_daily (district, day, category, reports)
+            SELECT {district}, substr(tr.timestamp, 1, 10), c.category, {sign}COUNT(*)
+            FROM {reports}
+            JOIN ({CATEGORIES_SQL}) c ON {category_condition_sql("tr.symptoms")}
+            WHERE {district} != '' AND tr.timestamp IS NOT NULL AND {where}
+            GROUP BY 1, 2, 3
+            ON CONFLICT(district, day, category) DO UPDATE SET reports = reports + excluded.reports;"""
+
+
+def _report(ref: str) -> str:
+    """The OLD / NEW report row with its patient"""
+    return (f"(SELECT {ref}.patient_id AS patient_id, {ref}.symptoms AS symptoms, {ref}.timestamp AS timestamp) tr "
+            "JOIN patients p ON p.id = tr.patient_id")
+
+
+def _patient_reports(ref: str) -> str:
+    return _delta("" if ref == "NEW" else "-", "triage_reports tr", f"{ref}.district", f"tr.patient_id = {ref}.id")
+
+
+TRIGGERS = {
+    "trg_symptom_daily_insert": f"""
+        AFTER INSERT ON triage_reports BEGIN
+            {_delta("", _report("NEW"), "p.district")}
+        END""",
+    "trg_symptom_daily_update": f"""
+        AFTER UPDATE OF patient_id, symptoms, timestamp ON triage_reports BEGIN
+            {_delta("-", _report("OLD"), "p.district")}
+            {_delta("", _report("NEW"), "p.district")}
+        END""",
+    "trg_symptom_daily_delete": f"""
+        AFTER DELETE ON triage_reports BEGIN
+            {_delta("-", _report("OLD"), "p.district")}
+        END""",
+
+    # Reports are counted under their patient's current district
+    "trg_symptom_daily_patient_insert": f"""
+        AFTER INSERT ON patients BEGIN
+            {_patient_reports("NEW")}
+        END""",
+    "trg_symptom_daily_patient_move": f"""
+        AFTER UPDATE OF district ON patients
+        WHEN COALESCE(OLD.district, '') != COALESCE(NEW.district, '') BEGIN
+            {_patient_reports("OLD")}
+            {_patient_reports("NEW")}
+        END""",
+    "trg_symptom_daily_patient_delete": f"""
+        AFTER DELETE ON patients BEGIN
+            {_patient_reports("OLD")}
+        END""",
+}
+
+
+def upgrade(conn):
+    for name, body in TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    rows = rebuild_symptom_counts(conn)
+    print(f"  Rebuilt {rows} symptom counter rows")
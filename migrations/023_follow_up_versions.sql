@@ -0,0 +1,25 @@
+-- Migration 023: Follow-up Data Versions
+-- Overdue follow-up visits raise a patient's urgency on the ASHA monitoring dashboard
+-- (agents/task_prioritization_agent.py), so writes to follow_up_schedule bump the
+-- 'worker:<phone>' scope of the patient's worker, like the other patient tables in migration 016.
+
+CREATE TRIGGER IF NOT EXISTS trg_data_version_follow_up_schedule_insert AFTER INSERT ON follow_up_schedule BEGIN
+    INSERT INTO data_versions (scope)
+    SELECT 'worker:' || asha_worker_phone FROM patients WHERE id = NEW.patient_id AND asha_worker_phone IS NOT NULL
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_data_version_follow_up_schedule_update AFTER UPDATE ON follow_up_schedule BEGIN
+    INSERT INTO data_versions (scope)
+    SELECT 'worker:' || asha_worker_phone FROM patients WHERE id = OLD.patient_id AND asha_worker_phone IS NOT NULL
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+    INSERT INTO data_versions (scope)
+    SELECT 'worker:' || asha_worker_phone FROM patients WHERE id = NEW.patient_id AND asha_worker_phone IS NOT NULL
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_data_version_follow_up_schedule_delete AFTER DELETE ON follow_up_schedule BEGIN
+    INSERT INTO data_versions (scope)
+    SELECT 'worker:' || asha_worker_phone FROM patients WHERE id = OLD.patient_id AND asha_worker_phone IS NOT NULL
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
@@ -1,124 +1,183 @@
-"""
-Background Task Scheduler for Rural HealthGuard
-Uses APScheduler to run daily agent tasks
-"""
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-import sqlite3
-from datetime import datetime
-
-# Import agents
-from agents.vital_trend_analyzer import analyze_all_patients
-from agents.orchestrator import orchestrator
-
-scheduler = BackgroundScheduler()
-
-def get_db_connection():
-    conn = sqlite3.connect('health.db', check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def daily_vital_analysis():
-    """Run vital trend analysis for all patients"""
-    print(f"[{datetime.now()}] 🤖 Running scheduled vital analysis...")
-    try:
-        summary = analyze_all_patients()
-        print(f"[{datetime.now()}] ✅ Vital analysis complete: {summary['total_alerts_created']} alerts created")
-    except Exception as e:
-        print(f"[{datetime.now()}] ❌ Vital analysis failed: {e}")
-
-def daily_asha_tasks():
-    """Generate daily task lists for all ASHA workers"""
-    print(f"[{datetime.now()}] 🤖 Running scheduled ASHA task generation...")
-    try:
-        conn = get_db_connection()
-        # Get all unique ASHA worker phones
-        asha_workers = conn.execute("SELECT DISTINCT asha_worker_phone FROM patients WHERE asha_worker_phone IS NOT NULL").fetchall()
-        conn.close()
-        
-        for worker in asha_workers:
-            phone = worker['asha_worker_phone']
-            if phone:
-                try:
-                    result = orchestrator.execute_daily_analysis(phone)
-                    print(f"[{datetime.now()}] ✅ Tasks generated for {phone}: {result.get('total_patients', 0)} patients")
-                except Exception as e:
-                    print(f"[{datetime.now()}] ❌ Task generation failed for {phone}: {e}")
-    except Exception as e:
-        print(f"[{datetime.now()}] ❌ ASHA task generation failed: {e}")
-
-def outbreak_check():
-    """Check for potential outbreaks across villages"""
-    print(f"[{datetime.now()}] 🤖 Running scheduled outbreak scan...")
-    try:
-        conn = get_db_connection()
-        # Check for villages with multiple high-risk cases in last 7 days
-        query = """
-            SELECT p.village, COUNT(*) as case_count
-            FROM triage_reports tr
-            JOIN patients p ON tr.patient_id = p.id
-            WHERE tr.created_at >= date('now', '-7 days')
-            AND (tr.ai_prediction LIKE '%High%' OR tr.ai_prediction LIKE '%Critical%')
-            GROUP BY p.village
-            HAVING case_count >= 3
-        """
-        hotspots = conn.execute(query).fetchall()
-        
-        for spot in hotspots:
-            print(f"[{datetime.now()}] 🚨 Potential outbreak in {spot['village']}: {spot['case_count']} cases")
-            # Could auto-create ministry advisories here
-        
-        conn.close()
-        print(f"[{datetime.now()}] ✅ Outbreak scan complete: {len(hotspots)} hotspots detected")
-    except Exception as e:
-        print(f"[{datetime.now()}] ❌ Outbreak scan failed: {e}")
-
-def init_scheduler():
-    """Initialize and start the background scheduler"""
-    global scheduler
-    
-    # Daily vital analysis at 6:00 AM
-    scheduler.add_job(
-        daily_vital_analysis,
-        CronTrigger(hour=6, minute=0),
-        id='daily_vital_analysis',
-        name='Daily Vital Trend Analysis',
-        replace_existing=True
-    )
-    
-    # Daily ASHA task generation at 5:30 AM (before vital analysis)
-    scheduler.add_job(
-        daily_asha_tasks,
-        CronTrigger(hour=5, minute=30),
-        id='daily_asha_tasks',
-        name='Daily ASHA Task Generation',
-        replace_existing=True
-    )
-    
-    # Outbreak check every 6 hours
-    scheduler.add_job(
-        outbreak_check,
-        CronTrigger(hour='*/6'),
-        id='outbreak_check',
-        name='Outbreak Detection Scan',
-        replace_existing=True
-    )
-    
-    scheduler.start()
-    print("🕐 Background scheduler initialized with 3 jobs:")
-    print("   - Daily Vital Analysis (6:00 AM)")
-    print("   - Daily ASHA Tasks (5:30 AM)")
-    print("   - Outbreak Check (Every 6 hours)")
-
-def shutdown_scheduler():
-    """Gracefully shutdown the scheduler"""
-    if scheduler.running:
-        scheduler.shutdown()
-        print("🛑 Background scheduler stopped")
-
-# For testing manually
-if __name__ == "__main__":
-    print("Testing scheduler jobs manually...")
-    daily_vital_analysis()
-    daily_asha_tasks()
-    outbreak_check()
+"""
+Background Task Scheduler for Rural HealthGuard
+Uses APScheduler to run daily agent tasks
+"""
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from datetime import datetime
+
+# Import agents
+from agents.vital_trend_analyzer import analyze_all_patients
+from agents.orchestrator import orchestrator
+from db import get_db_connection
+from services.analytics import analytics
+from services.case_summaries import case_summary_store, CASE_SUMMARY_REFRESH_SECONDS
+from services.readings_archive import archive_old_readings, ARCHIVE_HORIZON_DAYS
+from services.triage_outcome import HIGH_RISK_SQL
+
+scheduler = BackgroundScheduler()
+
+
+def daily_vital_analysis():
+    """Run vital trend analysis for all patients"""
+    print(f"[{datetime.now()}] 🤖 Running scheduled vital analysis...")
+    try:
+        summary = analyze_all_patients()
+        print(f"[{datetime.now()}] ✅ Vital analysis complete: {summary['total_alerts_created']} alerts created")
+    except Exception as e:
+        print(f"[{datetime.now()}] ❌ Vital analysis failed: {e}")
+
+def daily_asha_tasks():
+    """Generate daily task lists for all ASHA workers"""
+    print(f"[{datetime.now()}] 🤖 Running scheduled ASHA task generation...")
+    try:
+        conn = get_db_connection()
+        # Get all unique ASHA worker phones
+        asha_workers = conn.execute("SELECT DISTINCT asha_worker_phone FROM patients WHERE asha_worker_phone IS NOT NULL").fetchall()
+        conn.close()
+        
+        for worker in asha_workers:
+            phone = worker['asha_worker_phone']
+            if phone:
+                try:
+                    result = orchestrator.execute_daily_analysis(phone)
+                    print(f"[{datetime.now()}] ✅ Tasks generated for {phone}: {result.get('total_patients', 0)} patients")
+                except Exception as e:
+                    print(f"[{datetime.now()}] ❌ Task generation failed for {phone}: {e}")
+    except Exception as e:
+        print(f"[{datetime.now()}] ❌ ASHA task generation failed: {e}")
+
+def outbreak_check():
+    """Check for potential outbreaks across villages"""
+    print(f"[{datetime.now()}] 🤖 Running scheduled outbreak scan...")
+    try:
+        conn = get_db_connection()
+        # Check for villages with multiple high-risk cases in last 7 days
+        query = f"""
+            SELECT p.village, COUNT(*) as case_count
+            FROM triage_reports tr
+            JOIN patients p ON tr.patient_id = p.id
+            WHERE tr.risk IN {HIGH_RISK_SQL}
+            AND tr.timestamp >= date('now', '-7 days')
+            GROUP BY p.village
+            HAVING case_count >= 3
+        """
+        hotspots = conn.execute(query).fetchall()
+        
+        for spot in hotspots:
+            print(f"[{datetime.now()}] 🚨 Potential outbreak in {spot['village']}: {spot['case_count']} cases")
+            # Could auto-create ministry advisories here
+        
+        conn.close()
+        print(f"[{datetime.now()}] ✅ Outbreak scan complete: {len(hotspots)} hotspots detected")
+    except Exception as e:
+        print(f"[{datetime.now()}] ❌ Outbreak scan failed: {e}")
+
+def refresh_analytics_snapshot():
+    """Rebuild the Health Ministry analytics snapshot"""
+    try:
+        status = analytics.refresh()
+        print(f"[{datetime.now()}] ✅ Analytics snapshot refreshed in {status['last_refresh_ms']} ms")
+    except Exception as e:
+        print(f"[{datetime.now()}] ❌ Analytics snapshot refresh failed: {e}")
+
+def archive_readings():
+    """Move readings older than the archive horizon out of the hot table"""
+    print(f"[{datetime.now()}] 🤖 Archiving readings older than {ARCHIVE_HORIZON_DAYS} days...")
+    try:
+        result = archive_old_readings()
+        print(f"[{datetime.now()}] ✅ Archived {result['rows_archived']} readings")
+    except Exception as e:
+        print(f"[{datetime.now()}] ❌ Readings archive failed: {e}")
+
+def refresh_case_summaries():
+    """Regenerate case summaries of referred patients whose data changed"""
+    try:
+        queued = case_summary_store.refresh_outdated()
+        if queued:
+            print(f"[{datetime.now()}] 🤖 Regenerating {queued} case summaries in the background")
+    except Exception as e:
+        print(f"[{datetime.now()}] ❌ Case summary refresh failed: {e}")
+
+def init_scheduler():
+    """Initialize and start the background scheduler"""
+    global scheduler
+    
+    # Daily vital analysis at 6:00 AM
+    scheduler.add_job(
+        daily_vital_analysis,
+        CronTrigger(hour=6, minute=0),
+        id='daily_vital_analysis',
+        name='Daily Vital Trend Analysis',
+        replace_existing=True
+    )
+    
+    # Daily ASHA task generation at 5:30 AM (before vital analysis)
+    scheduler.add_job(
+        daily_asha_tasks,
+        CronTrigger(hour=5, minute=30),
+        id='daily_asha_tasks',
+        name='Daily ASHA Task Generation',
+        replace_existing=True
+    )
+    
+    # Outbreak check every 6 hours
+    scheduler.add_job(
+        outbreak_check,
+        CronTrigger(hour='*/6'),
+        id='outbreak_check',
+        name='Outbreak Detection Scan',
+        replace_existing=True
+    )
+    
+    # Analytics snapshot for the Health Ministry dashboards
+    scheduler.add_job(
+        refresh_analytics_snapshot,
+        IntervalTrigger(seconds=analytics.refresh_seconds),
+        id='analytics_refresh',
+        name='Analytics Snapshot Refresh',
+        replace_existing=True
+    )
+    
+    # Nightly readings archive at 2:00 AM
+    scheduler.add_job(
+        archive_readings,
+        CronTrigger(hour=2, minute=0),
+        id='archive_readings',
+        name='Readings Archive',
+        replace_existing=True
+    )
+    
+    # Case summaries for the doctor dashboard
+    scheduler.add_job(
+        refresh_case_summaries,
+        IntervalTrigger(seconds=CASE_SUMMARY_REFRESH_SECONDS),
+        id='case_summary_refresh',
+        name='Case Summary Refresh',
+        replace_existing=True
+    )
+    
+    if not scheduler.running:
+        scheduler.start()
+    print("🕐 Background scheduler initialized with 7 jobs:")
+    print("   - Daily Vital Analysis (6:00 AM)")
+    print("   - Daily ASHA Tasks (5:30 AM)")
+    print("   - Outbreak Check (Every 6 hours)")
+    print(f"   - Analytics Snapshot Refresh (Every {analytics.refresh_seconds}s)")
+    print("   - Readings Archive (2:00 AM)")
+    print(f"   - Case Summary Refresh (Every {CASE_SUMMARY_REFRESH_SECONDS}s)")
+    print("   - Symptom Counter Rebuild (2:30 AM)")
+
+def shutdown_scheduler():
+    """Gracefully shutdown the scheduler"""
+    if scheduler.running:
+        scheduler.shutdown()
+        print("🛑 Background scheduler stopped")
+
+# For testing manually
+if __name__ == "__main__":
+    print("Testing scheduler jobs manually...")
+    daily_vital_analysis()
+    daily_asha_tasks()
+    outbreak_check()
@@ -0,0 +1,198 @@
+"""
+Agent Execution Log Writer
+Buffers agent_logs rows in memory and writes them in batches from a background thread,
+so agent hot paths no longer open a connection and commit once per audit entry.
+
+- log_agent_execution() serializes the entry and enqueues it (never blocks).
+- The writer thread flushes with executemany in one transaction every
+  AGENT_LOG_BATCH_SIZE rows or AGENT_LOG_FLUSH_MS milliseconds, whichever comes first.
+- When the queue (AGENT_LOG_QUEUE_SIZE) is full, entries are dropped and counted.
+- Pending entries are flushed at interpreter shutdown.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict
+
+from db import get_db_connection
+
+BATCH_SIZE = int(os.getenv("AGENT_LOG_BATCH_SIZE", "100"))
+FLUSH_INTERVAL_MS = int(os.getenv("AGENT_LOG_FLUSH_MS", "500"))
+QUEUE_SIZE = int(os.getenv("AGENT_LOG_QUEUE_SIZE", "10000"))
+
+INSERT_SQL = """
+    INSERT INTO agent_logs (patient_id, agent_name, input_data, output_data, execution_time_ms)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+class AgentLogWriter:
+    """
+    Bounded queue + background writer for agent_logs.
+
+    Entries are kept in memory at most FLUSH_INTERVAL_MS (or until BATCH_SIZE
+    are waiting); a crash can lose at most that window of audit rows, never
+    clinical data.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval_ms: int = FLUSH_INTERVAL_MS,
+                 queue_size: int = QUEUE_SIZE):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # one writer at a time (thread or explicit flush)
+        self._stop = threading.Event()
+        self._pending = threading.Event()     # set when something is queued
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "max_backlog": 0,
+            "flush_ms_total": 0.0,
+            "flush_ms_max": 0.0,
+            "last_error": None,
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="agent-log-writer", daemon=True)
+                self._thread.start()
+
+    def log(self, patient_id, agent_name: str, input_data: Dict, output_data: Dict,
+            execution_time_ms: int = 0) -> bool:
+        """
+        Queue one agent_logs row
+
+        Returns:
+            False if the queue was full and the entry was dropped
+        """
+        # Serialize now: callers may keep mutating the dicts after logging
+        row = (patient_id, agent_name, json.dumps(input_data, default=str),
+               json.dumps(output_data, default=str), execution_time_ms)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["dropped"] += 1
+            return False
+
+        with self._stats_lock:
+            self._stats["enqueued"] += 1
+            self._stats["max_backlog"] = max(self._stats["max_backlog"], self._queue.qsize())
+        self._pending.set()
+        self._ensure_started()
+        return True
+
+    def _drain(self) -> list:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list):
+        start = time.perf_counter()
+        try:
+            conn = get_db_connection()
+            try:
+                with conn:
+                    conn.executemany(INSERT_SQL, batch)
+            finally:
+                conn.close()
+        except Exception as e:
+            with self._stats_lock:
+                self._stats["failed_batches"] += 1
+                self._stats["dropped"] += len(batch)
+                self._stats["last_error"] = str(e)
+            print(f"[AGENT_LOG] Failed to write {len(batch)} log entries: {e}", flush=True)
+        else:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._stats_lock:
+                self._stats["written"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["flush_ms_total"] += elapsed_ms
+                self._stats["flush_ms_max"] = max(self._stats["flush_ms_max"], elapsed_ms)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._pending.wait(self.flush_interval)
+            if self._queue.empty():
+                self._pending.clear()
+                continue
+            # Give a burst time to accumulate into one transaction
+            deadline = time.monotonic() + self.flush_interval
+            while self._queue.qsize() < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, 0.01))
+            with self._flush_lock:
+                self._pending.clear()
+                batch = self._drain()
+                if batch:
+                    self._write(batch)
+        self.flush()
+
+    def flush(self) -> int:
+        """Write everything currently queued (blocks). Returns the number of rows written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                self._write(batch)
+                written += len(batch)
+        return written
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the writer thread and flush whatever is still queued"""
+        self._stop.set()
+        self._pending.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        batches = stats["batches"] or 1
+        stats["backlog"] = self._queue.qsize()
+        stats["queue_capacity"] = self._queue.maxsize
+        stats["writer_alive"] = self._thread is not None and self._thread.is_alive()
+        stats["flush_ms_avg"] = round(stats["flush_ms_total"] / batches, 3)
+        stats["flush_ms_total"] = round(stats["flush_ms_total"], 3)
+        stats["flush_ms_max"] = round(stats["flush_ms_max"], 3)
+        return stats
+
+
+agent_log_writer = AgentLogWriter()
+
+
+def log_agent_execution(patient_id, agent_name: str, input_data: Dict, output_data: Dict,
+                        execution_time_ms: int = 0) -> bool:
+    """Queue an agent_logs entry; written asynchronously by the shared writer"""
+    return agent_log_writer.log(patient_id, agent_name, input_data, output_data, execution_time_ms)
+
+
+def agent_log_stats() -> Dict:
+    """Queued / written / dropped counters for monitoring"""
+    return agent_log_writer.stats()
+
+
+# Registered after db's close_pool, so it runs first at exit (atexit is LIFO)
+atexit.register(agent_log_writer.shutdown)
@@ -0,0 +1,584 @@
+"""
+Health Ministry Analytics Layer
+Runs district / village / time-window aggregations on a periodically refreshed
+snapshot of health.db instead of the live OLTP file the ASHA workers write to.
+
+Refresh: the live database is copied with the SQLite online-backup API (a single
+read transaction, so WAL writers are never blocked), then rolled up into two
+analytics tables:
+    triage_daily  - triage report counts per district / village / day, with
+                    high-risk and symptom-category counts precomputed
+    patient_dim   - one row per patient (district, village, ASHA)
+All ministry queries aggregate triage_daily, whose size grows with
+villages x days rather than with the number of reports.
+
+The dashboards read district_stats_cache: every district's numbers from one
+grouped pass over each table, kept for DISTRICT_STATS_TTL_SECONDS (or until the
+snapshot is rebuilt). Concurrent requests on an expired entry wait for a single
+recomputation instead of each running their own.
+
+The rollup tables live in the snapshot file itself, with indexes, and are queried
+through read-only SQLite connections. Snapshot files are named per process and
+generation ({root}.{pid}.{n}{ext}); a process removes its own at exit, and its first
+refresh removes those left behind by processes that are no longer running.
+"""
+import atexit
+import glob
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from db import get_db_connection
+from services.triage_outcome import HIGH_RISK_SQL
+
+SNAPSHOT_PATH = os.getenv("ANALYTICS_SNAPSHOT_PATH", "analytics_snapshot.db")
+REFRESH_SECONDS = int(os.getenv("ANALYTICS_REFRESH_SECONDS", "300"))
+DISTRICT_STATS_TTL = int(os.getenv("DISTRICT_STATS_TTL_SECONDS", "60"))
+
+# Reports whose patient row is gone count towards this district's total (patients.district default)
+ORPHAN_DISTRICT = "Dhule"
+
+# Chart categories on the district dashboard: category -> keywords matched in symptoms.
+# A report can count towards several categories; "Other" is reports matching none.
+SYMPTOM_CATEGORIES = {
+    "Fever": ("fever", "temperature"),
+    "Cough": ("cough", "cold", "throat"),
+    "Headache": ("headache", "pain"),
+}
+OTHER_CATEGORY = "Other"
+
+
+def _pid_alive(pid: int) -> bool:
+    """True if a process with this id is running"""
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _category_column(category: str) -> str:
+    return "sym_" + category.lower()
+
+
+def symptom_categories(symptoms: Optional[str]) -> List[str]:
+    """SYMPTOM_CATEGORIES matched by a report's symptom text, or [OTHER_CATEGORY]"""
+    text = (symptoms or "").lower()
+    matched = [c for c, keywords in SYMPTOM_CATEGORIES.items() if any(kw in text for kw in keywords)]
+    return matched or [OTHER_CATEGORY]
+
+
+def category_match_sql(category: str, column: str) -> str:
+    """SQL condition equivalent to symptom_categories() matching `category` on `column`"""
+    return " OR ".join(f"lower({column}) LIKE '%{kw}%'" for kw in SYMPTOM_CATEGORIES[category])
+
+
+def _facts_sql(src: str) -> List[str]:
+    """Statements that build the analytics tables from schema `src`"""
+    matches = [category_match_sql(category, "tr.symptoms") for category in SYMPTOM_CATEGORIES]
+    category_sums = [
+        f"SUM(CASE WHEN {match} THEN 1 ELSE 0 END) AS {_category_column(category)}"
+        for category, match in zip(SYMPTOM_CATEGORIES, matches)
+    ]
+    any_match = " OR ".join(f"({match})" for match in matches)
+    return [
+        f"""
+        CREATE TABLE triage_daily AS
+        SELECT p.district,
+               p.village,
+               CASE WHEN p.id IS NULL THEN 1 ELSE 0 END AS orphan,
+               substr(CAST(tr.timestamp AS TEXT), 1, 10) AS report_day,
+               COUNT(*) AS reports,
+               SUM(CASE WHEN tr.risk IN {HIGH_RISK_SQL} THEN 1 ELSE 0 END) AS high_risk,
+               {", ".join(category_sums)},
+               SUM(CASE WHEN {any_match} THEN 0 ELSE 1 END) AS {_category_column(OTHER_CATEGORY)}
+        FROM {src}.triage_reports tr
+        LEFT JOIN {src}.patients p ON tr.patient_id = p.id
+        GROUP BY 1, 2, 3, 4
+        """,
+        f"""
+        CREATE TABLE patient_dim AS
+        SELECT id AS patient_id, district, village, asha_worker_phone
+        FROM {src}.patients
+        """,
+    ]
+
+
+class AnalyticsEngine:
+    """Snapshot-backed aggregate queries for the Health Ministry routes"""
+
+    def __init__(self, snapshot_path: str = SNAPSHOT_PATH, refresh_seconds: int = REFRESH_SECONDS):
+        self.snapshot_path = snapshot_path
+        self.refresh_seconds = refresh_seconds
+
+        self._current_file = None     # current snapshot file
+        self._generation = 0
+        self._leftover_files = []     # old generations a reader still had open when they were discarded
+        self._refreshed_at = None     # time.time() of the last completed refresh
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._registered_cleanup = False
+        self._stats = {"refreshes": 0, "last_refresh_ms": None, "refresh_errors": 0, "queries": 0}
+
+    # --- Snapshot management ---
+
+    def refresh(self) -> Dict:
+        """Rebuild the snapshot now (blocks until done)"""
+        with self._refresh_lock:
+            start = time.perf_counter()
+            try:
+                self._build()
+            except Exception:
+                self._stats["refresh_errors"] += 1
+                raise
+            elapsed = (time.perf_counter() - start) * 1000
+            self._refreshed_at = time.time()
+            self._stats["refreshes"] += 1
+            self._stats["last_refresh_ms"] = round(elapsed, 1)
+            print(f"[ANALYTICS] Snapshot refreshed in {elapsed:.0f} ms", flush=True)
+            return self.status()
+
+    def _copy_live_database(self, target: str):
+        """Consistent copy of the live database via the online-backup API"""
+        self._discard(target)
+        source = get_db_connection()
+        dest = sqlite3.connect(target)
+        try:
+            source.backup(dest)
+        finally:
+            dest.close()
+            source.close()
+
+    def _build(self):
+        # Each refresh writes a new generation file, so queries still reading the
+        # previous one are never disturbed (an open file cannot be replaced on Windows).
+        # The pid keeps the app and scheduler processes from writing the same file.
+        if not self._registered_cleanup:
+            self._registered_cleanup = True
+            self.sweep_stale_files()
+            atexit.register(self.close)
+        self._generation += 1
+        root, ext = os.path.splitext(self.snapshot_path)
+        path = f"{root}.{os.getpid()}.{self._generation}{ext or '.db'}"
+        try:
+            self._copy_live_database(path)
+            conn = sqlite3.connect(path)
+            try:
+                for statement in _facts_sql("main"):
+                    conn.execute(statement)
+                conn.execute("CREATE INDEX idx_triage_daily_district_day ON triage_daily(district, report_day)")
+                conn.execute("CREATE INDEX idx_patient_dim_district ON patient_dim(district, village, asha_worker_phone)")
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception:
+            self._discard(path)  # a half-built generation is never served
+            raise
+        previous, self._current_file = self._current_file, path
+        leftovers, self._leftover_files = self._leftover_files + ([previous] if previous else []), []
+        for old in leftovers:
+            if not self._discard(old):
+                self._leftover_files.append(old)
+
+    def sweep_stale_files(self) -> int:
+        """
+        Delete snapshot files of processes that are no longer running (crashes, restarts)
+
+        Returns:
+            Number of snapshot generations removed
+        """
+        root, ext = os.path.splitext(self.snapshot_path)
+        pattern = re.compile(re.escape(os.path.basename(root)) + r"\.(\d+)\.\d+" + re.escape(ext or ".db") + "$")
+        removed = 0
+        for name in glob.glob(f"{glob.escape(root)}.*"):
+            base = re.sub(r"-(wal|shm|journal)$", "", name)
+            match = pattern.match(os.path.basename(base))
+            if not match or int(match.group(1)) == os.getpid() or _pid_alive(int(match.group(1))):
+                continue
+            if name == base and self._discard(base):
+                removed += 1
+            elif name != base and not os.path.exists(base):
+                self._discard(base)  # sidecar files of a snapshot that is already gone
+        return removed
+
+    def close(self):
+        """Delete this process's snapshot files (registered with atexit on the first refresh)"""
+        with self._refresh_lock:
+            files = self._leftover_files + ([self._current_file] if self._current_file else [])
+            self._current_file, self._leftover_files, self._refreshed_at = None, [], None
+            for path in files:
+                self._discard(path)
+
+    @staticmethod
+    def _discard(path: str) -> bool:
+        """Delete a snapshot file and its WAL / shared-memory / journal files; False if still in use"""
+        removed = True
+        for name in (path, f"{path}-wal", f"{path}-shm", f"{path}-journal"):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                removed = False  # still open by a reader; retried on the next refresh
+        return removed
+
+    def _refresh_in_background(self):
+        if self._refreshing:
+            return
+        self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[ANALYTICS] Background refresh failed: {e}", flush=True)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="analytics-refresh", daemon=True).start()
+
+    def ensure_snapshot(self):
+        """
+        Build the first snapshot synchronously; afterwards start a background refresh once it is stale
+
+        query() calls this; callers that only look at refreshed_at (ETags) call it themselves.
+        """
+        if self._refreshed_at is None:
+            with self._refresh_lock:
+                needs_build = self._refreshed_at is None
+            if needs_build:
+                self.refresh()
+        elif time.time() - self._refreshed_at > self.refresh_seconds:
+            self._refresh_in_background()
+
+    def status(self) -> Dict:
+        status = dict(self._stats)
+        status["snapshot_file"] = self._current_file
+        status["refresh_seconds"] = self.refresh_seconds
+        status["snapshot_age_seconds"] = (
+            round(time.time() - self._refreshed_at, 1) if self._refreshed_at else None
+        )
+        return status
+
+    @property
+    def refreshed_at(self) -> Optional[float]:
+        """time.time() of the last completed snapshot refresh"""
+        return self._refreshed_at
+
+    # --- Query execution ---
+
+    def query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        """Run a read-only query against the analytics tables"""
+        self.ensure_snapshot()
+        self._stats["queries"] += 1
+        conn = sqlite3.connect(f"file:{self._current_file}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    # --- Ministry aggregates ---
+
+    def district_overview(self) -> List[Dict]:
+        """
+        Per-district patient / ASHA / village counts with high-risk report counts
+
+        Returns:
+            Rows ordered by patient_count DESC
+        """
+        return self.query("""
+            SELECT d.district, d.patient_count, d.asha_count, d.village_count,
+                   COALESCE(r.high_risk_count, 0) AS high_risk_count
+            FROM (
+                SELECT district,
+                       COUNT(*) AS patient_count,
+                       COUNT(DISTINCT asha_worker_phone) AS asha_count,
+                       COUNT(DISTINCT village) AS village_count
+                FROM patient_dim
+                WHERE district IS NOT NULL AND district != ''
+                GROUP BY district
+            ) d
+            LEFT JOIN (
+                SELECT district, CAST(SUM(high_risk) AS INTEGER) AS high_risk_count
+                FROM triage_daily
+                GROUP BY district
+            ) r ON r.district = d.district
+            ORDER BY d.patient_count DESC
+        """)
+
+    def district_summary(self, district: str, since_days: Optional[int] = None) -> Dict:
+        """
+        Headline numbers for one district
+
+        Args:
+            district: District name
+            since_days: Only count triage reports from the last N days (None = all time)
+
+        Returns:
+            Dict with total_patients, high_risk_count, total_reports, active_workers
+        """
+        window, window_params = self._window(since_days)
+        patients = self.query("""
+            SELECT COUNT(*) AS total_patients, COUNT(DISTINCT asha_worker_phone) AS active_workers
+            FROM patient_dim WHERE district = ?
+        """, (district,))[0]
+        # Orphaned reports (no patient row) are attributed to the default district
+        reports = self.query(f"""
+            SELECT CAST(COALESCE(SUM(reports), 0) AS INTEGER) AS total_reports,
+                   CAST(COALESCE(SUM(CASE WHEN district = ? THEN high_risk ELSE 0 END), 0) AS INTEGER) AS high_risk_count
+            FROM triage_daily
+            WHERE (district = ? OR (orphan = 1 AND ? = ?))
+            AND {window}
+        """, (district, district, district, ORPHAN_DISTRICT, *window_params))[0]
+        return {
+            "total_patients": patients["total_patients"],
+            "active_workers": patients["active_workers"],
+            "total_reports": reports["total_reports"],
+            "high_risk_count": reports["high_risk_count"],
+        }
+
+    def village_high_risk_counts(self, district: Optional[str] = None,
+                                 since_days: Optional[int] = None) -> List[Dict]:
+        """High-risk report counts per village, largest first"""
+        window, params = self._window(since_days)
+        sql = f"SELECT village, CAST(SUM(high_risk) AS INTEGER) AS case_count FROM triage_daily WHERE high_risk > 0 AND {window}"
+        if district:
+            sql += " AND district = ?"
+            params.append(district)
+        sql += " GROUP BY village ORDER BY case_count DESC"
+        return self.query(sql, tuple(params))
+
+    def symptom_counts(self, district: Optional[str] = None, since_days: Optional[int] = None) -> Dict[str, int]:
+        """Report counts per SYMPTOM_CATEGORIES entry plus OTHER_CATEGORY"""
+        categories = list(SYMPTOM_CATEGORIES) + [OTHER_CATEGORY]
+        sums = ", ".join(
+            f"CAST(COALESCE(SUM({_category_column(c)}), 0) AS INTEGER) AS {_category_column(c)}" for c in categories
+        )
+        window, params = self._window(since_days)
+        sql = f"SELECT {sums} FROM triage_daily WHERE {window}"
+        if district:
+            sql += " AND district = ?"
+            params.append(district)
+        row = self.query(sql, tuple(params))[0]
+
+        return {category: row[_category_column(category)] for category in categories}
+
+    def district_stats(self) -> Dict:
+        """
+        Statistics of every district from one grouped pass over each analytics table
+
+        Returns:
+            {'districts': {name: {district, total_patients, active_workers, village_count,
+                                  total_reports, high_risk_count, villages, symptoms}},
+             'overview': district rows as returned by district_overview(),
+             'villages': high-risk counts per village across all districts,
+             'symptoms': category counts across all districts}
+        """
+        categories = list(SYMPTOM_CATEGORIES) + [OTHER_CATEGORY]
+        sums = ", ".join(f"CAST(SUM({_category_column(c)}) AS INTEGER) AS {_category_column(c)}" for c in categories)
+        patient_rows = self.query("""
+            SELECT district,
+                   COUNT(*) AS patient_count,
+                   COUNT(DISTINCT asha_worker_phone) AS asha_count,
+                   COUNT(DISTINCT village) AS village_count
+            FROM patient_dim
+            GROUP BY district
+        """)
+        report_rows = self.query(f"""
+            SELECT district, village, orphan,
+                   CAST(SUM(reports) AS INTEGER) AS reports,
+                   CAST(SUM(high_risk) AS INTEGER) AS high_risk,
+                   {sums}
+            FROM triage_daily
+            GROUP BY district, village, orphan
+        """)
+
+        districts = {}
+
+        def entry(name):
+            if name not in districts:
+                districts[name] = empty_district_stats(name)
+                districts[name]["_villages"] = {}
+            return districts[name]
+
+        for row in patient_rows:
+            if row["district"] is None:
+                continue
+            stats = entry(row["district"])
+            stats["total_patients"] = row["patient_count"]
+            stats["active_workers"] = row["asha_count"]
+            stats["village_count"] = row["village_count"]
+
+        all_villages = {}
+        all_symptoms = dict.fromkeys(categories, 0)
+        for row in report_rows:
+            high_risk = row["high_risk"] or 0
+            for category in categories:
+                all_symptoms[category] += row[_category_column(category)] or 0
+            if high_risk:
+                all_villages[row["village"]] = all_villages.get(row["village"], 0) + high_risk
+            if row["orphan"]:
+                entry(ORPHAN_DISTRICT)["total_reports"] += row["reports"]
+                continue
+            if row["district"] is None:
+                continue
+            stats = entry(row["district"])
+            stats["total_reports"] += row["reports"]
+            stats["high_risk_count"] += high_risk
+            for category in categories:
+                stats["symptoms"][category] += row[_category_column(category)] or 0
+            if high_risk:
+                stats["_villages"][row["village"]] = stats["_villages"].get(row["village"], 0) + high_risk
+
+        for stats in districts.values():
+            stats["villages"] = _village_rows(stats.pop("_villages"))
+
+        overview = [
+            {"district": s["district"], "patient_count": s["total_patients"], "asha_count": s["active_workers"],
+             "village_count": s["village_count"], "high_risk_count": s["high_risk_count"]}
+            for s in districts.values() if s["district"] and s["total_patients"]
+        ]
+        overview.sort(key=lambda row: (-row["patient_count"], row["district"]))
+        return {
+            "districts": districts,
+            "overview": overview,
+            "villages": _village_rows(all_villages),
+            "symptoms": all_symptoms,
+        }
+
+    @staticmethod
+    def _window(since_days: Optional[int]):
+        """WHERE fragment and params restricting triage_daily to the last N days"""
+        if not since_days:
+            return "1 = 1", []
+        since = time.strftime("%Y-%m-%d", time.gmtime(time.time() - since_days * 86400))
+        return "report_day >= ?", [since]
+
+
+def empty_district_stats(district: str) -> Dict:
+    """District statistics with every count at zero (a district without data)"""
+    return {
+        "district": district,
+        "total_patients": 0,
+        "active_workers": 0,
+        "village_count": 0,
+        "total_reports": 0,
+        "high_risk_count": 0,
+        "villages": [],
+        "symptoms": dict.fromkeys(list(SYMPTOM_CATEGORIES) + [OTHER_CATEGORY], 0),
+    }
+
+
+def _village_rows(counts: Dict) -> List[Dict]:
+    rows = [{"village": village, "case_count": count} for village, count in counts.items()]
+    rows.sort(key=lambda row: -row["case_count"])
+    return rows
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class DistrictStatsCache:
+    """
+    AnalyticsEngine.district_stats() cached with a TTL and single-flight recomputation
+
+    An entry expires after ttl_seconds or when the snapshot is rebuilt. The first caller
+    to find it expired recomputes; callers arriving meanwhile wait for that result.
+    """
+
+    def __init__(self, engine: AnalyticsEngine, ttl_seconds: int = DISTRICT_STATS_TTL):
+        self.engine = engine
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._value = None
+        self._computed_at = None      # time.monotonic() of the cached value
+        self._snapshot_at = None      # engine.refreshed_at the value was computed from
+        self._flight = None
+        self._stats = {"hits": 0, "computations": 0, "waits": 0, "errors": 0, "last_compute_ms": None}
+
+    def _fresh(self) -> bool:
+        return (
+            self._value is not None
+            and time.monotonic() - self._computed_at < self.ttl_seconds
+            and self._snapshot_at == self.engine.refreshed_at
+        )
+
+    def get(self) -> Dict:
+        """All-district statistics (see AnalyticsEngine.district_stats)"""
+        with self._lock:
+            if self._fresh():
+                self._stats["hits"] += 1
+                return self._value
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+            else:
+                self._stats["waits"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        start = time.perf_counter()
+        snapshot_at = self.engine.refreshed_at
+        try:
+            flight.value = self.engine.district_stats()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._value = flight.value
+                    self._computed_at = time.monotonic()
+                    # A first call builds the snapshot while computing
+                    self._snapshot_at = snapshot_at if snapshot_at is not None else self.engine.refreshed_at
+                    self._stats["computations"] += 1
+                    self._stats["last_compute_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                else:
+                    self._stats["errors"] += 1
+                self._flight = None
+            flight.done.set()
+        return flight.value
+
+    def district(self, district: str) -> Dict:
+        """Statistics of one district (all zeros when it has no data)"""
+        stats = self.get()["districts"].get(district)
+        return dict(stats) if stats else empty_district_stats(district)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            age = round(time.monotonic() - self._computed_at, 1) if self._value is not None else None
+            return {**self._stats, "ttl_seconds": self.ttl_seconds, "age_seconds": age}
+
+
+# Global analytics instance
+analytics = AnalyticsEngine()
+district_stats_cache = DistrictStatsCache(analytics)
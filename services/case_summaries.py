@@ -0,0 +1,200 @@
+"""
+Case Summary Store
+Keeps the doctor case summary of each patient (agents/doctor_case_prep_agent.py) in the
+case_summaries table (migration 012), stamped with the patient's data version.
+
+Triggers bump case_summary_versions whenever a patient's readings, triage reports,
+prescriptions or alerts change. A summary built from an older version is stale: readers
+still get it, and the patient is queued for regeneration on a background thread.
+The doctor dashboard therefore only ever reads finished summaries.
+"""
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from db import get_db_connection
+
+CASE_SUMMARY_USE_LLM = os.getenv("CASE_SUMMARY_USE_LLM", "0") == "1"
+CASE_SUMMARY_REFRESH_SECONDS = int(os.getenv("CASE_SUMMARY_REFRESH_SECONDS", "60"))
+
+# Summaries are only kept warm for patients a doctor is about to look at
+REFERRED_PATIENTS_SQL = "SELECT DISTINCT patient_id FROM referrals WHERE status = 'Pending'"
+
+
+def _current_versions(conn, patient_ids: List[int]) -> Dict[int, int]:
+    placeholders = ",".join("?" * len(patient_ids))
+    rows = conn.execute(
+        f"SELECT patient_id, version FROM case_summary_versions WHERE patient_id IN ({placeholders})",
+        patient_ids
+    ).fetchall()
+    versions = {pid: 0 for pid in patient_ids}
+    versions.update({row['patient_id']: row['version'] for row in rows})
+    return versions
+
+
+class CaseSummaryStore:
+    """Versioned case summaries with a single background generator thread"""
+
+    def __init__(self, use_llm: bool = CASE_SUMMARY_USE_LLM):
+        self.use_llm = use_llm
+        self._queue = queue.Queue()
+        self._queued = set()           # patient ids waiting in _queue (no duplicates)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stats = {"generated": 0, "failed": 0, "reads": 0, "stale_reads": 0, "missing_reads": 0,
+                       "last_generation_ms": None, "last_error": None}
+
+    # --- Reads ---
+
+    def get_summaries(self, patient_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Finished summaries for the given patients (two queries for any number of patients)
+
+        Missing or stale summaries are queued for regeneration; stale ones are still returned.
+
+        Args:
+            patient_ids: Patient IDs
+
+        Returns:
+            {patient_id: {'summary', 'generated_at', 'stale'}} for patients that have a summary
+        """
+        patient_ids = list(dict.fromkeys(patient_ids))
+        if not patient_ids:
+            return {}
+
+        conn = get_db_connection()
+        try:
+            versions = _current_versions(conn, patient_ids)
+            placeholders = ",".join("?" * len(patient_ids))
+            rows = conn.execute(f"""
+                SELECT patient_id, data_version, summary, generated_at
+                FROM case_summaries WHERE patient_id IN ({placeholders})
+            """, patient_ids).fetchall()
+        finally:
+            conn.close()
+
+        summaries = {}
+        for row in rows:
+            summaries[row['patient_id']] = {
+                "summary": row['summary'],
+                "generated_at": row['generated_at'],
+                "stale": row['data_version'] < versions[row['patient_id']]
+            }
+
+        outdated = [pid for pid in patient_ids if pid not in summaries or summaries[pid]['stale']]
+        self._stats["reads"] += len(patient_ids)
+        self._stats["missing_reads"] += len(patient_ids) - len(summaries)
+        self._stats["stale_reads"] += sum(1 for s in summaries.values() if s['stale'])
+        self.request(outdated)
+        return summaries
+
+    def get_summary(self, patient_id: int) -> Optional[Dict]:
+        """Finished summary of one patient, or None (queued for generation)"""
+        return self.get_summaries([patient_id]).get(patient_id)
+
+    # --- Generation ---
+
+    def regenerate(self, patient_id: int) -> Dict:
+        """
+        Build and store the summary of one patient now
+
+        The data version is read before generating, so changes made while the summary is
+        being built leave it stale and it is regenerated again.
+
+        Returns:
+            Dict with patient_id, data_version and generation_ms
+        """
+        from agents.doctor_case_prep_agent import prepare_case_summary
+
+        conn = get_db_connection()
+        try:
+            version = _current_versions(conn, [patient_id])[patient_id]
+        finally:
+            conn.close()
+
+        start = time.perf_counter()
+        summary = prepare_case_summary(patient_id, use_llm=self.use_llm)
+        generation_ms = int((time.perf_counter() - start) * 1000)
+
+        conn = get_db_connection()
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT INTO case_summaries (patient_id, data_version, summary, generated_at, generation_ms)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
+                    ON CONFLICT(patient_id) DO UPDATE SET
+                        data_version = excluded.data_version,
+                        summary = excluded.summary,
+                        generated_at = excluded.generated_at,
+                        generation_ms = excluded.generation_ms
+                    WHERE excluded.data_version >= case_summaries.data_version
+                """, (patient_id, version, summary, generation_ms))
+        finally:
+            conn.close()
+
+        self._stats["generated"] += 1
+        self._stats["last_generation_ms"] = generation_ms
+        return {"patient_id": patient_id, "data_version": version, "generation_ms": generation_ms}
+
+    def request(self, patient_ids: Iterable[int]):
+        """Queue patients for background regeneration (already queued ones are skipped)"""
+        with self._lock:
+            for patient_id in patient_ids:
+                if patient_id not in self._queued:
+                    self._queued.add(patient_id)
+                    self._queue.put(patient_id)
+            if self._queued and (self._worker is None or not self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name="case-summary-worker", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            patient_id = self._queue.get()
+            with self._lock:
+                self._queued.discard(patient_id)
+            try:
+                self.regenerate(patient_id)
+            except Exception as e:
+                self._stats["failed"] += 1
+                self._stats["last_error"] = str(e)
+                print(f"[CASE SUMMARY] Generation failed for patient {patient_id}: {e}", flush=True)
+            finally:
+                self._queue.task_done()
+
+    def wait(self):
+        """Block until every queued summary has been generated"""
+        self._queue.join()
+
+    def refresh_outdated(self) -> int:
+        """
+        Queue every referred patient whose summary is missing or stale (scheduler job)
+
+        Returns:
+            Number of patients queued
+        """
+        conn = get_db_connection()
+        try:
+            rows = conn.execute(f"""
+                SELECT r.patient_id
+                FROM ({REFERRED_PATIENTS_SQL}) r
+                LEFT JOIN case_summary_versions v ON v.patient_id = r.patient_id
+                LEFT JOIN case_summaries s ON s.patient_id = r.patient_id
+                WHERE s.patient_id IS NULL OR s.data_version < COALESCE(v.version, 0)
+            """).fetchall()
+        finally:
+            conn.close()
+        patient_ids = [row['patient_id'] for row in rows]
+        self.request(patient_ids)
+        return len(patient_ids)
+
+    def status(self) -> Dict:
+        status = dict(self._stats)
+        status["queued"] = len(self._queued)
+        status["use_llm"] = self.use_llm
+        status["worker_alive"] = bool(self._worker and self._worker.is_alive())
+        return status
+
+
+case_summary_store = CaseSummaryStore()
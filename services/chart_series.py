@@ -0,0 +1,253 @@
+"""
+Chart Series
+Downsampled BP and sugar series for the Chart.js charts, so a chart has a fixed number of
+points however many years of readings a patient has.
+
+Readings for the requested range come from get_readings() (hot table, archive only when the
+range reaches past the horizon) or the vitals store when it is enabled, and are reduced
+with NumPy to at most `points` per series:
+
+- lttb:   Largest-Triangle-Three-Buckets, keeps the visually significant peaks and dips
+          (BP picks points on systolic; diastolic uses the same readings)
+- bucket: equal time buckets, mean value and mean time per non-empty bucket
+
+Results are cached per patient and reused until the patient's readings change (new, archived
+or deleted rows) or any reading is corrected (the 'readings' data version).
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from db import get_db_connection
+from services.data_versions import READINGS_SCOPE, get_versions
+from services.readings_archive import get_readings
+from services.vitals_store import vitals_store
+
+CHART_DEFAULT_POINTS = int(os.getenv("CHART_DEFAULT_POINTS", "60"))
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "500"))
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "1024"))
+
+METHODS = ("lttb", "bucket")
+SERIES_TYPES = {"bp": "BP", "sugar": "SUGAR"}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps
+
+    Args:
+        x: Sorted x values (e.g. epoch seconds)
+        y: Values
+        points: Output size (the first and last point are always kept)
+
+    Returns:
+        Sorted index array of length min(points, len(x))
+    """
+    n = len(x)
+    if points >= n:
+        return np.arange(n)
+    if points < 3:
+        return np.linspace(0, n - 1, max(points, 1)).astype(np.int64)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # Bucket boundaries over the inner points (first and last are fixed)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Triangle area (doubled) between the previous pick, each candidate and the next average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def bucket_means(x: np.ndarray, values: List[np.ndarray], points: int):
+    """
+    Mean time and mean values per equal-width time bucket (empty buckets are dropped)
+
+    Returns:
+        (bucket_x, [bucket_values, ...])
+    """
+    if len(x) <= points:
+        return x, values
+    span = x[-1] - x[0]
+    bucket = np.minimum(((x - x[0]) * points // max(span, 1)).astype(np.int64), points - 1)
+    counts = np.bincount(bucket, minlength=points)
+    keep = counts > 0
+
+    def mean(v):
+        # NaN (missing diastolic) would poison the whole bucket; average the present values only
+        present = ~np.isnan(v)
+        sums = np.bincount(bucket[present], weights=v[present], minlength=points)[keep]
+        n = np.bincount(bucket[present], minlength=points)[keep]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, sums / np.maximum(n, 1), np.nan)
+
+    return mean(x.astype(np.float64)), [mean(v.astype(np.float64)) for v in values]
+
+
+def _label_format(first: float, last: float) -> str:
+    # Day-month is ambiguous once a chart spans more than a year
+    return "%d-%b" if last - first <= 366 * 86400 else "%b %Y"
+
+
+def _to_series(x: np.ndarray, values: Dict[str, np.ndarray], raw_points: int) -> Dict:
+    if not len(x):
+        return {"labels": [], "timestamps": [], **{name: [] for name in values}, "raw_points": raw_points}
+    fmt = _label_format(float(x[0]), float(x[-1]))
+    times = np.round(x).astype(np.int64).astype("datetime64[s]").tolist()
+    series = {
+        "labels": [t.strftime(fmt) for t in times],
+        "timestamps": [t.strftime("%Y-%m-%d %H:%M:%S") for t in times],
+        "raw_points": raw_points,
+    }
+    for name, v in values.items():
+        series[name] = [None if np.isnan(val) else round(float(val), 1) for val in v]
+    return series
+
+
+def _readings(patient_id: int, reading_type: str, since: Optional[datetime],
+              until: Optional[datetime], conn) -> List[Dict]:
+    if vitals_store.enabled and until is None:
+        return vitals_store.history(patient_id, reading_type, since=since)
+    return get_readings(patient_id, reading_type, since=since, until=until, conn=conn)
+
+
+def downsample(rows: List[Dict], points: int, method: str, two_values: bool) -> Dict:
+    """
+    Reduce readings (oldest first) to at most `points`
+
+    Args:
+        rows: Dicts with timestamp, value1, value2
+        points: Point budget
+        method: 'lttb' or 'bucket'
+        two_values: BP (systolic/diastolic) instead of a single value
+
+    Returns:
+        Series dict with labels, timestamps, the value lists and raw_points
+    """
+    names = ("systolic", "diastolic") if two_values else ("values",)
+    rows = [r for r in rows if r.get("value1") is not None]
+    if not rows:
+        return _to_series(np.empty(0), {name: np.empty(0) for name in names}, 0)
+
+    x = np.array([str(r["timestamp"])[:19] for r in rows], dtype="datetime64[s]").astype(np.int64)
+    v1 = np.array([r["value1"] for r in rows], dtype=np.float64)
+    columns = [v1]
+    if two_values:
+        columns.append(np.array([np.nan if r.get("value2") is None else r["value2"] for r in rows], dtype=np.float64))
+
+    order = np.argsort(x, kind="stable")
+    x, columns = x[order], [c[order] for c in columns]
+
+    if method == "bucket":
+        bx, bcols = bucket_means(x, columns, points)
+    else:
+        keep = lttb_indices(x, v1[order], points)
+        bx, bcols = x[keep], [c[keep] for c in columns]
+    return _to_series(np.asarray(bx), dict(zip(names, bcols)), len(rows))
+
+
+class ChartSeriesCache:
+    """Per-patient LRU cache of downsampled series, invalidated by a readings stamp"""
+
+    def __init__(self, max_entries: int = CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()     # key -> (stamp, series)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def _stamp(conn, patient_id: int) -> tuple:
+        # Count and max id change with new, archived or deleted readings of the patient (covering
+        # index scan); the readings data version changes when any reading is corrected in place
+        row = conn.execute(
+            "SELECT COUNT(*), MAX(id) FROM readings WHERE patient_id = ?", (patient_id,)
+        ).fetchone()
+        return tuple(row) + (get_versions([READINGS_SCOPE], conn=conn)[READINGS_SCOPE],)
+
+    def get_series(self, patient_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                   points: int = CHART_DEFAULT_POINTS, method: str = "lttb") -> Dict:
+        """
+        Downsampled BP and sugar series of one patient
+
+        Args:
+            patient_id: Patient ID
+            since: Inclusive lower bound (None = full history)
+            until: Exclusive upper bound (None = now)
+            points: Point budget per series (capped at CHART_MAX_POINTS)
+            method: 'lttb' or 'bucket'
+
+        Returns:
+            {'bp': {labels, timestamps, systolic, diastolic, raw_points},
+             'sugar': {labels, timestamps, values, raw_points}, 'points', 'method'}
+
+        Raises:
+            ValueError: On an unknown method
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        points = max(2, min(int(points), CHART_MAX_POINTS))
+        key = (patient_id, since, until, points, method)
+
+        conn = get_db_connection()
+        try:
+            stamp = self._stamp(conn, patient_id)
+            with self._lock:
+                cached = self._entries.get(key)
+                if cached and cached[0] == stamp:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return cached[1]
+                self._stats["misses"] += 1
+
+            series = {
+                name: downsample(_readings(patient_id, reading_type, since, until, conn),
+                                 points, method, two_values=(name == "bp"))
+                for name, reading_type in SERIES_TYPES.items()
+            }
+        finally:
+            conn.close()
+        series["points"] = points
+        series["method"] = method
+
+        with self._lock:
+            self._entries[key] = (stamp, series)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return series
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+chart_series_cache = ChartSeriesCache()
+
+
+def get_chart_series(patient_id: int, days: Optional[int] = None, points: int = CHART_DEFAULT_POINTS,
+                     method: str = "lttb") -> Dict:
+    """
+    Downsampled series for the last `days` days (None or 0 = full history)
+
+    The window starts at midnight so the cache key stays the same for the whole day.
+    """
+    since = None
+    if days:
+        since = datetime.combine(datetime.now().date() - timedelta(days=days), datetime.min.time())
+    return chart_series_cache.get_series(patient_id, since=since, points=points, method=method)
@@ -0,0 +1,90 @@
+"""
+Data Versions
+Per-scope change counters (migration 016) used as ETags for the dashboards.
+
+Triggers bump a scope's version in the same transaction as every write that changes what
+its page shows, so a page whose scopes all have the same versions as when the client
+fetched it is unchanged. The route reads the versions (one primary-key lookup per scope),
+builds the ETag and answers If-None-Match with 304 Not Modified before running any of
+its queries or rendering the template.
+
+ETags are the only validator: the counters change on every write, whereas Last-Modified
+has one-second resolution and could hide a second write within the same second.
+"""
+import hashlib
+import threading
+import time
+from typing import Dict, Iterable
+
+from db import get_db_connection
+
+DOCTOR_QUEUE_SCOPE = "doctor_queue"
+# Bumped when readings rows are updated or deleted (migration 020), not on insert
+READINGS_SCOPE = "readings"
+
+# Pages rendered by a previous process (different code or templates) never match
+_PROCESS_TOKEN = str(time.time())
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def worker_scope(worker_phone: str) -> str:
+    return f"worker:{worker_phone}"
+
+
+def district_scope(district: str) -> str:
+    return f"district:{district}"
+
+
+def get_versions(scopes: Iterable[str], conn=None) -> Dict[str, int]:
+    """
+    Current version of each scope (0 for a scope that was never written)
+
+    Args:
+        scopes: Scope names
+        conn: Connection to use (default: a pooled connection)
+    """
+    scopes = list(scopes)
+    if not scopes:
+        return {}
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    try:
+        placeholders = ", ".join("?" for _ in scopes)
+        rows = conn.execute(
+            f"SELECT scope, version FROM data_versions WHERE scope IN ({placeholders})", scopes
+        ).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    versions = dict.fromkeys(scopes, 0)
+    versions.update({scope: version for scope, version in rows})
+    return versions
+
+
+def make_etag(scopes: Iterable[str], *parts, conn=None) -> str:
+    """
+    ETag of a response built from `scopes`
+
+    Args:
+        scopes: Data scopes the response reads
+        *parts: Anything else the response depends on (viewer, query string, date, ...)
+        conn: Connection to use (default: a pooled connection)
+    """
+    versions = get_versions(scopes, conn=conn)
+    key = repr((_PROCESS_TOKEN, sorted(versions.items()), parts))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def record_response(page: str, not_modified: bool) -> None:
+    """Count a conditional response (see conditional_stats)"""
+    with _stats_lock:
+        counts = _stats.setdefault(page, {"not_modified": 0, "rendered": 0})
+        counts["not_modified" if not_modified else "rendered"] += 1
+
+
+def conditional_stats() -> Dict[str, Dict[str, int]]:
+    """304 and full responses per page since startup"""
+    with _stats_lock:
+        return {page: dict(counts) for page, counts in _stats.items()}
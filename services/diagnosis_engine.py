@@ -0,0 +1,164 @@
+"""
+Differential Diagnosis Engines
+Inference backends for get_differential_diagnosis() (agents/triage_agent.py), selected by
+TRIAGE_DIAGNOSIS_ENGINE:
+
+- forest: the pickled TF-IDF vectorizer + RandomForest from train_model_remedies.py
+- linear: a logistic-regression (or multinomial naive-Bayes) model exported by
+  export_linear_model() as plain NumPy arrays in one uncompressed .npz. The arrays are
+  memory-mapped, and scoring is a hand-rolled TF-IDF transform, one sparse mat-vec
+  (the non-zero columns of the coefficient matrix) and argpartition for the top N.
+  Needs numpy only, not scikit-learn.
+
+Both return [{"disease": ..., "confidence": ...}] ordered by confidence.
+"""
+import pickle
+import re
+import struct
+import zipfile
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+
+# Vectorizer settings the linear engine reproduces; export_linear_model() rejects others
+SUPPORTED_VECTORIZER = {"analyzer": "word", "ngram_range": (1, 1), "norm": "l2", "use_idf": True,
+                        "sublinear_tf": False, "binary": False, "strip_accents": None,
+                        "tokenizer": None, "preprocessor": None}
+
+
+class ForestEngine:
+    """Pickled vectorizer + RandomForest (or any classifier with predict_proba)"""
+
+    kind = "forest"
+
+    def __init__(self, model, vectorizer):
+        self.model = model
+        self.vectorizer = vectorizer
+
+    @classmethod
+    def load(cls, model_path: str, vectorizer_path: str) -> "ForestEngine":
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+        with open(vectorizer_path, 'rb') as f:
+            vectorizer = pickle.load(f)
+        return cls(model, vectorizer)
+
+    def top_n(self, symptoms_text: str, top_n: int = 3) -> List[Dict]:
+        probabilities = self.model.predict_proba(self.vectorizer.transform([symptoms_text]))[0]
+        classes = self.model.classes_
+        top_indices = probabilities.argsort()[-top_n:][::-1]
+        return [{"disease": classes[idx], "confidence": float(probabilities[idx])} for idx in top_indices]
+
+
+class LinearEngine:
+    """TF-IDF + linear scores from exported arrays; softmax gives the model's predict_proba"""
+
+    kind = "linear"
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.coef = arrays["coef"]                 # (n_classes, n_features) float32
+        self.intercept = arrays["intercept"]       # (n_classes,)
+        self.idf = arrays["idf"]                   # (n_features,)
+        self.classes = arrays["classes"]
+        self.lowercase = bool(arrays["lowercase"])
+        self.token_re = re.compile(str(arrays["token_pattern"]))
+        self.vocabulary = {term: i for i, term in enumerate(arrays["vocabulary"].tolist())}
+
+    @classmethod
+    def load(cls, path: str) -> "LinearEngine":
+        return cls(load_npz(path))
+
+    def vectorize(self, text: str):
+        """Feature indices and L2-normalized TF-IDF values of the terms in the vocabulary"""
+        if self.lowercase:
+            text = text.lower()
+        counts = Counter(self.vocabulary[t] for t in self.token_re.findall(text) if t in self.vocabulary)
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[indices]
+        norm = np.linalg.norm(values)
+        return indices, values / norm if norm else values
+
+    def probabilities(self, symptoms_text: str) -> np.ndarray:
+        indices, values = self.vectorize(symptoms_text)
+        scores = self.coef[:, indices] @ values + self.intercept
+        scores = np.exp(scores - scores.max())
+        return scores / scores.sum()
+
+    def top_n(self, symptoms_text: str, top_n: int = 3) -> List[Dict]:
+        probabilities = self.probabilities(symptoms_text)
+        top_n = min(top_n, len(probabilities))
+        top_indices = np.argpartition(probabilities, -top_n)[-top_n:]
+        top_indices = top_indices[np.argsort(probabilities[top_indices])[::-1]]
+        return [{"disease": str(self.classes[idx]), "confidence": float(probabilities[idx])} for idx in top_indices]
+
+
+def export_linear_model(path: str, vectorizer, model):
+    """
+    Write a fitted TfidfVectorizer and linear classifier as arrays for LinearEngine
+
+    Args:
+        path: Output .npz (stored uncompressed so it can be memory-mapped)
+        vectorizer: Fitted TfidfVectorizer with the SUPPORTED_VECTORIZER settings
+        model: Fitted LogisticRegression (multinomial) or MultinomialNB on its output
+    """
+    params = vectorizer.get_params()
+    unsupported = {k: params[k] for k, v in SUPPORTED_VECTORIZER.items() if params[k] != v}
+    if unsupported:
+        raise ValueError(f"Vectorizer settings not supported by the linear engine: {unsupported}")
+
+    if hasattr(model, "feature_log_prob_"):
+        # Naive Bayes: joint log-likelihood = x . log P(term|class) + log P(class)
+        coef, intercept = model.feature_log_prob_, model.class_log_prior_
+    else:
+        coef, intercept = model.coef_, model.intercept_
+        if coef.shape[0] == 1:
+            # Binary logistic regression: sigmoid(z) == softmax([0, z])
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([[0.0], intercept])
+
+    vocabulary = np.empty(len(vectorizer.vocabulary_), dtype=object)
+    for term, i in vectorizer.vocabulary_.items():
+        vocabulary[i] = term
+    np.savez(
+        path,
+        vocabulary=vocabulary.astype(str),
+        idf=vectorizer.idf_.astype(np.float32),
+        coef=np.ascontiguousarray(coef, dtype=np.float32),
+        intercept=np.asarray(intercept, dtype=np.float32),
+        classes=np.asarray(model.classes_).astype(str),
+        token_pattern=np.array(vectorizer.token_pattern),
+        lowercase=np.array(vectorizer.lowercase),
+    )
+
+
+def load_npz(path: str) -> Dict[str, np.ndarray]:
+    """
+    Arrays of an .npz file, memory-mapped when the archive is uncompressed
+
+    np.load() ignores mmap_mode for .npz archives, so the members are mapped directly
+    at their offsets in the zip file.
+    """
+    with zipfile.ZipFile(path) as archive:
+        members = archive.infolist()
+    if any(m.compress_type != zipfile.ZIP_STORED for m in members):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    arrays = {}
+    with open(path, 'rb') as f:
+        for member in members:
+            f.seek(member.header_offset)
+            name_len, extra_len = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(member.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(f)
+            name = member.filename[:-4] if member.filename.endswith(".npy") else member.filename
+            if shape == ():
+                arrays[name] = np.fromfile(f, dtype=dtype, count=1).reshape(())
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                         order='F' if fortran_order else 'C')
+    return arrays
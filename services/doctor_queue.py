@@ -0,0 +1,62 @@
+"""
+Doctor High-Risk Queue
+The "High Risk Patients" panel of the doctor dashboard: patients with an open HIGH severity
+alert, or with an unreviewed High/Critical triage report from the last 7 days.
+
+Each flagged patient appears once. Both filters are answered from indexes (migration 013),
+and the latest triage shown for alert-only patients comes from the latest_triage table
+instead of joining every report of the patient.
+"""
+from typing import Dict, List
+
+from services.triage_outcome import HIGH_RISK_SQL
+
+HIGH_RISK_WINDOW = "-7 days"
+
+HIGH_RISK_PATIENTS_SQL = f"""
+    WITH candidates AS (
+        -- Newest qualifying report per patient (SQLite takes bare columns from the MAX row)
+        SELECT patient_id, MAX(timestamp) AS triage_time, chief_complaint, 1 AS from_triage
+        FROM triage_reports
+        WHERE risk IN {HIGH_RISK_SQL}
+          AND doctor_reviewed = 0
+          AND timestamp >= datetime('now', '{HIGH_RISK_WINDOW}')
+        GROUP BY patient_id
+
+        UNION ALL
+
+        SELECT DISTINCT patient_id, NULL, NULL, 0
+        FROM patient_alerts
+        WHERE is_acknowledged = 0 AND severity = 'HIGH'
+    ),
+    flagged AS (
+        -- At most one triage candidate per patient, so MAX() picks its values over the alert's NULLs
+        SELECT patient_id, MAX(triage_time) AS triage_time, MAX(chief_complaint) AS chief_complaint,
+               MAX(from_triage) AS from_triage
+        FROM candidates
+        GROUP BY patient_id
+    )
+    SELECT p.*,
+           CASE WHEN f.from_triage THEN f.chief_complaint ELSE lt.chief_complaint END AS latest_complaint,
+           CASE WHEN f.from_triage THEN f.triage_time ELSE lt.timestamp END AS triage_time,
+           lt.risk AS latest_risk,
+           CASE WHEN f.from_triage THEN 'TRIAGE' ELSE 'ALERT' END AS source
+    FROM flagged f
+    JOIN patients p ON p.id = f.patient_id
+    LEFT JOIN latest_triage lt ON lt.patient_id = f.patient_id
+    ORDER BY triage_time DESC, p.id DESC
+"""
+
+
+def load_high_risk_patients(conn) -> List[Dict]:
+    """
+    Patients for the doctor dashboard's high-risk panel, one row each
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        Patient rows plus latest_complaint, triage_time, latest_risk and
+        source ('TRIAGE' for a high-risk report, 'ALERT' for an open HIGH alert only)
+    """
+    return [dict(row) for row in conn.execute(HIGH_RISK_PATIENTS_SQL).fetchall()]
@@ -0,0 +1,209 @@
+"""
+Live Events
+In-process publish/subscribe for the dashboards' server-sent event streams.
+
+Channels use the same scope names as services/data_versions.py:
+    worker:<phone>   - alerts on the worker's patients
+    doctor_queue     - HIGH / CRITICAL alerts (SOS included), high-risk triage alerts and new referrals
+
+Writers publish after their transaction commits. Every subscriber has a bounded queue;
+one that falls EVENT_QUEUE_SIZE events behind is disconnected, and its browser reconnects
+with Last-Event-ID and is replayed the missed events from the channel's recent history.
+Events only reach subscribers of the same process (one app process, threaded server).
+"""
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional
+
+from services.data_versions import DOCTOR_QUEUE_SCOPE, worker_scope
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "200"))
+EVENT_MAX_SUBSCRIBERS = int(os.getenv("EVENT_MAX_SUBSCRIBERS", "200"))
+EVENT_HEARTBEAT_SECONDS = int(os.getenv("EVENT_HEARTBEAT_SECONDS", "20"))
+
+DOCTOR_ALERT_SEVERITIES = ("HIGH", "CRITICAL")
+
+_CLOSED = object()
+
+
+class Subscription:
+    """One stream's queue of events on a channel"""
+
+    def __init__(self, channel: str, queue_size: int):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def get(self, timeout: float):
+        """Next event, None on timeout, _CLOSED once disconnected"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """Channels of subscribers with bounded queues and a short replay history"""
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE, history_size: int = EVENT_HISTORY_SIZE,
+                 max_subscribers: int = EVENT_MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._subscribers = {}        # channel -> set of Subscription
+        self._history = {}            # channel -> deque of recent events
+        self._stats = {"published": 0, "delivered": 0, "overflows": 0, "rejected": 0}
+
+    def publish(self, channel: str, event_type: str, data: Dict) -> int:
+        """
+        Send an event to every current subscriber of the channel
+
+        Returns:
+            The event id (also its SSE id)
+        """
+        with self._lock:
+            event = {"id": next(self._ids), "type": event_type, "data": data, "time": time.time()}
+            self._history.setdefault(channel, deque(maxlen=self.history_size)).append(event)
+            self._stats["published"] += 1
+            for sub in list(self._subscribers.get(channel, ())):
+                try:
+                    sub.queue.put_nowait(event)
+                    self._stats["delivered"] += 1
+                except queue.Full:
+                    # Too far behind: disconnect, the client resumes from history via Last-Event-ID
+                    self._stats["overflows"] += 1
+                    self._drop(sub)
+            return event["id"]
+
+    def subscribe(self, channel: str, last_event_id: Optional[int] = None) -> Optional[Subscription]:
+        """
+        Start receiving a channel's events
+
+        Args:
+            channel: Channel name
+            last_event_id: Replay the channel's retained events after this id (SSE reconnect)
+
+        Returns:
+            The subscription, or None when EVENT_MAX_SUBSCRIBERS streams are already open
+        """
+        with self._lock:
+            if sum(len(subs) for subs in self._subscribers.values()) >= self.max_subscribers:
+                self._stats["rejected"] += 1
+                return None
+            missed = []
+            if last_event_id is not None:
+                missed = [e for e in self._history.get(channel, ()) if e["id"] > last_event_id]
+            sub = Subscription(channel, self.queue_size + len(missed))
+            for event in missed:
+                sub.queue.put_nowait(event)
+            self._subscribers.setdefault(channel, set()).add(sub)
+            return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+    def _drop(self, sub: Subscription):
+        sub.overflowed = True
+        self._subscribers[sub.channel].discard(sub)
+        # Unread events are discarded too; the reconnect replays everything after the last one read
+        while True:
+            try:
+                sub.queue.get_nowait()
+            except queue.Empty:
+                break
+        sub.queue.put_nowait(_CLOSED)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+                "channels": len(self._subscribers),
+            }
+
+
+def format_sse(event: Dict) -> str:
+    """One event in text/event-stream format"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+def sse_stream(bus: EventBus, sub: Subscription, heartbeat: float = EVENT_HEARTBEAT_SECONDS) -> Iterator[str]:
+    """Yield a subscription's events as SSE text, with keep-alive comments; unsubscribes on exit"""
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            event = sub.get(timeout=heartbeat)
+            if event is _CLOSED:
+                break
+            yield format_sse(event) if event is not None else ": keep-alive\n\n"
+    finally:
+        bus.unsubscribe(sub)
+
+
+event_bus = EventBus()
+
+
+def publish_alert(conn, patient_id: int, severity: str, alert_type: str, message: str,
+                  notify_doctors: Optional[bool] = None) -> None:
+    """
+    Publish a committed patient alert to the patient's ASHA worker and, if it needs a doctor,
+    to the doctor queue
+
+    Args:
+        conn: Open database connection (used to look up the patient)
+        patient_id: Patient ID
+        severity: Alert severity
+        alert_type: Alert type (SOS_TRIGGERED, TRIAGE_RISK, VITAL_TREND_WORSENING, ...)
+        message: Alert text
+        notify_doctors: Send to the doctor queue (default: severity is HIGH or CRITICAL)
+    """
+    try:
+        patient = conn.execute(
+            "SELECT name, village, asha_worker_phone FROM patients WHERE id = ?", (patient_id,)
+        ).fetchone()
+        data = {
+            "patient_id": patient_id,
+            "patient_name": patient[0] if patient else None,
+            "village": patient[1] if patient else None,
+            "severity": severity,
+            "alert_type": alert_type,
+            "message": message,
+        }
+        if patient and patient[2]:
+            event_bus.publish(worker_scope(patient[2]), "alert", data)
+        if notify_doctors is None:
+            notify_doctors = severity in DOCTOR_ALERT_SEVERITIES
+        if notify_doctors:
+            event_bus.publish(DOCTOR_QUEUE_SCOPE, "alert", data)
+    except Exception as e:
+        # The alert is already committed; a missed live event only delays it until the next reload
+        print(f"[EVENTS] Alert event for patient {patient_id} not published: {e}", flush=True)
+
+
+def publish_referral(conn, patient_id: int, referred_by: str, reason: str, priority: str) -> None:
+    """Publish a committed referral to the doctor queue"""
+    try:
+        patient = conn.execute("SELECT name, village FROM patients WHERE id = ?", (patient_id,)).fetchone()
+        event_bus.publish(DOCTOR_QUEUE_SCOPE, "referral", {
+            "patient_id": patient_id,
+            "patient_name": patient[0] if patient else None,
+            "village": patient[1] if patient else None,
+            "referred_by": referred_by,
+            "reason": reason,
+            "priority": priority,
+        })
+    except Exception as e:
+        print(f"[EVENTS] Referral event for patient {patient_id} not published: {e}", flush=True)
@@ -0,0 +1,136 @@
+"""
+Hotspot Detection
+District-scoped outbreak signals for the Health Ministry dashboard, computed from the
+village_daily day buckets (migration 015) instead of the triage reports themselves.
+
+For every village of the district, the high-risk report count of the current window
+(the last HOTSPOT_WINDOW_DAYS days, today included) is compared with the counts of the
+HOTSPOT_BASELINE_WINDOWS windows of the same length before it, skipping
+HOTSPOT_GUARD_DAYS days in between so an outbreak that started a few days ago does not
+inflate its own baseline:
+
+- poisson: z = (x - mean) / sqrt(mean), the mean floored at HOTSPOT_MIN_EXPECTED
+- ears_c2: z = (x - mean) / sd (EARS C2 on window counts), sd floored at HOTSPOT_MIN_SD
+
+A village is a hotspot when z >= HOTSPOT_Z_THRESHOLD and it has at least
+HOTSPOT_MIN_CASES high-risk reports in the current window.
+"""
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from db import get_db_connection
+
+HOTSPOT_METHOD = os.getenv("HOTSPOT_METHOD", "poisson")  # poisson | ears_c2
+HOTSPOT_WINDOW_DAYS = int(os.getenv("HOTSPOT_WINDOW_DAYS", "7"))
+HOTSPOT_BASELINE_WINDOWS = int(os.getenv("HOTSPOT_BASELINE_WINDOWS", "4"))
+HOTSPOT_GUARD_DAYS = int(os.getenv("HOTSPOT_GUARD_DAYS", "0"))
+HOTSPOT_Z_THRESHOLD = float(os.getenv("HOTSPOT_Z_THRESHOLD", "3"))
+HOTSPOT_MIN_CASES = int(os.getenv("HOTSPOT_MIN_CASES", "2"))
+HOTSPOT_MIN_EXPECTED = 1.0
+HOTSPOT_MIN_SD = 1.0
+
+METHODS = ("poisson", "ears_c2")
+
+
+def window_index(offset: int, window_days: int, baseline_windows: int, guard_days: int) -> Optional[int]:
+    """
+    Window of a day `offset` days before today: 0 = current, 1..baseline_windows = baseline
+    (most recent first), None = in the guard gap or out of range
+    """
+    if offset < window_days:
+        return 0 if offset >= 0 else None
+    shifted = offset - window_days - guard_days
+    if shifted < 0:
+        return None
+    k = shifted // window_days + 1
+    return k if k <= baseline_windows else None
+
+
+def score(current: int, baseline: List[int], method: str = HOTSPOT_METHOD) -> Dict:
+    """
+    Signal score of a current window count against its baseline window counts
+
+    Returns:
+        Dict with expected (baseline mean), z and trend ('RISING', 'NEW', 'STABLE' or 'FALLING')
+    """
+    expected = sum(baseline) / len(baseline) if baseline else 0.0
+    if method == "ears_c2":
+        variance = sum((b - expected) ** 2 for b in baseline) / (len(baseline) - 1) if len(baseline) > 1 else 0.0
+        z = (current - expected) / max(math.sqrt(variance), HOTSPOT_MIN_SD)
+    else:
+        z = (current - expected) / math.sqrt(max(expected, HOTSPOT_MIN_EXPECTED))
+
+    if z >= HOTSPOT_Z_THRESHOLD:
+        trend = "NEW" if expected == 0 else "RISING"
+    elif z <= -HOTSPOT_Z_THRESHOLD:
+        trend = "FALLING"
+    else:
+        trend = "STABLE"
+    return {"expected": round(expected, 2), "z": round(z, 2), "trend": trend}
+
+
+def village_signals(district: str, conn=None, today=None, method: str = HOTSPOT_METHOD,
+                    window_days: int = HOTSPOT_WINDOW_DAYS, baseline_windows: int = HOTSPOT_BASELINE_WINDOWS,
+                    guard_days: int = HOTSPOT_GUARD_DAYS) -> List[Dict]:
+    """
+    Current vs baseline high-risk counts of every village in the district with any in range
+
+    Args:
+        district: District name
+        conn: Connection to use (default: a pooled connection)
+        today: Last day of the current window (default: today, UTC like the report timestamps)
+        method: 'poisson' or 'ears_c2'
+
+    Returns:
+        Rows with village, cases, baseline (counts, most recent window first), expected, z, trend,
+        hotspot; highest z first
+
+    Raises:
+        ValueError: On an unknown method
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown hotspot method: {method}")
+    today = today or datetime.utcnow().date()
+    first_day = today - timedelta(days=window_days + guard_days + baseline_windows * window_days - 1)
+
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    try:
+        rows = conn.execute(
+            """
+            SELECT village, day, high_risk FROM village_daily
+            WHERE district = ? AND day >= ? AND day <= ? AND high_risk > 0
+            """,
+            (district, first_day.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+        ).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+    counts = {}
+    for village, day, high_risk in rows:
+        offset = (today - datetime.strptime(day, "%Y-%m-%d").date()).days
+        k = window_index(offset, window_days, baseline_windows, guard_days)
+        if k is not None:
+            counts.setdefault(village, [0] * (baseline_windows + 1))[k] += high_risk
+
+    signals = []
+    for village, windows in counts.items():
+        current, baseline = windows[0], windows[1:]
+        signal = score(current, baseline, method)
+        signal.update({
+            "village": village,
+            "cases": current,
+            "baseline": baseline,
+            "hotspot": signal["trend"] in ("RISING", "NEW") and current >= HOTSPOT_MIN_CASES,
+        })
+        signals.append(signal)
+    signals.sort(key=lambda s: (-s["z"], -s["cases"], s["village"]))
+    return signals
+
+
+def detect_hotspots(district: str, conn=None, **kwargs) -> List[Dict]:
+    """Villages of the district flagged as hotspots (see village_signals)"""
+    return [signal for signal in village_signals(district, conn=conn, **kwargs) if signal["hotspot"]]
@@ -0,0 +1,334 @@
+"""
+LLM Response Cache
+Persistent cache under the LLM client (services/llm_client.py), in the llm_cache table (migration 017).
+
+Callers describe a call by the clinical inputs that decide its answer rather than by the
+exact prompt text: sorted symptoms, age band, vitals bucket, red flags, notes, language, the
+ML differential, the remedies reference and the diagnosis engine identity for triage, the normalized message for symptom extraction, the patient data for case summaries.
+Two patients with the same presentation therefore share one upstream call, so a prompt
+must contain nothing beyond its key (the triage prompt shows the age band and vitals
+buckets, not the exact values, which a shared answer could otherwise quote).
+
+- TTL: entries older than LLM_CACHE_TTL_SECONDS are ignored and removed
+- LRU: beyond LLM_CACHE_MAX_ENTRIES the least recently used entries are evicted
+- Single-flight: concurrent identical calls wait for the first one instead of going upstream
+
+Cache failures never fail the call: the response is then fetched uncached.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from db import get_db_connection
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+AGE_BANDS = [(5, "0-4"), (15, "5-14"), (30, "15-29"), (45, "30-44"), (60, "45-59")]
+# Upper bounds per bucket; the thresholds match the triage rules (BP >= 160/100, sugar >= 250 is High)
+BP_BUCKETS = [((90, 60), "low"), ((130, 85), "normal"), ((140, 90), "elevated"), ((160, 100), "high")]
+SUGAR_BUCKETS = [(70, "low"), (140, "normal"), (200, "elevated"), (250, "high")]
+
+
+# --- Key normalization ---
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, trim and collapse whitespace"""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def normalize_terms(terms: Optional[Iterable[str]]) -> list:
+    """Sorted, de-duplicated, normalized list (symptoms, red flags)"""
+    return sorted({normalize_text(t) for t in terms or [] if normalize_text(t)})
+
+
+def age_band(age) -> str:
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return "unknown"
+    for upper, band in AGE_BANDS:
+        if age < upper:
+            return band
+    return "60+"
+
+
+def bp_bucket(bp: Optional[str]) -> str:
+    """'150/95' -> 'high' (the worse of systolic and diastolic)"""
+    try:
+        systolic, diastolic = (float(v) for v in str(bp).split("/"))
+    except ValueError:
+        return "unknown"
+    for (max_sys, max_dia), bucket in BP_BUCKETS:
+        if systolic < max_sys and diastolic < max_dia:
+            return bucket
+    return "critical"
+
+
+def sugar_bucket(sugar: Optional[str]) -> str:
+    """'180 mg/dL' -> 'elevated'"""
+    try:
+        value = float(str(sugar).split()[0])
+    except (IndexError, ValueError):
+        return "unknown"
+    for upper, bucket in SUGAR_BUCKETS:
+        if value < upper:
+            return bucket
+    return "critical"
+
+
+def describe_bp(bp: Optional[str]) -> str:
+    """Prompt text of a BP bucket: '150/95' -> 'high (below 160/100)'"""
+    bucket = bp_bucket(bp)
+    for (max_sys, max_dia), name in BP_BUCKETS:
+        if name == bucket:
+            return f"{bucket} (below {max_sys}/{max_dia})"
+    if bucket == "critical":
+        max_sys, max_dia = BP_BUCKETS[-1][0]
+        return f"critical ({max_sys}/{max_dia} or above)"
+    return "not recorded"
+
+
+def describe_sugar(sugar: Optional[str]) -> str:
+    """Prompt text of a sugar bucket: '180 mg/dL' -> 'elevated (below 200 mg/dL)'"""
+    bucket = sugar_bucket(sugar)
+    for upper, name in SUGAR_BUCKETS:
+        if name == bucket:
+            return f"{bucket} (below {upper} mg/dL)"
+    if bucket == "critical":
+        return f"critical ({SUGAR_BUCKETS[-1][0]} mg/dL or above)"
+    return "not recorded"
+
+
+def triage_cache_key(age, chief_complaint: str, symptoms: Iterable[str], vitals: Dict,
+                     red_flags: Iterable[str], notes: Optional[str] = None, language: str = "en",
+                     differential: Optional[Iterable[Dict]] = None, remedies: Optional[str] = None,
+                     engine: Optional[str] = None) -> Dict:
+    """
+    Cache key of a triage prompt
+
+    Covers everything the prompt is built from, so a cached assessment never carries
+    another patient's details.
+
+    Args:
+        age: Patient age
+        chief_complaint: Chief complaint text
+        symptoms: Symptom list
+        vitals: check_critical_vitals() output
+        red_flags: Detected red flags
+        notes: Free-text worker notes (pregnancy, medication, ...)
+        language: Response language
+        differential: ML differential shown in the prompt ([] when it was not available)
+        remedies: Home remedies reference text shown in the prompt
+        engine: Diagnosis engine identity (kind and model files), None when not loaded
+
+    Returns:
+        Normalized key dict
+    """
+    return {
+        "age_band": age_band(age),
+        "complaint": normalize_text(chief_complaint),
+        "symptoms": normalize_terms(symptoms),
+        "bp": bp_bucket(vitals.get("latest_bp")),
+        "sugar": sugar_bucket(vitals.get("latest_sugar")),
+        "vitals_risk": vitals.get("risk_check"),
+        "red_flags": normalize_terms(red_flags),
+        "notes": normalize_text(notes),
+        "language": language,
+        # Ranked as in the prompt, confidences at the prompt's precision (0.1%)
+        "differential": [[d["disease"], round(float(d["confidence"]), 3)] for d in differential or []],
+        "remedies": (remedies or "").strip(),
+        "engine": engine,
+    }
+
+
+def cache_digest(agent: str, model: str, temperature: float, key: Dict) -> str:
+    material = json.dumps([agent, model, temperature, key], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# --- Cache ---
+
+class FlightWaitTimeout(Exception):
+    """An identical in-flight call did not finish within the waiting caller's deadline"""
+
+
+class _Flight:
+    """One upstream call that identical concurrent callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL, LRU eviction and single-flight"""
+
+    def __init__(self, ttl_seconds: int = LLM_CACHE_TTL_SECONDS, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 enabled: bool = LLM_CACHE_ENABLED):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "stores": 0, "expired": 0, "evictions": 0,
+                       "errors": 0, "wait_timeouts": 0, "saved_ms": 0.0}
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def get_or_call(self, agent: str, model: str, temperature: float, key: Dict, call: Callable[[], str],
+                    wait_seconds: Optional[float] = None) -> str:
+        """
+        Cached response for the key, or the result of call() (stored for next time)
+
+        Args:
+            agent: Calling agent (part of the key)
+            model: Model id (part of the key)
+            temperature: Sampling temperature (part of the key)
+            key: Normalized inputs, e.g. triage_cache_key()
+            call: Makes the upstream request and returns the response text
+            wait_seconds: How long to wait for an identical in-flight call (None: until it finishes)
+
+        Returns:
+            Response text
+
+        Raises:
+            FlightWaitTimeout: The in-flight call did not finish within wait_seconds
+        """
+        if not self.enabled:
+            return call()
+        digest = cache_digest(agent, model, temperature, key)
+
+        cached = self._lookup(digest)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            flight = self._flights.get(digest)
+            leader = flight is None
+            if leader:
+                flight = self._flights[digest] = _Flight()
+        if not leader:
+            if not flight.done.wait(wait_seconds):
+                self._count(wait_timeouts=1)
+                raise FlightWaitTimeout(f"{agent}: identical LLM call still running after {wait_seconds:.1f}s")
+            self._count(coalesced=1)
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            # A previous leader may have stored the response since our lookup
+            flight.value = self._lookup(digest)
+            if flight.value is not None:
+                return flight.value
+            self._count(misses=1)
+            start = time.monotonic()
+            flight.value = call()
+            self._store(digest, agent, flight.value, (time.monotonic() - start) * 1000)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[digest]
+            flight.done.set()
+
+    def _lookup(self, digest: str) -> Optional[str]:
+        now = time.time()
+        try:
+            conn = get_db_connection()
+            try:
+                row = conn.execute(
+                    "SELECT response, created_at, latency_ms FROM llm_cache WHERE cache_key = ?", (digest,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row["created_at"] > self.ttl_seconds:
+                    conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (digest,))
+                    conn.commit()
+                    self._count(expired=1)
+                    return None
+                conn.execute("UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE cache_key = ?", (now, digest))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[LLM CACHE] Lookup failed: {e}")
+            self._count(errors=1)
+            return None
+        self._count(hits=1, saved_ms=row["latency_ms"] or 0.0)
+        return row["response"]
+
+    def _store(self, digest: str, agent: str, response: str, latency_ms: float):
+        now = time.time()
+        try:
+            conn = get_db_connection()
+            try:
+                conn.execute("""
+                    INSERT OR REPLACE INTO llm_cache (cache_key, agent, response, created_at, last_used, hits, latency_ms)
+                    VALUES (?, ?, ?, ?, ?, 0, ?)
+                """, (digest, agent, response, now, now, latency_ms))
+                evicted = self._evict(conn, now)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[LLM CACHE] Store failed: {e}")
+            self._count(errors=1)
+            return
+        self._count(stores=1, **evicted)
+
+    def _evict(self, conn, now: float) -> Dict[str, int]:
+        expired = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        evictions = 0
+        if excess > 0:
+            evictions = conn.execute("""
+                DELETE FROM llm_cache WHERE cache_key IN (
+                    SELECT cache_key FROM llm_cache ORDER BY last_used LIMIT ?
+                )
+            """, (excess,)).rowcount
+        return {"expired": expired, "evictions": evictions}
+
+    def clear(self):
+        conn = get_db_connection()
+        try:
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        """Hit rate, saved upstream latency (ms), evictions and entry count"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round((stats["hits"] + stats["coalesced"]) / lookups, 3) if lookups else None
+        stats["saved_ms"] = round(stats["saved_ms"], 1)
+        stats.update(enabled=self.enabled, ttl_seconds=self.ttl_seconds, max_entries=self.max_entries)
+        try:
+            conn = get_db_connection()
+            try:
+                stats["entries"] = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            stats["entries"] = None
+        return stats
+
+
+# Global cache used by llm_client
+llm_cache = LLMCache()
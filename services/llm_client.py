@@ -0,0 +1,260 @@
+"""
+LLM Client
+One OpenRouter client shared by the agents (triage, chat, case summaries).
+
+- Keep-alive connection pool: a single requests.Session, so calls reuse TCP/TLS connections
+- Concurrency limits: a global semaphore plus one per agent, so a slow provider cannot tie
+  up every Flask thread; a call that cannot get a slot before its deadline fails fast
+- Deadline-aware retries: connection errors, timeouts, 429 and 5xx are retried with jittered
+  exponential backoff, but only while the call's overall deadline leaves room for it
+- Metrics: calls, retries, failures, latency percentiles and token usage per agent
+
+Calls that pass a cache_key are answered from the persistent response cache
+(services/llm_cache.py) when possible.
+
+Callers keep their own fallbacks: every failure surfaces as LLMError.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.llm_cache import FlightWaitTimeout, LLMCache, llm_cache
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "4"))
+LLM_CONNECT_TIMEOUT = 5.0
+# Per-agent concurrency, e.g. "triage=4,chat=4,case_prep=2" (unlisted agents share the global limit only)
+LLM_AGENT_CONCURRENCY = os.getenv("LLM_AGENT_CONCURRENCY", "triage=4,chat=4,case_prep=2")
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+LATENCY_SAMPLES = 200
+
+
+class LLMError(Exception):
+    """The LLM call failed (callers fall back to their non-LLM path)"""
+
+
+class LLMUnavailable(LLMError):
+    """No API key, or no free concurrency slot before the deadline"""
+
+
+def parse_agent_limits(spec: str) -> Dict[str, int]:
+    """'triage=4,chat=2' -> {'triage': 4, 'chat': 2}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        limits[name.strip()] = int(value)
+    return limits
+
+
+class LLMClient:
+    """Pooled, concurrency-limited chat-completions client"""
+
+    def __init__(self, url: str = OPENROUTER_URL, api_key: Optional[str] = None,
+                 pool_size: int = LLM_POOL_SIZE, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 agent_limits: Optional[Dict[str, int]] = None, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE, backoff_max: float = LLM_BACKOFF_MAX,
+                 cache: Optional[LLMCache] = None):
+        self.url = url
+        self.cache = cache
+        self._api_key = api_key
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.max_concurrency = max_concurrency
+        self._global = threading.BoundedSemaphore(max_concurrency)
+        limits = parse_agent_limits(LLM_AGENT_CONCURRENCY) if agent_limits is None else agent_limits
+        self._agent_limits = dict(limits)
+        self._agents = {name: threading.BoundedSemaphore(n) for name, n in limits.items()}
+
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    @property
+    def api_key(self) -> Optional[str]:
+        # Read per call: app.py loads .env after the agents are imported
+        return self._api_key or os.getenv("OPENROUTER_API_KEY")
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    # --- Metrics ---
+
+    def _agent_metrics(self, agent: str) -> Dict:
+        if agent not in self._metrics:
+            self._metrics[agent] = {
+                "calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "rejected": 0, "in_flight": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "latencies": deque(maxlen=LATENCY_SAMPLES),
+            }
+        return self._metrics[agent]
+
+    def _count(self, agent: str, **increments):
+        with self._lock:
+            metrics = self._agent_metrics(agent)
+            for key, value in increments.items():
+                metrics[key] += value
+
+    def stats(self) -> Dict:
+        """Per-agent counters, latency percentiles (ms) and token totals"""
+        with self._lock:
+            agents = {}
+            for agent, metrics in self._metrics.items():
+                latencies = sorted(metrics["latencies"])
+                entry = {key: value for key, value in metrics.items() if key != "latencies"}
+                entry["limit"] = self._agent_limits.get(agent)
+                for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("max_ms", 1.0)):
+                    entry[name] = round(latencies[min(int(q * len(latencies)), len(latencies) - 1)], 1) if latencies else None
+                agents[agent] = entry
+        stats = {"max_concurrency": self.max_concurrency, "agents": agents}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    # --- Calls ---
+
+    def _acquire(self, semaphore, deadline: float) -> bool:
+        return semaphore.acquire(timeout=max(0.0, deadline - time.monotonic()))
+
+    def chat(self, agent: str, messages: List[Dict], model: str, temperature: float = 0.7,
+             max_tokens: Optional[int] = None, deadline: Optional[float] = None,
+             cache_key: Optional[Dict] = None) -> str:
+        """
+        One chat completion
+
+        Args:
+            agent: Caller name, for the per-agent limit and metrics ('triage', 'chat', 'case_prep', ...)
+            messages: Chat messages
+            model: OpenRouter model id
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            deadline: Seconds the whole call (queueing, attempts, backoff) may take
+            cache_key: Normalized inputs that determine the answer (see services/llm_cache.py);
+                None sends the call upstream uncached
+
+        Returns:
+            The first choice's message content
+
+        Raises:
+            LLMUnavailable: No API key, or no concurrency slot (or identical cached call) before the deadline
+            LLMError: The request failed, or the deadline ran out
+        """
+        if not self.available:
+            raise LLMUnavailable("OPENROUTER_API_KEY is not set")
+        if self.cache is not None and cache_key is not None:
+            try:
+                return self.cache.get_or_call(
+                    agent, model, temperature, cache_key,
+                    lambda: self._chat(agent, messages, model, temperature, max_tokens, deadline),
+                    wait_seconds=LLM_DEADLINE_SECONDS if deadline is None else deadline,
+                )
+            except FlightWaitTimeout as e:
+                self._count(agent, rejected=1)
+                raise LLMUnavailable(str(e)) from e
+        return self._chat(agent, messages, model, temperature, max_tokens, deadline)
+
+    def _chat(self, agent, messages, model, temperature, max_tokens, deadline) -> str:
+        start = time.monotonic()
+        deadline_at = start + (LLM_DEADLINE_SECONDS if deadline is None else deadline)
+
+        agent_slot = self._agents.get(agent)
+        if agent_slot is not None and not self._acquire(agent_slot, deadline_at):
+            self._count(agent, rejected=1)
+            raise LLMUnavailable(f"{agent}: all {self._agent_limits[agent]} LLM slots busy")
+        try:
+            if not self._acquire(self._global, deadline_at):
+                self._count(agent, rejected=1)
+                raise LLMUnavailable(f"all {self.max_concurrency} LLM slots busy")
+            try:
+                self._count(agent, calls=1, in_flight=1)
+                return self._call_with_retries(agent, messages, model, temperature, max_tokens, start, deadline_at)
+            finally:
+                self._count(agent, in_flight=-1)
+                self._global.release()
+        finally:
+            if agent_slot is not None:
+                agent_slot.release()
+
+    def _call_with_retries(self, agent, messages, model, temperature, max_tokens, start, deadline_at) -> str:
+        payload = {"model": model, "messages": messages, "temperature": temperature}
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                self._count(agent, failed=1)
+                raise LLMError(f"{agent}: LLM deadline exceeded after {attempt} attempt(s)")
+            retry_after = None
+            try:
+                response = self.session.post(self.url, headers=headers, json=payload,
+                                             timeout=(min(LLM_CONNECT_TIMEOUT, remaining), remaining))
+                if response.status_code == 200:
+                    return self._finish(agent, response.json(), start)
+                error = LLMError(f"{agent}: LLM API error {response.status_code}: {response.text[:200]}")
+                if response.status_code not in RETRY_STATUS:
+                    self._count(agent, failed=1)
+                    raise error
+                retry_after = _retry_after_seconds(response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = LLMError(f"{agent}: LLM request failed: {e}")
+            except ValueError as e:
+                self._count(agent, failed=1)
+                raise LLMError(f"{agent}: malformed LLM response: {e}") from e
+
+            # Full jitter keeps simultaneous retries from hitting the provider together
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if attempt >= self.max_retries or time.monotonic() + delay >= deadline_at:
+                self._count(agent, failed=1)
+                raise error
+            attempt += 1
+            self._count(agent, retries=1)
+            time.sleep(delay)
+
+    def _finish(self, agent: str, body: Dict, start: float) -> str:
+        try:
+            content = body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            self._count(agent, failed=1)
+            raise LLMError(f"{agent}: unexpected LLM response shape: {e}") from e
+        usage = body.get("usage") or {}
+        with self._lock:
+            metrics = self._agent_metrics(agent)
+            metrics["succeeded"] += 1
+            metrics["prompt_tokens"] += usage.get("prompt_tokens") or 0
+            metrics["completion_tokens"] += usage.get("completion_tokens") or 0
+            metrics["latencies"].append((time.monotonic() - start) * 1000)
+        return content
+
+
+def _retry_after_seconds(response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+# Global client shared by all agents
+llm_client = LLMClient(cache=llm_cache)
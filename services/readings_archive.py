@@ -0,0 +1,197 @@
+"""
+Readings Archive
+Keeps the hot `readings` table small by moving old rows into per-month archive
+tables, and routes reads to the archive only when the requested range needs it.
+
+- archive_old_readings() moves readings older than the horizon into
+  readings_archive_YYYYMM (run daily by the scheduler).
+- get_readings() is the read helper: recent windows (the 7-day trend analysis,
+  dashboard charts) hit only `readings`; longer ranges transparently UNION ALL
+  the archive months that overlap the range.
+"""
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from db import get_db_connection
+
+ARCHIVE_HORIZON_DAYS = int(os.getenv("READINGS_ARCHIVE_HORIZON_DAYS", "180"))
+ARCHIVE_TABLE_PREFIX = "readings_archive_"
+READING_COLUMNS = ("id", "patient_id", "reading_type", "value1", "value2", "timestamp")
+
+_ARCHIVE_TABLE_RE = re.compile(r"^readings_archive_\d{6}$")
+_TIME_ALIAS_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _archive_table(month: str) -> str:
+    """'2025-03' -> 'readings_archive_202503'"""
+    return ARCHIVE_TABLE_PREFIX + month.replace("-", "")
+
+
+def _format_ts(value: datetime) -> str:
+    # Same text format SQLite's CURRENT_TIMESTAMP writes, so string comparison works
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def archive_old_readings(horizon_days: Optional[int] = None, now: Optional[datetime] = None) -> Dict:
+    """
+    Move readings older than the horizon into per-month archive tables
+
+    Each month is moved in its own transaction (copy, delete, update registry),
+    so the job can be interrupted and re-run safely.
+
+    Args:
+        horizon_days: Keep this many days in the hot table (default READINGS_ARCHIVE_HORIZON_DAYS)
+        now: Reference time (tests)
+
+    Returns:
+        Dict with cutoff, rows_archived and per-month counts
+    """
+    horizon_days = ARCHIVE_HORIZON_DAYS if horizon_days is None else horizon_days
+    cutoff = _format_ts((now or datetime.now()) - timedelta(days=horizon_days))
+
+    conn = get_db_connection()
+    try:
+        months = [row[0] for row in conn.execute(
+            "SELECT DISTINCT substr(timestamp, 1, 7) FROM readings WHERE timestamp < ? ORDER BY 1",
+            (cutoff,)
+        ).fetchall()]
+
+        moved = {}
+        for month in months:
+            table = _archive_table(month)
+            month_filter = "timestamp < ? AND timestamp >= ? AND timestamp < ?"
+            start = f"{month}-01"
+            year, mon = int(month[:4]), int(month[5:7])
+            end = f"{year + mon // 12:04d}-{mon % 12 + 1:02d}-01"
+            params = (cutoff, start, end)
+
+            with conn:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id INTEGER PRIMARY KEY,
+                        patient_id INTEGER,
+                        reading_type TEXT NOT NULL,
+                        value1 INTEGER NOT NULL,
+                        value2 INTEGER,
+                        timestamp DATETIME
+                    )
+                """)
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_patient_type_ts "
+                    f"ON {table}(patient_id, reading_type, timestamp, value1, value2)"
+                )
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO {table} ({", ".join(READING_COLUMNS)})
+                    SELECT {", ".join(READING_COLUMNS)} FROM readings WHERE {month_filter}
+                """, params)
+                count = conn.execute(f"DELETE FROM readings WHERE {month_filter}", params).rowcount
+                conn.execute(f"""
+                    INSERT INTO readings_archive_index (month, table_name, row_count, min_timestamp, max_timestamp)
+                    SELECT ?, ?, COUNT(*), MIN(timestamp), MAX(timestamp) FROM {table} WHERE 1
+                    ON CONFLICT(month) DO UPDATE SET
+                        row_count = excluded.row_count,
+                        min_timestamp = excluded.min_timestamp,
+                        max_timestamp = excluded.max_timestamp,
+                        archived_at = CURRENT_TIMESTAMP
+                """, (month, table))
+            moved[month] = count
+
+        total = sum(moved.values())
+        print(f"[ARCHIVE] Moved {total} readings older than {cutoff} into {len(moved)} monthly tables", flush=True)
+        return {"cutoff": cutoff, "rows_archived": total, "months": moved}
+    finally:
+        conn.close()
+
+
+def _archive_tables_for_range(conn, since: Optional[str], until: Optional[str]) -> List[str]:
+    """Archive tables (newest first) whose time range overlaps [since, until)"""
+    sql = "SELECT table_name FROM readings_archive_index WHERE row_count > 0"
+    params = []
+    if since:
+        sql += " AND max_timestamp >= ?"
+        params.append(since)
+    if until:
+        sql += " AND min_timestamp < ?"
+        params.append(until)
+    sql += " ORDER BY month DESC"
+    tables = [row[0] for row in conn.execute(sql, params).fetchall()]
+    return [t for t in tables if _ARCHIVE_TABLE_RE.match(t)]
+
+
+def get_readings(patient_id: int, reading_type: Optional[str] = None,
+                 since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 limit: Optional[int] = None, newest_first: bool = False,
+                 time_formats: Optional[Dict[str, str]] = None, conn=None) -> List[Dict]:
+    """
+    Fetch a patient's readings from the hot table, and from the archive only if needed
+
+    Args:
+        patient_id: Patient ID
+        reading_type: 'BP', 'SUGAR', ... (None = all types)
+        since: Inclusive lower bound (None = full history, includes the archive)
+        until: Exclusive upper bound
+        limit: Maximum rows
+        newest_first: Sort by timestamp DESC instead of ASC
+        time_formats: Extra columns as {alias: strftime format}, e.g. {'chart_time': '%d-%b'}
+        conn: Existing connection to reuse
+
+    Returns:
+        List of reading dicts ordered by timestamp
+    """
+    since_ts = _format_ts(since) if since else None
+    until_ts = _format_ts(until) if until else None
+
+    columns = list(READING_COLUMNS)
+    format_params = []
+    for alias, fmt in (time_formats or {}).items():
+        if not _TIME_ALIAS_RE.match(alias):
+            raise ValueError(f"Invalid column alias: {alias}")
+        columns.append(f"strftime(?, timestamp) AS {alias}")
+        format_params.append(fmt)
+
+    where = ["patient_id = ?"]
+    where_params = [patient_id]
+    if reading_type:
+        where.append("reading_type = ?")
+        where_params.append(reading_type)
+    if since_ts:
+        where.append("timestamp >= ?")
+        where_params.append(since_ts)
+    if until_ts:
+        where.append("timestamp < ?")
+        where_params.append(until_ts)
+
+    def select(table):
+        return f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(where)}"
+
+    direction = "DESC" if newest_first else "ASC"
+    own_connection = conn is None
+    if own_connection:
+        conn = get_db_connection()
+    try:
+        tables = ["readings"] + _archive_tables_for_range(conn, since_ts, until_ts)
+        row_params = format_params + where_params
+
+        if newest_first and limit:
+            # Fill newest-first from the hot table, then older months only while short
+            rows = []
+            for table in tables:
+                rows.extend(conn.execute(
+                    f"{select(table)} ORDER BY timestamp DESC LIMIT ?",
+                    row_params + [limit - len(rows)]
+                ).fetchall())
+                if len(rows) >= limit:
+                    break
+            return [dict(r) for r in rows]
+
+        sql = " UNION ALL ".join(select(table) for table in tables) + f" ORDER BY timestamp {direction}"
+        params = row_params * len(tables)
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(r) for r in conn.execute(sql, params).fetchall()]
+    finally:
+        if own_connection:
+            conn.close()
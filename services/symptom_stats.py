@@ -0,0 +1,104 @@
+"""
+District Symptom Statistics
+Per-district, per-day report counts for each symptom chart category
+(SYMPTOM_CATEGORIES plus OTHER_CATEGORY), kept in the symptom_daily table (migration 014).
+
+Triggers on triage_reports and patients (migration 022) keep the counters in step with
+every report insert, edit and delete and with patients changing district, in the same
+transaction as the change, so the district dashboard chart is a primary-key range
+lookup instead of a scan of every report's symptom text. A report counts towards
+every category it matches, exactly like the analytics snapshot; reports without
+symptom text count as OTHER_CATEGORY.
+
+rebuild_symptom_counts() recomputes the table from triage_reports (backfill).
+"""
+import time
+from typing import Dict, Optional
+
+from db import get_db_connection
+from services.analytics import OTHER_CATEGORY, SYMPTOM_CATEGORIES, category_match_sql
+
+CATEGORIES = list(SYMPTOM_CATEGORIES) + [OTHER_CATEGORY]
+
+
+# One row per chart category, joined on category_condition_sql()
+CATEGORIES_SQL = " UNION ALL ".join(f"SELECT '{category}' AS category" for category in CATEGORIES)
+
+
+def category_condition_sql(column: str, category_column: str = "c.category") -> str:
+    """
+    SQL condition equivalent to symptom_categories() matching the category in `category_column`
+
+    Args:
+        column: Symptom text column (NULL counts as OTHER_CATEGORY)
+        category_column: Column holding a CATEGORIES entry (a CATEGORIES_SQL row)
+    """
+    text = f"COALESCE({column}, '')"
+    matches = {category: category_match_sql(category, text) for category in SYMPTOM_CATEGORIES}
+    branches = " ".join(f"WHEN '{category}' THEN ({match})" for category, match in matches.items())
+    other = "NOT (" + " OR ".join(f"({match})" for match in matches.values()) + ")"
+    return f"CASE {category_column} {branches} ELSE {other} END"
+
+
+def rebuild_symptom_counts(conn=None) -> int:
+    """
+    Recompute symptom_daily from triage_reports (backfill; the triggers keep it current)
+
+    Args:
+        conn: Connection to use (default: a pooled connection, committed here)
+
+    Returns:
+        Number of (district, day, category) rows written
+    """
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    try:
+        conn.execute("DELETE FROM symptom_daily")
+        cursor = conn.execute(f"""
+            INSERT INTO symptom_daily (district, day, category, reports)
+            SELECT p.district, substr(tr.timestamp, 1, 10), c.category, COUNT(*)
+            FROM triage_reports tr
+            JOIN patients p ON p.id = tr.patient_id
+            JOIN ({CATEGORIES_SQL}) c ON {category_condition_sql("tr.symptoms")}
+            WHERE p.district != '' AND tr.timestamp IS NOT NULL
+            GROUP BY 1, 2, 3
+        """)
+        if own_conn:
+            conn.commit()
+        return cursor.rowcount
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def district_symptom_counts(district: str, since_days: Optional[int] = None, conn=None) -> Dict[str, int]:
+    """
+    Report counts per chart category for one district
+
+    Args:
+        district: District name
+        since_days: Only count the last N days (None = all time)
+        conn: Connection to use (default: a pooled connection)
+
+    Returns:
+        {category: count} for every SYMPTOM_CATEGORIES entry and OTHER_CATEGORY
+    """
+    since = "0000-00-00"
+    if since_days:
+        since = time.strftime("%Y-%m-%d", time.gmtime(time.time() - since_days * 86400))
+
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    try:
+        rows = conn.execute(
+            "SELECT category, SUM(reports) FROM symptom_daily WHERE district = ? AND day >= ? GROUP BY category",
+            (district, since)
+        ).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    counts = dict.fromkeys(CATEGORIES, 0)
+    for category, reports in rows:
+        if category in counts:
+            counts[category] = reports
+    return counts
@@ -0,0 +1,402 @@
+"""
+Triage Jobs
+Durable queue that runs the triage workflow off the request (triage_jobs table, migration 018).
+
+add_triage_report inserts the raw report with status 'processing' and a job in the same
+transaction, then redirects. Worker threads claim jobs and run them in two stages:
+
+- assess: the time-budgeted workflow (agents/orchestrator.py). Stores the rule-based
+  assessment and raises the risk alert; the report becomes 'provisional' when an LLM
+  upgrade follows, otherwise 'complete'
+- upgrade: the LLM assessment is written over the provisional one. A doctor alert is added
+  only when the alert severity goes up; red flags and high vitals keep the risk at High
+
+Each stage's writes and the job's next state commit together. A failed attempt is retried
+with exponential backoff up to TRIAGE_JOB_MAX_ATTEMPTS; a job whose worker died is picked up
+again when its lease expires. An assess stage that keeps failing leaves the report for
+manual review; an upgrade that keeps failing leaves the rule-based assessment in place.
+"""
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Optional
+
+from db import get_db_connection
+from services.events import publish_alert
+from services.triage_outcome import (decode_assessment, encode_assessment, outcome_columns, risk_rank,
+                                     triage_alert)
+
+TRIAGE_JOB_WORKERS = int(os.getenv("TRIAGE_JOB_WORKERS", "2"))
+TRIAGE_JOB_MAX_ATTEMPTS = int(os.getenv("TRIAGE_JOB_MAX_ATTEMPTS", "3"))
+TRIAGE_JOB_RETRY_SECONDS = float(os.getenv("TRIAGE_JOB_RETRY_SECONDS", "10"))
+TRIAGE_JOB_LEASE_SECONDS = float(os.getenv("TRIAGE_JOB_LEASE_SECONDS", "120"))
+TRIAGE_JOB_POLL_SECONDS = float(os.getenv("TRIAGE_JOB_POLL_SECONDS", "5"))
+
+ALERT_SEVERITY_RANK = {None: 0, "MODERATE": 1, "HIGH": 2}
+LATENCY_SAMPLES = 200
+
+# Ready jobs: due, or running under an expired lease. Assess stages go first (the ASHA is waiting).
+# The first claim of a job records its queue wait (created -> first assess attempt).
+CLAIM_SQL = """
+    UPDATE triage_jobs
+    SET status = 'running', attempts = attempts + 1, lease_until = :lease,
+        wait_ms = COALESCE(wait_ms, (:now - created_at) * 1000)
+    WHERE id = (
+        SELECT id FROM triage_jobs
+        WHERE (status = 'queued' AND next_run_at <= :now) OR (status = 'running' AND lease_until < :now)
+        ORDER BY stage = 'upgrade', next_run_at
+        LIMIT 1
+    )
+    RETURNING *
+"""
+
+
+class DuplicateSubmission(Exception):
+    """The triage form with this idempotency key was already submitted"""
+
+    def __init__(self, report_id: int):
+        super().__init__(f"already submitted as report {report_id}")
+        self.report_id = report_id
+
+
+def new_idempotency_key() -> str:
+    return uuid.uuid4().hex
+
+
+def enqueue_triage(conn, patient_id: int, triage_data: Dict, symptoms_text: str,
+                   idempotency_key: Optional[str] = None) -> int:
+    """
+    Insert a 'processing' report and its job (the caller commits)
+
+    Args:
+        conn: Open database connection
+        patient_id: Patient ID
+        triage_data: age, chief_complaint, symptoms, notes
+        symptoms_text: Symptoms as stored on the report
+        idempotency_key: Key of the submitted form
+
+    Returns:
+        The new report id
+
+    Raises:
+        DuplicateSubmission: A report was already queued for this key
+    """
+    if idempotency_key:
+        existing = conn.execute("SELECT report_id FROM triage_jobs WHERE idempotency_key = ?",
+                                (idempotency_key,)).fetchone()
+        if existing:
+            raise DuplicateSubmission(existing["report_id"])
+    cursor = conn.execute(
+        "INSERT INTO triage_reports (patient_id, chief_complaint, symptoms, notes, status) VALUES (?, ?, ?, ?, 'processing')",
+        (patient_id, triage_data.get("chief_complaint"), symptoms_text, triage_data.get("notes"))
+    )
+    report_id = cursor.lastrowid
+    now = time.time()
+    try:
+        conn.execute("""
+            INSERT INTO triage_jobs (report_id, patient_id, idempotency_key, payload, next_run_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (report_id, patient_id, idempotency_key, json.dumps({"triage_data": triage_data}), now, now))
+    except sqlite3.IntegrityError:
+        # A concurrent submission of the same form won the race
+        conn.rollback()
+        existing = conn.execute("SELECT report_id FROM triage_jobs WHERE idempotency_key = ?",
+                                (idempotency_key,)).fetchone()
+        raise DuplicateSubmission(existing["report_id"] if existing else None)
+    return report_id
+
+
+def _store_assessment(conn, report_id: int, patient_id: int, workflow_result: Dict, status: str) -> Optional[tuple]:
+    """
+    Write a workflow result over a report (no commit)
+
+    Returns:
+        (severity, message) of a new doctor alert, if the alert severity went up
+    """
+    decision_data = workflow_result["final_decision"]
+    triage_output = workflow_result["triage_assessment"]
+    outcome = outcome_columns(decision_data, triage_output)
+
+    row = conn.execute("SELECT risk, primary_diagnosis FROM triage_reports WHERE id = ?", (report_id,)).fetchone()
+    previous_alert = triage_alert(row["risk"], row["primary_diagnosis"]) if row else None
+    alert = triage_alert(outcome["risk"], outcome["primary_diagnosis"])
+    if ALERT_SEVERITY_RANK[(alert or (None,))[0]] <= ALERT_SEVERITY_RANK[(previous_alert or (None,))[0]]:
+        alert = None
+
+    conn.execute("""
+        UPDATE triage_reports
+        SET assessment = ?, risk = ?, decision = ?, primary_diagnosis = ?, red_flag_count = ?, status = ?
+        WHERE id = ?
+    """, (encode_assessment(triage_output, decision_data), outcome["risk"], outcome["decision"],
+          outcome["primary_diagnosis"], outcome["red_flag_count"], status, report_id))
+    if alert:
+        conn.execute(
+            "INSERT INTO patient_alerts (patient_id, alert_type, severity, message, vital_name) VALUES (?, ?, ?, ?, ?)",
+            (patient_id, "TRIAGE_RISK", alert[0], alert[1], "TRIAGE")
+        )
+    return alert
+
+
+def _finalize_provisional(conn, report_id: int):
+    """The rule-based assessment stands: drop the provisional mark (no commit)"""
+    row = conn.execute("SELECT assessment FROM triage_reports WHERE id = ?", (report_id,)).fetchone()
+    assessment = decode_assessment(row["assessment"]) if row else None
+    if assessment:
+        assessment.get("triage", {}).pop("provisional", None)
+        conn.execute("UPDATE triage_reports SET assessment = ? WHERE id = ?",
+                     (encode_assessment(assessment.get("triage"), assessment.get("decision")), report_id))
+    conn.execute("UPDATE triage_reports SET status = 'complete' WHERE id = ?", (report_id,))
+
+
+class LLMUpgradeUnavailable(Exception):
+    """The LLM gave no usable assessment (the upgrade is retried, then given up)"""
+
+
+class TriageJobQueue:
+    """Worker pool over the triage_jobs table"""
+
+    def __init__(self, workers: int = TRIAGE_JOB_WORKERS, max_attempts: int = TRIAGE_JOB_MAX_ATTEMPTS,
+                 retry_seconds: float = TRIAGE_JOB_RETRY_SECONDS, lease_seconds: float = TRIAGE_JOB_LEASE_SECONDS,
+                 poll_seconds: float = TRIAGE_JOB_POLL_SECONDS):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._latency = {name: deque(maxlen=LATENCY_SAMPLES) for name in ("wait", "assess", "upgrade")}
+        self._stats = {"assessed": 0, "upgraded": 0, "kept_provisional": 0, "retries": 0, "failed": 0,
+                       "duplicates": 0, "risk_raised": 0, "risk_lowered": 0, "last_error": None}
+
+    # --- Workers ---
+
+    def start(self):
+        """Start the worker threads (idempotent; jobs left from a previous run are picked up)"""
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f"triage-job-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """Wake a worker for a newly committed job"""
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        from agents.triage_agent import warm_up
+
+        warm_up()  # the first job should not pay for loading the disease model
+        while True:
+            try:
+                worked = self.process_one()
+            except Exception as e:
+                # Claiming failed (e.g. database locked); try again after the poll interval
+                print(f"[TRIAGE JOBS] Worker error: {e}", flush=True)
+                worked = False
+            if not worked:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+    def _claim(self) -> Optional[Dict]:
+        now = time.time()
+        conn = get_db_connection()
+        try:
+            row = conn.execute(CLAIM_SQL, {"now": now, "lease": now + self.lease_seconds}).fetchone()
+            conn.commit()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def process_one(self) -> bool:
+        """
+        Claim and run one ready job
+
+        Returns:
+            False if no job was ready
+        """
+        job = self._claim()
+        if job is None:
+            return False
+        try:
+            if job["stage"] == "assess":
+                self._assess(job)
+            else:
+                self._upgrade(job)
+        except Exception as e:
+            self._failed_attempt(job, e)
+        return True
+
+    def run_pending(self) -> int:
+        """Run ready jobs on the calling thread until none is left (tests, scripts)"""
+        count = 0
+        while self.process_one():
+            count += 1
+        return count
+
+    # --- Stages ---
+
+    def _assess(self, job: Dict):
+        from agents.orchestrator import orchestrator
+
+        if job["attempts"] == 1:
+            self._record("wait", job["wait_ms"])
+        payload = json.loads(job["payload"])
+        start = time.perf_counter()
+        result = orchestrator.execute_triage_workflow(job["patient_id"], payload["triage_data"])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        conn = get_db_connection()
+        try:
+            alert = _store_assessment(conn, job["report_id"], job["patient_id"], result,
+                                      "provisional" if result.get("provisional") else "complete")
+            if result.get("provisional"):
+                payload["triage_context"] = result["triage_context"]
+                conn.execute("""
+                    UPDATE triage_jobs
+                    SET stage = 'upgrade', status = 'queued', attempts = 0, payload = ?, next_run_at = ?,
+                        lease_until = NULL, last_error = NULL, assess_ms = ?
+                    WHERE id = ?
+                """, (json.dumps(payload, default=str), time.time(), elapsed_ms, job["id"]))
+            else:
+                self._finish(conn, job, assess_ms=elapsed_ms)
+            conn.commit()
+            if alert:
+                # High-risk triage reaches the doctor queue at either severity
+                publish_alert(conn, job["patient_id"], alert[0], "TRIAGE_RISK", alert[1], notify_doctors=True)
+            if result.get("agent_alert"):
+                publish_alert(conn, job["patient_id"], "MODERATE", result["agent_alert"]["type"],
+                              result["agent_alert"]["message"], notify_doctors=False)
+        finally:
+            conn.close()
+        self._record("assess", elapsed_ms)
+        self._count(assessed=1)
+
+    def _upgrade(self, job: Dict):
+        from agents.orchestrator import orchestrator
+
+        payload = json.loads(job["payload"])
+        start = time.perf_counter()
+        result = orchestrator.upgrade_triage(job["patient_id"], payload["triage_data"], payload["triage_context"])
+        if result is None:
+            raise LLMUpgradeUnavailable("LLM gave no usable assessment")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        conn = get_db_connection()
+        try:
+            previous = conn.execute("SELECT risk FROM triage_reports WHERE id = ?", (job["report_id"],)).fetchone()
+            alert = _store_assessment(conn, job["report_id"], job["patient_id"], result, "complete")
+            self._finish(conn, job, upgrade_ms=elapsed_ms)
+            conn.commit()
+            if alert:
+                publish_alert(conn, job["patient_id"], alert[0], "TRIAGE_RISK", alert[1], notify_doctors=True)
+        finally:
+            conn.close()
+
+        change = risk_rank(result["final_decision"].get("risk")) - risk_rank(previous["risk"] if previous else None)
+        self._record("upgrade", elapsed_ms)
+        self._count(upgraded=1, risk_raised=int(change > 0), risk_lowered=int(change < 0))
+        print(f"[TRIAGE JOBS] Report {job['report_id']} upgraded: "
+              f"{previous['risk'] if previous else None} -> {result['final_decision'].get('risk')}", flush=True)
+
+    def _finish(self, conn, job: Dict, **timings):
+        columns = "".join(f", {name} = ?" for name in timings)
+        conn.execute(
+            f"UPDATE triage_jobs SET status = 'done', lease_until = NULL, finished_at = ?{columns} WHERE id = ?",
+            (time.time(), *timings.values(), job["id"])
+        )
+
+    def _failed_attempt(self, job: Dict, error: Exception):
+        with self._lock:
+            self._stats["last_error"] = str(error)
+        print(f"[TRIAGE JOBS] {job['stage']} failed for report {job['report_id']} "
+              f"(attempt {job['attempts']}/{self.max_attempts}): {error}", flush=True)
+        conn = get_db_connection()
+        try:
+            if job["attempts"] < self.max_attempts:
+                delay = self.retry_seconds * 2 ** (job["attempts"] - 1) * random.uniform(0.5, 1.0)
+                conn.execute("""
+                    UPDATE triage_jobs SET status = 'queued', next_run_at = ?, lease_until = NULL, last_error = ?
+                    WHERE id = ?
+                """, (time.time() + delay, str(error), job["id"]))
+                self._count(retries=1)
+            elif job["stage"] == "upgrade":
+                # The provisional assessment is already stored and stands
+                _finalize_provisional(conn, job["report_id"])
+                self._finish(conn, job)
+                conn.execute("UPDATE triage_jobs SET last_error = ? WHERE id = ?", (str(error), job["id"]))
+                self._count(kept_provisional=1)
+            else:
+                conn.execute(
+                    "UPDATE triage_reports SET status = 'failed', ai_prediction = 'Manual Review Needed' WHERE id = ?",
+                    (job["report_id"],)
+                )
+                conn.execute("""
+                    UPDATE triage_jobs SET status = 'failed', lease_until = NULL, finished_at = ?, last_error = ?
+                    WHERE id = ?
+                """, (time.time(), str(error), job["id"]))
+                self._count(failed=1)
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- Stats ---
+
+    def _record(self, stage: str, ms: float):
+        with self._lock:
+            self._latency[stage].append(ms)
+
+    def _count(self, **increments: int):
+        # Several workers finish jobs at once; += on the shared dict is not atomic
+        with self._lock:
+            for name, amount in increments.items():
+                self._stats[name] += amount
+
+    def record_duplicate(self):
+        self._count(duplicates=1)
+
+    def stats(self) -> Dict:
+        """Queue depth by stage, oldest waiting job, per-stage latency percentiles (ms) and counters"""
+        conn = get_db_connection()
+        try:
+            rows = conn.execute("""
+                SELECT stage, status, COUNT(*) AS jobs, MIN(created_at) AS oldest
+                FROM triage_jobs WHERE status IN ('queued', 'running')
+                GROUP BY stage, status
+            """).fetchall()
+            failed = conn.execute("SELECT COUNT(*) FROM triage_jobs WHERE status = 'failed'").fetchone()[0]
+        finally:
+            conn.close()
+
+        depth = {f"{row['stage']}_{row['status']}": row["jobs"] for row in rows}
+        oldest = min((row["oldest"] for row in rows), default=None)
+        with self._lock:
+            counters = dict(self._stats)
+            latency = {}
+            for stage, samples in self._latency.items():
+                ordered = sorted(samples)
+                latency[stage] = {
+                    "samples": len(ordered),
+                    "p50_ms": round(ordered[len(ordered) // 2], 1) if ordered else None,
+                    "p95_ms": round(ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)], 1) if ordered else None,
+                }
+        return {
+            **counters,
+            "depth": depth,
+            "queue_depth": sum(depth.values()),
+            "oldest_pending_seconds": round(time.time() - oldest, 1) if oldest else None,
+            "failed_jobs": failed,
+            "latency": latency,
+            "workers_alive": sum(1 for t in self._threads if t.is_alive()),
+        }
+
+
+triage_jobs = TriageJobQueue()
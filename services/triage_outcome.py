@@ -0,0 +1,208 @@
+"""
+Triage Outcome Fields
+Typed columns stored alongside each triage report (risk, decision, diagnosis, red flags)
+and the compact JSON encoding of the full agent assessment
+"""
+import html
+import json
+import os
+import re
+import zlib
+from typing import Dict, Optional, Union
+
+RISK_LEVELS = ("Low", "Moderate", "High", "Critical")
+HIGH_RISK_LEVELS = ("High", "Critical")
+
+# SQL fragment for filters: "tr.risk IN ('High', 'Critical')"
+HIGH_RISK_SQL = "({})".format(", ".join(f"'{level}'" for level in HIGH_RISK_LEVELS))
+
+# Assessments whose JSON is at least this many bytes are stored zlib-compressed (BLOB);
+# smaller ones are stored as plain JSON text. 0 disables compression.
+ASSESSMENT_COMPRESS_MIN_BYTES = int(os.getenv("TRIAGE_ASSESSMENT_COMPRESS_MIN_BYTES", "512"))
+
+# Markup written by add_triage_report before the typed columns existed
+_CARD_PATTERNS = {
+    "primary_diagnosis": re.compile(r"Diagnosis</h6>\s*<p[^>]*>(.*?)</p>", re.S),
+    "decision": re.compile(r"Decision</h6>\s*<p[^>]*>(.*?)</p>", re.S),
+    "risk": re.compile(r"Risk Level</h6>\s*<span[^>]*>(.*?)</span>", re.S),
+    "red_flags": re.compile(r"Red Flags</h6>\s*<p[^>]*>(.*?)</p>", re.S),
+}
+# Compact "<b>Risk:</b> High<br>..." format written by the seed scripts
+_INLINE_PATTERNS = {
+    "primary_diagnosis": re.compile(r"<b>Diagnosis:</b>\s*([^<]*)"),
+    "decision": re.compile(r"<b>Decision:</b>\s*([^<]*)"),
+    "risk": re.compile(r"<b>Risk:</b>\s*([^<]*)"),
+}
+
+
+def normalize_risk(risk: Optional[str]) -> Optional[str]:
+    """Map free-form risk text (e.g. 'high', 'HIGH RISK') onto RISK_LEVELS"""
+    if not risk:
+        return None
+    text = str(risk).strip().lower()
+    for level in RISK_LEVELS:
+        if level.lower() in text:
+            return level
+    return None
+
+
+def risk_rank(risk: Optional[str]) -> int:
+    """Position in RISK_LEVELS (-1 for unknown), for comparing two assessments"""
+    risk = normalize_risk(risk)
+    return RISK_LEVELS.index(risk) if risk else -1
+
+
+def triage_alert(risk: Optional[str], diagnosis: Optional[str]) -> Optional[tuple]:
+    """
+    Doctor alert raised by a triage outcome
+
+    Returns:
+        (severity, message) for High / Critical risk, else None
+    """
+    risk = normalize_risk(risk)
+    if risk not in HIGH_RISK_LEVELS:
+        return None
+    return ("HIGH" if risk == "Critical" else "MODERATE", f"High risk triage: {diagnosis}")
+
+
+def outcome_columns(decision_data: Dict, triage_output: Dict) -> Dict:
+    """
+    Build the typed triage_reports columns from an orchestrator result
+
+    Args:
+        decision_data: workflow_result["final_decision"]
+        triage_output: workflow_result["triage_assessment"]
+
+    Returns:
+        Dict with risk, decision, primary_diagnosis, red_flag_count
+    """
+    red_flags = triage_output.get("detected_red_flags") or []
+    return {
+        "risk": normalize_risk(decision_data.get("risk")),
+        "decision": decision_data.get("action"),
+        "primary_diagnosis": triage_output.get("primary_diagnosis"),
+        "red_flag_count": len(red_flags),
+    }
+
+
+def parse_legacy_prediction(ai_prediction: Optional[str]) -> Dict:
+    """
+    Recover the typed fields from an ai_prediction HTML blob
+
+    Args:
+        ai_prediction: Stored HTML (rich card or compact seed format)
+
+    Returns:
+        Dict with risk, decision, primary_diagnosis, red_flag_count
+        (values are None when they cannot be found)
+    """
+    fields = {"risk": None, "decision": None, "primary_diagnosis": None, "red_flag_count": 0}
+    if not ai_prediction:
+        return fields
+
+    patterns = _CARD_PATTERNS if "Risk Level</h6>" in ai_prediction else _INLINE_PATTERNS
+    for key, pattern in patterns.items():
+        match = pattern.search(ai_prediction)
+        if not match:
+            continue
+        value = html.unescape(match.group(1)).strip()
+        if key == "red_flags":
+            if value and value != "None Detected":
+                fields["red_flag_count"] = len([f for f in value.split(",") if f.strip()])
+        else:
+            fields[key] = value or None
+
+    fields["risk"] = normalize_risk(fields["risk"])
+    return fields
+
+
+def encode_assessment(triage_output: Dict, decision_data: Dict) -> Union[str, bytes]:
+    """
+    Serialize the orchestrator result for triage_reports.assessment
+
+    Args:
+        triage_output: workflow_result["triage_assessment"]
+        decision_data: workflow_result["final_decision"]
+
+    Returns:
+        Compact JSON text, or zlib-compressed JSON bytes for large assessments
+    """
+    payload = json.dumps(
+        {"triage": triage_output or {}, "decision": decision_data or {}},
+        separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    raw = payload.encode("utf-8")
+    if ASSESSMENT_COMPRESS_MIN_BYTES and len(raw) >= ASSESSMENT_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(raw, 6)
+        if len(compressed) < len(raw):
+            return compressed
+    return payload
+
+
+def decode_assessment(value: Union[str, bytes, Dict, None]) -> Optional[Dict]:
+    """Inverse of encode_assessment (None for empty or unreadable values, dicts pass through)"""
+    if not value:
+        return None
+    if isinstance(value, dict):
+        return value
+    try:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = zlib.decompress(bytes(value)).decode("utf-8")
+        data = json.loads(value)
+    except (zlib.error, ValueError, UnicodeDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+_SECTION_TEXT = re.compile(r"<h6[^>]*>\s*{}\s*</h6>\s*<p[^>]*>(.*?)</p>", re.S)
+_LIST_ITEMS = re.compile(r"<li>(.*?)</li>", re.S)
+_PARAGRAPHS = re.compile(r"<p>(.*?)</p>", re.S)
+
+
+def _section(markup: str, title: str) -> Optional[str]:
+    match = re.search(_SECTION_TEXT.pattern.format(re.escape(title)), markup, re.S)
+    return html.unescape(match.group(1)).strip() if match else None
+
+
+def _list_after(markup: str, title: str) -> list:
+    """<li> items (or a single <p>) in the <div> following a section heading"""
+    start = markup.find(title)
+    if start < 0:
+        return []
+    end = markup.find("</div>", start)
+    block = markup[start:end if end > 0 else None]
+    items = _LIST_ITEMS.findall(block) or _PARAGRAPHS.findall(block)
+    return [html.unescape(item).strip() for item in items if item.strip()]
+
+
+def assessment_from_legacy_html(ai_prediction: Optional[str]) -> Optional[Dict]:
+    """
+    Rebuild the {"triage": ..., "decision": ...} assessment from stored report HTML
+
+    Returns:
+        Assessment dict, or None if the text is not a recognised report format
+        (e.g. "Manual Review Needed")
+    """
+    fields = parse_legacy_prediction(ai_prediction)
+    if not fields["risk"]:
+        return None
+
+    triage = {
+        "risk": fields["risk"],
+        "decision": fields["decision"],
+        "primary_diagnosis": fields["primary_diagnosis"],
+        "detected_red_flags": [],
+        "reasoning": "",
+        "asha_instructions": [],
+        "home_remedies": [],
+    }
+    if "Risk Level</h6>" in ai_prediction:
+        red_flags = _section(ai_prediction, "Red Flags")
+        if red_flags and red_flags != "None Detected":
+            triage["detected_red_flags"] = [f.strip() for f in red_flags.split(",") if f.strip()]
+        triage["reasoning"] = _section(ai_prediction, "Reasoning") or ""
+        triage["asha_instructions"] = _list_after(ai_prediction, "ASHA Task List")
+        triage["home_remedies"] = _list_after(ai_prediction, "Home Remedies")
+
+    decision = {"risk": fields["risk"], "action": fields["decision"]}
+    return {"triage": triage, "decision": decision}
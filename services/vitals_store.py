@@ -0,0 +1,453 @@
+"""
+Vitals Store
+Optional memory-mapped NumPy copy of the readings table for vectorized trend analysis.
+
+Rows (id, timestamp, patient_id, type, value1, value2) are appended to a flat binary
+file under VITALS_STORE_DIR and mapped with numpy.memmap. A per-patient offset index
+(rows sorted by patient, then time) turns a patient's history into one array slice, and
+population-wide trend scans (analyze_all_patients) are a single vectorized pass instead
+of two SQL queries per patient.
+
+The store is a cache of `readings`: before every read it appends rows whose id is past
+its high-water mark, so readings inserted by any writer (device sync, seed scripts) show
+up without extra bookkeeping. Corrections and deletions bump the 'readings' data version
+(migration 020); a store built at an older version is rebuilt from the database.
+
+Several processes (app, scheduler) can share one directory: sync, index builds and
+rebuilds hold an exclusive lock on store.lock, and each process re-reads meta.json under
+that lock to pick up what the others appended. Enable with VITALS_STORE_ENABLED=1
+(requires numpy).
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    import msvcrt
+    fcntl = None
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from db import get_db_connection
+from services.data_versions import READINGS_SCOPE, get_versions
+
+VITALS_STORE_ENABLED = os.getenv("VITALS_STORE_ENABLED", "0") == "1"
+VITALS_STORE_DIR = os.getenv("VITALS_STORE_DIR", "vitals_store")
+# Rows appended since the last index build are scanned linearly; past this many the index is rebuilt
+INDEX_TAIL_ROWS = int(os.getenv("VITALS_STORE_INDEX_TAIL", "50000"))
+
+ROW_FIELDS = [
+    ("id", "<i8"),
+    ("timestamp", "<i8"),      # seconds since epoch of the stored (naive) timestamp text
+    ("patient_id", "<i4"),
+    ("type", "<u2"),           # code from meta["types"], e.g. BP -> 1
+    ("value1", "<f4"),
+    ("value2", "<f4"),         # NaN when NULL
+]
+DEFAULT_TYPES = {"BP": 1, "SUGAR": 2, "TEMP": 3}
+EMPTY_META = {"row_count": 0, "last_id": 0, "types": DEFAULT_TYPES, "indexed_rows": 0, "readings_version": 0}
+
+READINGS_SQL = "SELECT id, patient_id, reading_type, value1, value2, timestamp FROM {table} WHERE id > ? ORDER BY id"
+
+
+def _to_epoch(timestamps: List[str]):
+    """'YYYY-MM-DD HH:MM:SS' texts -> int64 seconds (vectorized, per-row fallback for odd formats)"""
+    try:
+        return np.array(timestamps, dtype="datetime64[s]").astype("<i8")
+    except (ValueError, TypeError):
+        values = []
+        for ts in timestamps:
+            try:
+                parsed = datetime.fromisoformat(str(ts))
+                values.append(np.datetime64(parsed.replace(tzinfo=None), "s").astype("<i8"))
+            except (ValueError, TypeError):
+                values.append(0)
+        return np.array(values, dtype="<i8")
+
+
+def _to_text(epoch_seconds) -> List[str]:
+    """int64 seconds -> SQLite CURRENT_TIMESTAMP style texts"""
+    text = np.datetime_as_string(np.asarray(epoch_seconds, dtype="<i8").astype("datetime64[s]"))
+    return [t.replace("T", " ") for t in text.tolist()]
+
+
+@contextmanager
+def _exclusive_file_lock(path: str):
+    """Cross-process exclusive lock on `path` (created if missing)"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def reading_value(value):
+    """float32 column value -> int / float / None, as the readings table would have returned it"""
+    if value != value:  # NaN
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class VitalsStore:
+    """
+    Append-only memory-mapped readings file with a per-patient index.
+
+    Files in `directory`:
+        readings.bin   packed ROW_FIELDS records, in readings.id order
+        meta.json      row_count, last_id, type codes, indexed_rows, readings_version
+        store.lock     held by the process that is syncing / indexing
+        order.npy      row offsets sorted by (patient_id, timestamp) for the first indexed_rows rows
+        patients.npy / starts.npy   unique patient ids and where each one starts in order.npy
+    """
+
+    def __init__(self, directory: str = VITALS_STORE_DIR, enabled: bool = VITALS_STORE_ENABLED):
+        self.directory = directory
+        self.enabled = enabled and NUMPY_AVAILABLE
+        if enabled and not NUMPY_AVAILABLE:
+            print("[VITALS_STORE] numpy not installed, vitals store disabled")
+        self.dtype = np.dtype(ROW_FIELDS) if NUMPY_AVAILABLE else None
+        self._lock = threading.RLock()
+        self._file_lock_depth = 0
+        self._loaded = False
+        self._rows = None
+        self._meta = self._empty_meta()
+        self._order = self._patients = self._starts = None
+        self._stats = {"syncs": 0, "rows_appended": 0, "index_builds": 0, "rebuilds": 0}
+
+    @staticmethod
+    def _empty_meta() -> Dict:
+        return {**EMPTY_META, "types": dict(DEFAULT_TYPES)}
+
+    @contextmanager
+    def _exclusive(self):
+        """Thread lock plus the cross-process file lock (re-entrant within this process)"""
+        with self._lock:
+            if self._file_lock_depth:
+                self._file_lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth -= 1
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            with _exclusive_file_lock(self._path("store.lock")):
+                self._file_lock_depth = 1
+                try:
+                    self._refresh()
+                    yield
+                finally:
+                    self._file_lock_depth = 0
+
+    # ---------- files ----------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write_meta(self):
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, self._path("meta.json"))
+
+    def _map(self):
+        count = self._meta["row_count"]
+        if count == 0:
+            self._rows = np.empty(0, dtype=self.dtype)
+        else:
+            self._rows = np.memmap(self._path("readings.bin"), dtype=self.dtype, mode="r", shape=(count,))
+
+    def _refresh(self):
+        """Drop in-memory state that another process has moved past (appends, index builds, rebuilds)"""
+        if not self._loaded:
+            return
+        try:
+            with open(self._path("meta.json")) as f:
+                on_disk = json.load(f)
+        except (OSError, ValueError):
+            on_disk = None
+        if on_disk != self._meta:
+            self._rows = self._order = self._patients = self._starts = None
+            self._meta = self._empty_meta()
+            self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(self._path("meta.json")) as f:
+                self._meta.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        data_path = self._path("readings.bin")
+        if not os.path.exists(data_path) or os.path.getsize(data_path) < self._meta["row_count"] * self.dtype.itemsize:
+            # Missing or truncated data file: start over from the database
+            self._meta.update(row_count=0, last_id=0, indexed_rows=0, readings_version=0)
+        self._map()
+        if self._meta["indexed_rows"]:
+            try:
+                self._order = np.load(self._path("order.npy"), mmap_mode="r")
+                self._patients = np.load(self._path("patients.npy"))
+                self._starts = np.load(self._path("starts.npy"))
+            except (OSError, ValueError):
+                self._meta["indexed_rows"] = 0
+        self._loaded = True
+
+    def _append(self, records):
+        count = self._meta["row_count"]
+        mode = "r+b" if os.path.exists(self._path("readings.bin")) else "wb"
+        with open(self._path("readings.bin"), mode) as f:
+            # Anything past row_count is a torn append from an interrupted write
+            f.seek(count * self.dtype.itemsize)
+            f.write(records.tobytes())
+            f.truncate()
+        self._meta["row_count"] = count + len(records)
+        self._meta["last_id"] = int(records["id"][-1])
+        self._write_meta()
+        self._map()
+
+    # ---------- sync with SQLite ----------
+
+    def _type_code(self, reading_type: str) -> int:
+        types = self._meta["types"]
+        if reading_type not in types:
+            types[reading_type] = max(types.values(), default=0) + 1
+        return types[reading_type]
+
+    def _records(self, rows):
+        records = np.empty(len(rows), dtype=self.dtype)
+        records["id"] = [r[0] for r in rows]
+        records["patient_id"] = [r[1] if r[1] is not None else -1 for r in rows]
+        records["type"] = [self._type_code(r[2]) for r in rows]
+        records["value1"] = [r[3] if r[3] is not None else np.nan for r in rows]
+        records["value2"] = [r[4] if r[4] is not None else np.nan for r in rows]
+        records["timestamp"] = _to_epoch([r[5] for r in rows])
+        return records
+
+    def sync(self, conn=None) -> int:
+        """
+        Append readings newer than the store's high-water mark
+
+        On first build this also reads the monthly archive tables, so the store
+        holds the full history.
+
+        Returns:
+            Number of rows appended
+        """
+        if not self.enabled:
+            return 0
+        own_connection = conn is None
+        if own_connection:
+            conn = get_db_connection()
+        try:
+            with self._exclusive():
+                self._load()
+                version = self._readings_version(conn)
+                if version is not None and self._meta["row_count"] and version != self._meta["readings_version"]:
+                    # Rows already in the store were corrected or deleted
+                    self._stats["rebuilds"] += 1
+                    return self.rebuild(conn)
+                if version is not None and self._meta["row_count"] == 0:
+                    self._meta["readings_version"] = version
+                last_id = self._meta["last_id"]
+                tables = ["readings"]
+                if self._meta["row_count"] == 0:
+                    try:
+                        tables += [row[0] for row in conn.execute(
+                            "SELECT table_name FROM readings_archive_index WHERE row_count > 0"
+                        ).fetchall()]
+                    except Exception:
+                        pass
+                rows = []
+                for table in tables:
+                    rows.extend(tuple(r) for r in conn.execute(READINGS_SQL.format(table=table), (last_id,)).fetchall())
+                self._stats["syncs"] += 1
+                if not rows:
+                    return 0
+                rows.sort(key=lambda r: r[0])
+                self._append(self._records(rows))
+                self._stats["rows_appended"] += len(rows)
+                if self._meta["row_count"] - self._meta["indexed_rows"] > INDEX_TAIL_ROWS:
+                    self.build_index()
+                return len(rows)
+        finally:
+            if own_connection:
+                conn.close()
+
+    @staticmethod
+    def _readings_version(conn) -> Optional[int]:
+        """Current 'readings' data version, or None on a database without data_versions"""
+        try:
+            return get_versions([READINGS_SCOPE], conn=conn)[READINGS_SCOPE]
+        except sqlite3.Error:
+            return None
+
+    def rebuild(self, conn=None) -> int:
+        """Drop the store files and reload everything from the database"""
+        if not self.enabled:
+            return 0
+        with self._exclusive():
+            # Drop the maps first: a mapped file cannot be removed on Windows
+            self._rows = self._order = self._patients = self._starts = None
+            for name in ("readings.bin", "meta.json", "order.npy", "patients.npy", "starts.npy"):
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+            self._loaded = False
+            self._meta = self._empty_meta()
+            appended = self.sync(conn)
+            self.build_index()
+            return appended
+
+    # ---------- per-patient index ----------
+
+    def build_index(self):
+        """Sort row offsets by (patient_id, timestamp) and record where each patient starts"""
+        with self._exclusive():
+            self._load()
+            rows = self._rows
+            order = np.lexsort((rows["timestamp"], rows["patient_id"])).astype("<i8")
+            patients, starts = np.unique(rows["patient_id"][order], return_index=True)
+            self._order = None
+            np.save(self._path("order.npy"), order)
+            np.save(self._path("patients.npy"), patients)
+            np.save(self._path("starts.npy"), starts)
+            self._order = np.load(self._path("order.npy"), mmap_mode="r")
+            self._patients, self._starts = patients, starts
+            self._meta["indexed_rows"] = len(rows)
+            self._write_meta()
+            self._stats["index_builds"] += 1
+
+    def _patient_rows(self, patient_id: int):
+        """All rows for one patient, oldest first"""
+        rows = self._rows
+        indexed = self._meta["indexed_rows"] if self._order is not None else 0
+        parts = []
+        if indexed:
+            pos = np.searchsorted(self._patients, patient_id)
+            if pos < len(self._patients) and self._patients[pos] == patient_id:
+                end = self._starts[pos + 1] if pos + 1 < len(self._starts) else indexed
+                parts.append(rows[np.asarray(self._order[self._starts[pos]:end])])
+        tail = rows[indexed:]
+        if len(tail):
+            parts.append(tail[tail["patient_id"] == patient_id])
+        if not parts:
+            return np.empty(0, dtype=self.dtype)
+        result = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        if len(parts) > 1:
+            result = result[np.argsort(result["timestamp"], kind="stable")]
+        return result
+
+    # ---------- reads ----------
+
+    def history(self, patient_id: int, reading_type: str, since: Optional[datetime] = None,
+                limit: Optional[int] = None) -> List[Dict]:
+        """
+        One patient's readings of a type, oldest first (same shape as get_vital_history)
+
+        Args:
+            patient_id: Patient ID
+            reading_type: 'BP', 'SUGAR', ...
+            since: Inclusive lower bound
+            limit: Keep only the most recent N readings
+
+        Returns:
+            List of {'value1', 'value2', 'timestamp'} dicts
+        """
+        self.sync()
+        with self._lock:
+            code = self._meta["types"].get(reading_type)
+            if code is None:
+                return []
+            rows = self._patient_rows(patient_id)
+            mask = rows["type"] == code
+            if since is not None:
+                mask &= rows["timestamp"] >= np.datetime64(since, "s").astype("<i8")
+            rows = rows[mask]
+            if limit:
+                rows = rows[-limit:]
+            rows = np.array(rows)  # copy out of the map before releasing the lock
+        return [
+            {"value1": reading_value(v1), "value2": reading_value(v2), "timestamp": ts}
+            for v1, v2, ts in zip(rows["value1"].tolist(), rows["value2"].tolist(), _to_text(rows["timestamp"]))
+        ]
+
+    def trend_endpoints(self, reading_types: Optional[List[str]], since: datetime) -> Dict[str, "np.ndarray"]:
+        """
+        First and last reading per (patient, type) since a cutoff, for the whole population
+
+        One pass over the mapped columns: filter by time and type, sort by
+        (patient, type, timestamp) and take each group's first and last row.
+
+        Args:
+            reading_types: Vital types to include (None = all)
+            since: Inclusive lower bound
+
+        Returns:
+            Dict of equal-length arrays: patient_id, type (name), count,
+            first_value1/2, last_value1/2
+        """
+        self.sync()
+        with self._lock:
+            codes = {code: name for name, code in self._meta["types"].items()
+                     if reading_types is None or name in reading_types}
+            rows = self._rows
+            mask = (rows["timestamp"] >= np.datetime64(since, "s").astype("<i8")) & np.isin(rows["type"], list(codes))
+            rows = np.array(rows[mask])
+
+        order = np.lexsort((rows["timestamp"], rows["type"], rows["patient_id"]))
+        rows = rows[order]
+        if len(rows):
+            key_change = (np.diff(rows["patient_id"]) != 0) | (np.diff(rows["type"]) != 0)
+            firsts = np.concatenate(([0], np.flatnonzero(key_change) + 1))
+        else:
+            firsts = np.empty(0, dtype=np.intp)
+        lasts = np.concatenate((firsts[1:], [len(rows)])) - 1 if len(firsts) else firsts
+        type_names = np.array([codes[c] for c in rows["type"][firsts].tolist()], dtype=object)
+        return {
+            "patient_id": rows["patient_id"][firsts],
+            "type": type_names,
+            "count": lasts - firsts + 1,
+            "first_value1": rows["value1"][firsts],
+            "first_value2": rows["value2"][firsts],
+            "last_value1": rows["value1"][lasts],
+            "last_value2": rows["value2"][lasts],
+        }
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "directory": self.directory,
+                "rows": self._meta["row_count"],
+                "indexed_rows": self._meta["indexed_rows"],
+                "last_id": self._meta["last_id"],
+                "readings_version": self._meta["readings_version"],
+                **self._stats,
+            }
+
+
+vitals_store = VitalsStore()
@@ -0,0 +1,212 @@
+"""
+ASHA Monitoring Dashboard Loader
+The /dashboard page loads lazily: load_worklist_page() serves keyset-paginated patient
+summaries and load_patient_detail() the full card of one patient when it is opened.
+
+Pages read the sort keys stored on asha_worklists (migration 021: one row per caseload
+patient, kept current by triggers), so a page is an index seek plus `limit` rows; the
+card's collections are per-patient `ORDER BY ... LIMIT` queries.
+"""
+import base64
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from services.triage_outcome import decode_assessment
+
+DASHBOARD_READINGS = 5
+DASHBOARD_REPORTS = 3
+DASHBOARD_CHART_POINTS = 7
+
+WORKLIST_PAGE_SIZE = int(os.getenv("WORKLIST_PAGE_SIZE", "20"))
+WORKLIST_MAX_PAGE_SIZE = 100
+
+# One summary row per caseload patient. Priority is the agent's, with open HIGH alerts as
+# fallback (page_priority / page_score, generated columns of asha_worklists).
+SUMMARY_SQL = """
+    SELECT p.id, p.name, p.phone_number, p.age, p.gender, p.village, p.active_call_link,
+           w.latest_triage_date, w.page_priority AS priority, w.page_score AS urgency_score
+    FROM asha_worklists w
+    JOIN patients p ON p.id = w.patient_id
+    WHERE w.worker_phone = ? {keyset}
+    ORDER BY w.page_score DESC, w.latest_triage_date DESC, w.patient_id DESC
+    LIMIT ?
+"""
+
+# Rows after the cursor in that order (urgency, most recent triage, id); idx_asha_worklists_page
+KEYSET_SQL = "AND (w.page_score, w.latest_triage_date, w.patient_id) < (?, ?, ?)"
+
+
+def _format_time(timestamp: Optional[str], fmt: str) -> Optional[str]:
+    # Formatted here because SQLite's strftime has no %I / %p / %b
+    try:
+        return datetime.strptime(str(timestamp)[:19], "%Y-%m-%d %H:%M:%S").strftime(fmt)
+    except ValueError:
+        return None
+
+
+def _latest(conn, sql: str, patient_id: int, limit: int) -> List[Dict]:
+    """Rows of a per-patient `... WHERE patient_id = ? ... ORDER BY ... LIMIT ?` query"""
+    return [dict(row) for row in conn.execute(sql, (patient_id, limit)).fetchall()]
+
+
+def encode_cursor(summary: Dict) -> str:
+    """Opaque keyset cursor pointing just after `summary` in page order"""
+    key = [summary['urgency_score'], summary['latest_triage_date'], summary['id']]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str, int]:
+    """
+    Parse a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        urgency_score, latest_triage_date, patient_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(urgency_score), str(latest_triage_date), int(patient_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def load_worklist_page(conn, worker_phone: str, limit: int = WORKLIST_PAGE_SIZE,
+                       cursor: Optional[str] = None) -> Dict:
+    """
+    One page of patient summaries for the monitoring dashboard, in card order
+
+    Keyset pagination: the cursor holds the sort key of the last row of the previous page.
+    The page seeks idx_asha_worklists_page to it and reads `limit` + 1 rows, so its cost
+    depends on the page size, not the caseload, and rows shifting between requests are
+    neither repeated nor skipped.
+
+    Args:
+        conn: Database connection
+        worker_phone: ASHA worker phone (session)
+        limit: Page size (capped at WORKLIST_MAX_PAGE_SIZE)
+        cursor: next_cursor of the previous page, None for the first page
+
+    Returns:
+        Dict with 'patients' (summary dicts) and 'next_cursor' (None on the last page)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    limit = max(1, min(int(limit), WORKLIST_MAX_PAGE_SIZE))
+    keyset, params = "", [worker_phone]
+    if cursor:
+        keyset = KEYSET_SQL
+        params.extend(decode_cursor(cursor))
+
+    # One extra row tells whether another page follows
+    rows = conn.execute(SUMMARY_SQL.format(keyset=keyset), params + [limit + 1]).fetchall()
+    summaries = [dict(row) for row in rows[:limit]]
+    if not summaries:
+        return {'patients': [], 'next_cursor': None}
+
+    # Open alerts of this page only (the card shows the first one)
+    placeholders = ",".join("?" * len(summaries))
+    alerts = defaultdict(list)
+    for alert in conn.execute(f"""
+        SELECT id, patient_id, alert_type, severity, message
+        FROM patient_alerts
+        WHERE patient_id IN ({placeholders}) AND is_acknowledged = 0
+        ORDER BY severity DESC
+    """, [s['id'] for s in summaries]).fetchall():
+        alerts[alert['patient_id']].append(dict(alert))
+    for summary in summaries:
+        summary['alerts'] = alerts.get(summary['id'], [])
+
+    return {
+        'patients': summaries,
+        'next_cursor': encode_cursor(summaries[-1]) if len(rows) > limit else None
+    }
+
+
+def load_patient_detail(conn, worker_phone: str, patient_id: int) -> Optional[Dict]:
+    """
+    Full card of one patient (readings, reports, prescriptions, chart, workflow, alerts)
+
+    Args:
+        conn: Database connection
+        worker_phone: ASHA worker phone (session)
+        patient_id: Patient ID
+
+    Returns:
+        Card dict ('info', 'readings', 'reports', 'prescriptions', 'chart_data', 'alerts'),
+        or None if the patient is not in the caseload
+    """
+    row = conn.execute(
+        "SELECT * FROM patients WHERE id = ? AND asha_worker_phone = ?", (patient_id, worker_phone)
+    ).fetchone()
+    if row is None:
+        return None
+    patient = dict(row)
+
+    keys = conn.execute(
+        "SELECT page_priority, page_score FROM asha_worklists WHERE worker_phone = ? AND patient_id = ?",
+        (worker_phone, patient_id)
+    ).fetchone()
+    patient['priority'], patient['urgency_score'] = (keys['page_priority'], keys['page_score']) if keys else ("LOW", 0)
+
+    try:
+        alerts = [dict(a) for a in conn.execute("""
+            SELECT a.*, p.name
+            FROM patient_alerts a
+            JOIN patients p ON a.patient_id = p.id
+            WHERE a.patient_id = ? AND a.is_acknowledged = 0
+            ORDER BY a.severity DESC
+        """, (patient_id,)).fetchall()]
+    except Exception:
+        alerts = []
+
+    try:
+        workflows = _latest(conn, "SELECT * FROM care_workflows WHERE patient_id = ? "
+                                  "ORDER BY created_at DESC, id DESC LIMIT ?", patient_id, 1)
+    except Exception:
+        workflows = []
+    patient['workflow'] = {
+        key: workflows[0][key] for key in ("current_state", "next_action", "status", "created_at")
+    } if workflows else None
+
+    readings = _latest(conn, "SELECT * FROM readings WHERE patient_id = ? "
+                             "ORDER BY timestamp DESC, id DESC LIMIT ?", patient_id, DASHBOARD_READINGS)
+    for r in readings:
+        r['formatted_time'] = _format_time(r['timestamp'], '%Y-%m-%d %I:%M %p')
+
+    reports = _latest(conn, "SELECT * FROM triage_reports WHERE patient_id = ? "
+                            "ORDER BY timestamp DESC, id DESC LIMIT ?", patient_id, DASHBOARD_REPORTS)
+    for r in reports:
+        r['formatted_time'] = _format_time(r['timestamp'], '%Y-%m-%d %I:%M %p')
+        # Decoded up front: the page also serializes the card to JSON for its chart
+        r['assessment'] = decode_assessment(r.get('assessment'))
+    patient['latest_triage_date'] = reports[0]['timestamp'] if reports else ""
+
+    # Latest BP readings for the chart, oldest first
+    chart_rows = _latest(conn, "SELECT * FROM readings WHERE patient_id = ? AND reading_type = 'BP' "
+                               "ORDER BY timestamp DESC, id DESC LIMIT ?", patient_id, DASHBOARD_CHART_POINTS)[::-1]
+
+    try:
+        prescriptions = [dict(p) for p in conn.execute("""
+            SELECT pr.*, ph.name as pharmacy_name
+            FROM prescriptions pr
+            LEFT JOIN pharmacies ph ON pr.dispensed_by = ph.id
+            WHERE pr.patient_id = ? AND pr.is_active = 1
+        """, (patient_id,)).fetchall()]
+    except Exception:
+        prescriptions = []
+
+    return {
+        'info': patient,
+        'readings': readings,
+        'reports': reports,
+        'prescriptions': prescriptions,
+        'chart_data': {
+            'labels': [_format_time(r['timestamp'], '%d-%b') for r in chart_rows],
+            'systolic': [r['value1'] for r in chart_rows],
+            'diastolic': [r['value2'] for r in chart_rows]
+        },
+        'alerts': alerts
+    }
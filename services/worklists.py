@@ -0,0 +1,191 @@
+"""
+ASHA Worklists
+Persists each ASHA worker's prioritized patient list (asha_worklists, migration 011) so the
+monitoring dashboard reads it instead of re-running the task prioritization agent per view.
+
+- build_worklist() runs the task prioritization agent for a worker and stores the result
+  (the 05:30 scheduler job, through orchestrator.execute_daily_analysis).
+- get_worklist() is the dashboard read: the first read of the day rebuilds the list,
+  later reads re-score only the patients the migration 011 triggers marked in
+  worklist_dirty (new readings, alert or follow-up changes, reassignment).
+
+Every caseload patient has a row (migration 021 triggers add and move them); patients the
+agent did not list keep urgency_score 0 / 'LOW', so builds reset and upsert the agent
+columns instead of deleting rows.
+"""
+import json
+import time
+from datetime import date
+from typing import Dict, List
+
+from agents.task_prioritization_agent import generate_daily_task_list, score_patient
+from db import get_db_connection
+
+PATIENT_COLUMNS = "id, name, phone_number, age, gender, village"
+
+
+def _dirty_patients(conn, worker_phone: str) -> Dict[int, int]:
+    """{patient_id: version} of changed patients in this worker's caseload"""
+    rows = conn.execute("""
+        SELECT d.patient_id, d.version
+        FROM worklist_dirty d
+        JOIN patients p ON p.id = d.patient_id
+        WHERE p.asha_worker_phone = ?
+    """, (worker_phone,)).fetchall()
+    return {row['patient_id']: row['version'] for row in rows}
+
+
+def _drop_reassigned(conn, worker_phone: str):
+    """Remove entries for patients that have moved to another worker"""
+    conn.execute("""
+        DELETE FROM asha_worklists
+        WHERE worker_phone = ?
+          AND patient_id NOT IN (SELECT id FROM patients WHERE asha_worker_phone = ?)
+    """, (worker_phone, worker_phone))
+
+
+def _clear_dirty(conn, seen: Dict[int, int]):
+    # Only clear versions that were read before scoring; later changes stay dirty
+    conn.executemany(
+        "DELETE FROM worklist_dirty WHERE patient_id = ? AND version = ?", list(seen.items())
+    )
+
+
+def _worklist_row(worker_phone: str, item: Dict) -> tuple:
+    return (worker_phone, item['patient']['id'], item['urgency_score'], item['priority_level'],
+            json.dumps(item['patient'], default=str))
+
+
+# Agent result of one patient; the row's page keys (migration 021) are left as they are
+UPSERT_SQL = """
+    INSERT INTO asha_worklists (worker_phone, patient_id, urgency_score, priority_level, patient_data)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(worker_phone, patient_id) DO UPDATE SET
+        urgency_score = excluded.urgency_score,
+        priority_level = excluded.priority_level,
+        patient_data = excluded.patient_data,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+RESET_SQL = "UPDATE asha_worklists SET urgency_score = 0, priority_level = 'LOW', patient_data = '{}'"
+
+
+def build_worklist(worker_phone: str) -> Dict:
+    """
+    Run the task prioritization agent for a worker and persist the result
+
+    Args:
+        worker_phone: ASHA worker's phone number
+
+    Returns:
+        The generate_daily_task_list summary
+    """
+    start = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        seen = _dirty_patients(conn, worker_phone)
+    finally:
+        conn.close()
+
+    task_list = generate_daily_task_list(worker_phone)
+    build_ms = int((time.perf_counter() - start) * 1000)
+
+    conn = get_db_connection()
+    try:
+        with conn:
+            _drop_reassigned(conn, worker_phone)
+            # A patient is listed for one worker only (clears entries left behind by a reassignment)
+            conn.execute("""
+                DELETE FROM asha_worklists
+                WHERE worker_phone != ? AND patient_id IN (SELECT id FROM patients WHERE asha_worker_phone = ?)
+            """, (worker_phone, worker_phone))
+            conn.execute(f"{RESET_SQL} WHERE worker_phone = ? AND urgency_score != 0", (worker_phone,))
+            conn.executemany(UPSERT_SQL, [_worklist_row(worker_phone, item) for item in task_list.get('patients', [])])
+            conn.execute("""
+                INSERT INTO asha_worklist_builds (worker_phone, built_on, built_at, patient_count, build_ms)
+                VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?)
+                ON CONFLICT(worker_phone) DO UPDATE SET
+                    built_on = excluded.built_on,
+                    built_at = excluded.built_at,
+                    patient_count = excluded.patient_count,
+                    build_ms = excluded.build_ms
+            """, (worker_phone, date.today().isoformat(), len(task_list.get('patients', [])), build_ms))
+            _clear_dirty(conn, seen)
+    finally:
+        conn.close()
+    return task_list
+
+
+def refresh_worklist(worker_phone: str) -> Dict:
+    """
+    Bring a worker's stored worklist up to date
+
+    Rebuilds fully if it was not built today; otherwise re-scores only dirty patients.
+
+    Returns:
+        Dict with mode ('full', 'incremental' or 'fresh') and patients_rescored
+    """
+    conn = get_db_connection()
+    try:
+        build = conn.execute(
+            "SELECT built_on FROM asha_worklist_builds WHERE worker_phone = ?", (worker_phone,)
+        ).fetchone()
+        if not build or build['built_on'] != date.today().isoformat():
+            conn.close()
+            task_list = build_worklist(worker_phone)
+            return {"mode": "full", "patients_rescored": len(task_list.get('patients', []))}
+
+        seen = _dirty_patients(conn, worker_phone)
+        if not seen:
+            with conn:
+                _drop_reassigned(conn, worker_phone)
+            return {"mode": "fresh", "patients_rescored": 0}
+
+        placeholders = ",".join("?" * len(seen))
+        patients = conn.execute(
+            f"SELECT {PATIENT_COLUMNS} FROM patients WHERE id IN ({placeholders})", list(seen)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    items = [item for item in (score_patient(patient) for patient in patients) if item]
+
+    conn = get_db_connection()
+    try:
+        with conn:
+            # Reset the changed patients (some may no longer need attention), then store the scored ones
+            conn.execute(f"{RESET_SQL} WHERE patient_id IN ({placeholders}) AND urgency_score != 0", list(seen))
+            conn.executemany(UPSERT_SQL, [_worklist_row(worker_phone, item) for item in items])
+            _drop_reassigned(conn, worker_phone)
+            _clear_dirty(conn, seen)
+    finally:
+        conn.close()
+    return {"mode": "incremental", "patients_rescored": len(seen)}
+
+
+def get_worklist(worker_phone: str) -> List[Dict]:
+    """
+    Prioritized patients for a worker, in the shape generate_daily_task_list returns them
+
+    Args:
+        worker_phone: ASHA worker's phone number
+
+    Returns:
+        List of {'patient', 'urgency_score', 'priority_level'} sorted by urgency
+    """
+    refresh_worklist(worker_phone)
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("""
+            SELECT urgency_score, priority_level, patient_data
+            FROM asha_worklists
+            WHERE worker_phone = ? AND urgency_score > 0
+            ORDER BY urgency_score DESC, patient_id
+        """, (worker_phone,)).fetchall()
+    finally:
+        conn.close()
+    return [
+        {"patient": json.loads(row['patient_data']), "urgency_score": row['urgency_score'],
+         "priority_level": row['priority_level']}
+        for row in rows
+    ]
@@ -1,2 +1,2 @@
-ALTER TABLE patients ADD COLUMN district TEXT DEFAULT 'Dhule';
-UPDATE patients SET district = 'Dhule';
+ALTER TABLE patients ADD COLUMN district TEXT DEFAULT 'Dhule';
+UPDATE patients SET district = 'Dhule';
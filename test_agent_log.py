@@ -0,0 +1,117 @@
+"""
+Tests for the buffered agent_logs writer (services/agent_log.py)
+Run with: python -m pytest test_agent_log.py
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import db
+import migrate
+from services.agent_log import AgentLogWriter, agent_log_writer
+
+
+@pytest.fixture
+def log_db(tmp_path):
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    conn.close()
+
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    agent_log_writer.flush()  # write queued entries to this test's database
+    db.configure(path=previous)
+
+
+def logged_rows():
+    conn = db.get_db_connection()
+    try:
+        return conn.execute("SELECT patient_id, agent_name, input_data, output_data FROM agent_logs ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_entries_are_written_in_batches(log_db):
+    writer = AgentLogWriter(batch_size=50, flush_interval_ms=50)
+    for i in range(120):
+        assert writer.log(i, "vital_trend_analyzer", {"i": i}, {"ok": True}, 3)
+    writer.flush()
+
+    rows = logged_rows()
+    assert len(rows) == 120
+    assert [r["patient_id"] for r in rows] == list(range(120))
+    assert json.loads(rows[7]["input_data"]) == {"i": 7}
+
+    stats = writer.stats()
+    assert stats["written"] == 120 and stats["dropped"] == 0 and stats["backlog"] == 0
+    assert stats["batches"] <= 10  # batched, not one commit per entry
+    writer.shutdown()
+
+
+def test_entries_are_serialized_at_log_time(log_db):
+    writer = AgentLogWriter(flush_interval_ms=50)
+    payload = {"alerts": []}
+    writer.log(1, "agent", payload, {})
+    payload["alerts"].append("changed later")
+    writer.shutdown()
+    assert json.loads(logged_rows()[0]["input_data"]) == {"alerts": []}
+
+
+def test_full_queue_drops_and_reports(log_db):
+    writer = AgentLogWriter(queue_size=3, flush_interval_ms=60000)
+    writer._ensure_started = lambda: None  # keep entries queued
+    results = [writer.log(i, "agent", {}, {}) for i in range(5)]
+
+    assert results == [True, True, True, False, False]
+    stats = writer.stats()
+    assert stats["dropped"] == 2 and stats["backlog"] == 3 and stats["max_backlog"] == 3
+
+    # Shutdown flushes what is still queued
+    writer.shutdown()
+    assert len(logged_rows()) == 3
+    assert writer.stats()["backlog"] == 0
+
+
+def test_failed_batch_is_counted(tmp_path):
+    previous = db.pool_stats()["path"]
+    db.configure(path=str(tmp_path / "empty.db"))  # no agent_logs table
+    try:
+        writer = AgentLogWriter()
+        writer._ensure_started = lambda: None
+        writer.log(1, "agent", {}, {})
+        writer.flush()
+        stats = writer.stats()
+        assert stats["failed_batches"] == 1 and stats["dropped"] == 1
+        assert "agent_logs" in stats["last_error"]
+    finally:
+        db.configure(path=previous)
+
+
+# Test modules whose fixtures point the pool at a temporary database while agents log
+POOL_SWITCHING_TESTS = ["test_worklists.py", "test_case_summaries.py", "test_vitals_store.py", "test_triage_jobs.py"]
+
+
+def test_tests_leave_the_repository_database_untouched():
+    repo = os.path.dirname(os.path.abspath(__file__))
+    tracked_db = os.path.join(repo, "health.db")
+    if not os.path.exists(tracked_db):
+        pytest.skip("no health.db in the repository")
+
+    def digest():
+        with open(tracked_db, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    before = digest()
+    # One process per module: entries still queued at exit are flushed to whatever the pool points at
+    for module in POOL_SWITCHING_TESTS:
+        result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", module],
+                                cwd=repo, capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout[-2000:]
+        assert digest() == before, f"{module} wrote to {tracked_db}"
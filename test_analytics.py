@@ -0,0 +1,203 @@
+"""
+Tests for the Health Ministry analytics layer (services/analytics.py)
+Run with: python -m pytest test_analytics.py
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import db
+import migrate
+from services.analytics import AnalyticsEngine, DistrictStatsCache
+
+
+@pytest.fixture
+def live_db(tmp_path):
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    patients = [
+        (101, "Dhule", "Songir", "+911"), (102, "Dhule", "Songir", "+911"),
+        (103, "Dhule", "Kapadne", "+912"), (104, "Nashik", "Igatpuri", "+913"),
+    ]
+    conn.executemany(
+        "INSERT INTO patients (id, name, phone_number, password_hash, district, village, asha_worker_phone) "
+        "VALUES (?, 'P', 'ph' || ?, 'x', ?, ?, ?)",
+        [(pid, pid, district, village, asha) for pid, district, village, asha in patients]
+    )
+    reports = [
+        (101, "High", "fever, cough", "-1 days"),
+        (102, "Critical", "chest pain", "-2 days"),
+        (103, "Low", "rash", "-40 days"),
+        (104, "High", "high temperature", "-1 days"),
+        (999, "High", "fever", "-1 days"),          # orphan: counted in Dhule's total only
+    ]
+    conn.executemany(
+        "INSERT INTO triage_reports (patient_id, chief_complaint, symptoms, risk, timestamp) "
+        "VALUES (?, 'c', ?, ?, datetime('now', ?))",
+        [(pid, symptoms, risk, offset) for pid, risk, symptoms, offset in reports]
+    )
+    conn.commit()
+    conn.close()
+
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    db.configure(path=previous)
+
+
+def test_aggregates_match_live_database(live_db, tmp_path):
+    engine = AnalyticsEngine(snapshot_path=str(tmp_path / "snap.db"))
+
+    overview = {row["district"]: row for row in engine.district_overview()}
+    assert list(overview) == ["Dhule", "Nashik"]  # ordered by patient count
+    assert overview["Dhule"]["patient_count"] == 3
+    assert overview["Dhule"]["asha_count"] == 2
+    assert overview["Dhule"]["village_count"] == 2
+    assert overview["Dhule"]["high_risk_count"] == 2
+    assert overview["Nashik"]["high_risk_count"] == 1
+
+    assert engine.district_summary("Dhule") == {
+        "total_patients": 3, "active_workers": 2, "total_reports": 4, "high_risk_count": 2,
+    }
+    assert engine.district_summary("Dhule", since_days=30)["total_reports"] == 3
+
+    villages = {row["village"]: row["case_count"] for row in engine.village_high_risk_counts(district="Dhule")}
+    assert villages == {"Songir": 2}
+
+    assert engine.symptom_counts() == {"Fever": 3, "Cough": 1, "Headache": 1, "Other": 1}
+
+
+def test_snapshot_is_isolated_until_refresh(live_db, tmp_path):
+    engine = AnalyticsEngine(snapshot_path=str(tmp_path / "snap.db"), refresh_seconds=3600)
+    assert engine.district_summary("Nashik")["total_reports"] == 1
+
+    conn = db.get_db_connection()
+    conn.execute("INSERT INTO triage_reports (patient_id, chief_complaint, risk) VALUES (104, 'c', 'High')")
+    conn.commit()
+    conn.close()
+
+    # Served from the snapshot: the new write is not visible yet
+    assert engine.district_summary("Nashik")["total_reports"] == 1
+
+    engine.refresh()
+    assert engine.district_summary("Nashik")["high_risk_count"] == 2
+    status = engine.status()
+    assert status["refreshes"] == 2
+
+
+def test_refresh_replaces_generation_files_per_process(live_db, tmp_path):
+    snapshots = tmp_path / "snapshots"
+    snapshots.mkdir()
+    engine = AnalyticsEngine(snapshot_path=str(snapshots / "snap.db"), refresh_seconds=3600)
+    engine.refresh()
+    first = engine.status()["snapshot_file"]
+    assert os.path.basename(first) == f"snap.{os.getpid()}.1.db"
+    assert engine.district_summary("Nashik")["total_reports"] == 1   # opens the file (WAL sidecars)
+
+    engine.refresh()
+    current = engine.status()["snapshot_file"]
+    assert current != first
+    assert all(p.name.startswith(os.path.basename(current)) for p in snapshots.iterdir())
+
+
+def test_failed_build_and_close_leave_no_files(live_db, tmp_path, monkeypatch):
+    snapshots = tmp_path / "snapshots"
+    snapshots.mkdir()
+    engine = AnalyticsEngine(snapshot_path=str(snapshots / "snap.db"), refresh_seconds=3600)
+    engine.refresh()
+    current = engine.status()["snapshot_file"]
+
+    def broken(schema):
+        raise sqlite3.OperationalError("boom")
+    monkeypatch.setattr("services.analytics._facts_sql", broken)
+    with pytest.raises(sqlite3.OperationalError):
+        engine.refresh()
+    assert engine.status()["snapshot_file"] == current
+    assert all(p.name.startswith(os.path.basename(current)) for p in snapshots.iterdir())
+
+    engine.close()
+    assert list(snapshots.iterdir()) == []
+
+
+def test_first_refresh_sweeps_files_of_dead_processes(live_db, tmp_path, monkeypatch):
+    snapshots = tmp_path / "snapshots"
+    snapshots.mkdir()
+    for name in ("snap.424242.3.db", "snap.424242.3.db-wal", "snap.424243.1.db-shm",
+                 "snap.515151.2.db", "snap.notes.db"):
+        (snapshots / name).write_bytes(b"")
+    monkeypatch.setattr("services.analytics._pid_alive", lambda pid: pid == 515151)
+
+    engine = AnalyticsEngine(snapshot_path=str(snapshots / "snap.db"), refresh_seconds=3600)
+    engine.refresh()
+    current = os.path.basename(engine.status()["snapshot_file"])
+    assert sorted(p.name for p in snapshots.iterdir() if not p.name.startswith(current)) == [
+        "snap.515151.2.db", "snap.notes.db"]
+    engine.close()
+
+
+def test_ensure_snapshot_refreshes_stale_snapshot_without_a_query(live_db, tmp_path):
+    # What the ministry ETag relies on: revalidations that end in 304 run no query
+    engine = AnalyticsEngine(snapshot_path=str(tmp_path / "snap.db"), refresh_seconds=0)
+    engine.ensure_snapshot()
+    first = engine.refreshed_at
+    assert first is not None
+
+    time.sleep(0.01)
+    engine.ensure_snapshot()
+    deadline = time.time() + 5
+    while engine.refreshed_at == first and time.time() < deadline:
+        time.sleep(0.01)
+    assert engine.refreshed_at > first
+    assert engine.status()["queries"] == 0
+
+
+def test_district_stats_match_per_district_queries(live_db, tmp_path):
+    engine = AnalyticsEngine(snapshot_path=str(tmp_path / "snap.db"))
+    stats = DistrictStatsCache(engine).get()
+
+    assert stats["overview"] == engine.district_overview()
+    for district in ("Dhule", "Nashik"):
+        row = stats["districts"][district]
+        summary = {key: row[key] for key in ("total_patients", "active_workers", "total_reports", "high_risk_count")}
+        assert summary == engine.district_summary(district)
+        assert row["villages"] == engine.village_high_risk_counts(district=district)
+        assert row["symptoms"] == engine.symptom_counts(district=district)
+    by_village = {row["village"]: row["case_count"] for row in engine.village_high_risk_counts()}
+    assert {row["village"]: row["case_count"] for row in stats["villages"]} == by_village
+    assert stats["symptoms"] == engine.symptom_counts()
+
+
+def test_district_stats_single_flight_and_ttl(live_db, tmp_path):
+    engine = AnalyticsEngine(snapshot_path=str(tmp_path / "snap.db"), refresh_seconds=3600)
+    engine.refresh()
+    calls = []
+    compute = engine.district_stats
+
+    def slow_compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return compute()
+
+    engine.district_stats = slow_compute
+    cache = DistrictStatsCache(engine, ttl_seconds=3600)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1 and len(results) == 8
+    assert all(result is results[0] for result in results)
+    assert cache.get() is results[0]
+    assert cache.stats()["computations"] == 1 and cache.stats()["waits"] + cache.stats()["hits"] == 8
+    assert cache.district("Pune")["total_reports"] == 0
+
+    # A rebuilt snapshot makes the cached value stale before the TTL runs out
+    engine.refresh()
+    cache.get()
+    assert len(calls) == 2
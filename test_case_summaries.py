@@ -0,0 +1,90 @@
+"""
+Tests for versioned case summaries (services/case_summaries.py)
+Run with: python -m pytest test_case_summaries.py
+"""
+import sqlite3
+
+import pytest
+
+import db
+import migrate
+from services.agent_log import agent_log_writer
+from services.case_summaries import CaseSummaryStore
+
+
+@pytest.fixture
+def summary_db(tmp_path):
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    for pid in (1, 2):
+        conn.execute(
+            "INSERT INTO patients (id, name, phone_number, password_hash, age, gender, village, asha_worker_phone) "
+            "VALUES (?, ?, ?, 'x', 60, 'M', 'Songir', '+919100000001')", (pid, f"P{pid}", f"ph{pid}")
+        )
+    conn.execute("INSERT INTO triage_reports (patient_id, chief_complaint, symptoms) VALUES (1, 'chest pain', 'sweating')")
+    conn.execute("INSERT INTO referrals (patient_id, referred_by_asha, reason, priority, status) "
+                 "VALUES (1, '+919100000001', 'chest pain', 'Urgent', 'Pending')")
+    conn.commit()
+    conn.close()
+
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    agent_log_writer.flush()  # write queued entries to this test's database
+    db.configure(path=previous)
+
+
+def execute(sql, params=()):
+    conn = db.get_db_connection()
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_first_read_queues_generation_then_serves_finished_summary(summary_db):
+    store = CaseSummaryStore(use_llm=False)
+    assert store.get_summaries([1]) == {}
+
+    store.wait()
+    summary = store.get_summaries([1])[1]
+    assert "chest pain" in summary["summary"] and not summary["stale"]
+    assert store.status()["generated"] == 1
+
+
+def test_data_change_marks_summary_stale_until_regenerated(summary_db):
+    store = CaseSummaryStore(use_llm=False)
+    store.regenerate(1)
+
+    execute("INSERT INTO prescriptions (patient_id, medication_name, dosage, is_active) "
+            "VALUES (1, 'Aspirin', '75mg', 1)")
+    stale = store.get_summary(1)
+    assert stale["stale"] and "Aspirin" not in stale["summary"]  # old summary is still served
+
+    store.wait()
+    fresh = store.get_summary(1)
+    assert not fresh["stale"] and "Aspirin" in fresh["summary"]
+
+
+def test_unrelated_patients_stay_fresh(summary_db):
+    store = CaseSummaryStore(use_llm=False)
+    store.regenerate(1)
+    store.regenerate(2)
+
+    execute("INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (2, 'BP', 150, 95)")
+    summaries = store.get_summaries([1, 2])
+    assert not summaries[1]["stale"] and summaries[2]["stale"]
+    store.wait()
+
+
+def test_refresh_outdated_only_queues_referred_patients(summary_db):
+    store = CaseSummaryStore(use_llm=False)
+    assert store.refresh_outdated() == 1
+    store.wait()
+    assert store.refresh_outdated() == 0
+
+    execute("INSERT INTO patient_alerts (patient_id, alert_type, severity, message) VALUES (1, 'X', 'HIGH', 'bp')")
+    assert store.refresh_outdated() == 1
+    store.wait()
@@ -0,0 +1,101 @@
+"""
+Tests for downsampled chart series (services/chart_series.py)
+Run with: python -m pytest test_chart_series.py
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import db
+import migrate
+from services.chart_series import ChartSeriesCache, bucket_means, downsample, lttb_indices
+
+
+@pytest.fixture
+def chart_db(tmp_path):
+    """Patient 1 with three years of twice-daily BP readings and weekly sugar readings"""
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    conn.execute("INSERT INTO patients (id, name, phone_number, password_hash) VALUES (1, 'P1', 'ph1', 'x')")
+    start = datetime.now() - timedelta(days=3 * 365)
+    rows = []
+    for i in range(3 * 365 * 2):
+        ts = (start + timedelta(hours=12 * i)).strftime("%Y-%m-%d %H:%M:%S")
+        rows.append((1, "BP", 120 + (i % 10), 80, ts))
+        if i % 14 == 0:
+            rows.append((1, "SUGAR", 110, None, ts))
+    conn.executemany("INSERT INTO readings (patient_id, reading_type, value1, value2, timestamp) VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    db.configure(path=previous)
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10000) * 3600
+    y = np.full(10000, 120.0)
+    y[4321] = 220
+    keep = lttb_indices(x, y, 100)
+    assert len(keep) == 100 and keep[0] == 0 and keep[-1] == 9999
+    assert 4321 in keep
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_bucket_means_average_each_time_bucket():
+    x = np.array([0, 1, 2, 3, 10, 11], dtype=np.int64)
+    bx, (values,) = bucket_means(x, [np.array([1, 3, 5, 7, 10, np.nan])], 2)
+    assert list(values) == [4.0, 10.0]
+    assert list(bx) == [1.5, 10.5]
+
+
+def test_downsample_small_series_is_unchanged():
+    rows = [{"timestamp": f"2025-05-0{d} 09:00:00", "value1": 120 + d, "value2": 80} for d in range(1, 6)]
+    series = downsample(rows, 60, "lttb", two_values=True)
+    assert series["systolic"] == [121, 122, 123, 124, 125]
+    assert series["labels"][0] == "01-May" and series["raw_points"] == 5
+
+
+def test_long_history_stays_within_budget(chart_db):
+    cache = ChartSeriesCache()
+    series = cache.get_series(1, points=50)
+    assert series["bp"]["raw_points"] == 3 * 365 * 2
+    assert len(series["bp"]["systolic"]) == len(series["bp"]["labels"]) == 50
+    assert len(series["sugar"]["values"]) == 50
+    assert series["bp"]["labels"][0].count(" ") == 1  # multi-year range: "Mon YYYY" labels
+
+    bucketed = cache.get_series(1, points=50, method="bucket")
+    assert len(bucketed["bp"]["systolic"]) <= 50
+
+    recent = cache.get_series(1, since=datetime.now() - timedelta(days=30), points=500)
+    assert recent["bp"]["raw_points"] == len(recent["bp"]["systolic"]) <= 61
+
+
+def test_cache_is_reused_until_readings_change(chart_db):
+    cache = ChartSeriesCache()
+    first = cache.get_series(1, points=40)
+    assert cache.get_series(1, points=40) is first
+    assert cache.stats()["hits"] == 1
+
+    conn = db.get_db_connection()
+    conn.execute("INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (1, 'BP', 190, 110)")
+    conn.commit()
+    conn.close()
+    updated = cache.get_series(1, points=40)
+    assert updated is not first and updated["bp"]["systolic"][-1] == 190
+
+    # A corrected value keeps the count and the latest id but bumps the readings version
+    conn = db.get_db_connection()
+    conn.execute("UPDATE readings SET value1 = 170 WHERE id = (SELECT MAX(id) FROM readings)")
+    conn.commit()
+    conn.close()
+    corrected = cache.get_series(1, points=40)
+    assert corrected is not updated and corrected["bp"]["systolic"][-1] == 170
+
+    with pytest.raises(ValueError):
+        cache.get_series(1, method="fft")
@@ -0,0 +1,78 @@
+"""
+Tests for the per-scope data version counters (services/data_versions.py, migrations 016 and 023)
+Run with: python -m pytest test_data_versions.py
+"""
+import sqlite3
+
+import pytest
+
+import migrate
+from services.data_versions import DOCTOR_QUEUE_SCOPE, district_scope, get_versions, make_etag, worker_scope
+
+WORKER_A, WORKER_B = "+911", "+912"
+SCOPES = [worker_scope(WORKER_A), worker_scope(WORKER_B), DOCTOR_QUEUE_SCOPE,
+          district_scope("Dhule"), district_scope("Nashik")]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "health.db"))
+    migrate.run_migrations(conn, verbose=False)
+    conn.executemany(
+        "INSERT INTO patients (id, name, phone_number, password_hash, district, village, asha_worker_phone) "
+        "VALUES (?, 'P', 'ph' || ?, 'x', ?, ?, ?)",
+        [(1, 1, "Dhule", "Songir", WORKER_A), (2, 2, "Nashik", "Igatpuri", WORKER_B)]
+    )
+    conn.commit()
+    return conn
+
+
+def changed(conn, write):
+    """Scopes whose version the write bumped"""
+    before = get_versions(SCOPES, conn=conn)
+    write()
+    after = get_versions(SCOPES, conn=conn)
+    return {scope for scope in SCOPES if after[scope] != before[scope]}
+
+
+def test_writes_bump_only_the_scopes_they_affect(conn):
+    assert changed(conn, lambda: conn.execute(
+        "INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (1, 'BP', 150, 95)"
+    )) == {worker_scope(WORKER_A)}
+
+    assert changed(conn, lambda: conn.execute(
+        "INSERT INTO triage_reports (patient_id, chief_complaint, risk) VALUES (2, 'c', 'High')"
+    )) == {worker_scope(WORKER_B), DOCTOR_QUEUE_SCOPE, district_scope("Nashik")}
+
+    assert changed(conn, lambda: conn.execute(
+        "INSERT INTO referrals (patient_id, referred_by_asha, reason) VALUES (1, ?, 'x')", (WORKER_A,)
+    )) == {DOCTOR_QUEUE_SCOPE}
+
+    assert changed(conn, lambda: conn.execute(
+        "INSERT INTO ministry_advisories (district, village, content) VALUES ('Dhule', 'Songir', 'boil water')"
+    )) == {worker_scope(WORKER_A), district_scope("Dhule")}
+
+    assert changed(conn, lambda: conn.execute(
+        "INSERT INTO follow_up_schedule (patient_id, scheduled_date, visit_type, priority) "
+        "VALUES (2, '2024-01-05', 'BP check', 'HIGH')"
+    )) == {worker_scope(WORKER_B)}
+    assert changed(conn, lambda: conn.execute(
+        "UPDATE follow_up_schedule SET patient_id = 1 WHERE patient_id = 2"
+    )) == {worker_scope(WORKER_A), worker_scope(WORKER_B)}
+    assert changed(conn, lambda: conn.execute("DELETE FROM follow_up_schedule")) == {worker_scope(WORKER_A)}
+
+    # Moving a patient to another worker changes both workers' dashboards
+    assert changed(conn, lambda: conn.execute(
+        "UPDATE patients SET asha_worker_phone = ? WHERE id = 1", (WORKER_B,)
+    )) == {worker_scope(WORKER_A), worker_scope(WORKER_B), DOCTOR_QUEUE_SCOPE}
+
+
+def test_etag_changes_with_versions_and_parts(conn):
+    scopes = [worker_scope(WORKER_A)]
+    etag = make_etag(scopes, "/dashboard", conn=conn)
+    assert make_etag(scopes, "/dashboard", conn=conn) == etag
+    assert make_etag(scopes, "/dashboard?cursor=x", conn=conn) != etag
+    assert make_etag([worker_scope("+999")], "/dashboard", conn=conn) != etag
+
+    conn.execute("INSERT INTO patient_alerts (patient_id, alert_type, severity, message) VALUES (1, 'BP', 'HIGH', 'x')")
+    assert make_etag(scopes, "/dashboard", conn=conn) != etag
@@ -0,0 +1,92 @@
+"""
+Tests for the shared SQLite connection pool (db.py)
+Run with: python -m pytest test_db_pool.py
+"""
+import threading
+
+import db
+
+
+def make_pool(tmp_path, **kwargs):
+    return db.ConnectionPool(path=str(tmp_path / "pool_test.db"), **kwargs)
+
+
+def test_connections_are_reused_and_configured(tmp_path):
+    pool = make_pool(tmp_path, pool_size=2, max_overflow=0)
+
+    conn = pool.connect()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == db.BUSY_TIMEOUT_MS
+    conn.close()
+
+    conn = pool.connect()
+    conn.close()
+    conn.close()  # double close is a no-op
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 1
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+    pool.close_all()
+
+
+def test_rows_and_uncommitted_work_is_rolled_back(tmp_path):
+    pool = make_pool(tmp_path)
+    conn = pool.connect()
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.execute("INSERT INTO t (name) VALUES ('kept')")
+    conn.commit()
+    conn.execute("INSERT INTO t (name) VALUES ('discarded')")
+    conn.close()
+
+    conn = pool.connect()
+    rows = conn.execute("SELECT name FROM t").fetchall()
+    assert [r["name"] for r in rows] == ["kept"]
+    conn.close()
+    pool.close_all()
+
+
+def test_nested_checkout_in_same_thread_does_not_block(tmp_path):
+    pool = make_pool(tmp_path, pool_size=1, max_overflow=0, timeout=0.2)
+    outer = pool.connect()
+    inner = pool.connect()  # would time out if the pool ignored thread ownership
+    inner.close()
+    outer.close()
+    assert pool.stats()["overflow_checkouts"] == 1
+    pool.close_all()
+
+
+def test_other_threads_wait_for_a_free_connection(tmp_path):
+    pool = make_pool(tmp_path, pool_size=1, max_overflow=0, timeout=5)
+    held = pool.connect()
+    acquired = threading.Event()
+
+    def worker():
+        conn = pool.connect()
+        acquired.set()
+        conn.close()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    assert not acquired.wait(0.1)
+    held.close()
+    t.join(2)
+    assert acquired.is_set()
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["wait_time_ms_max"] > 0
+    pool.close_all()
+
+
+def test_leaked_connection_is_returned(tmp_path):
+    pool = make_pool(tmp_path, pool_size=1, max_overflow=0)
+    conn = pool.connect()
+    del conn
+    stats = pool.stats()
+    assert stats["in_use"] == 0
+    assert stats["leaked_returns"] == 1
+    pool.close_all()
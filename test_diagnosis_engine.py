@@ -0,0 +1,85 @@
+"""
+Tests for the differential diagnosis engines (services/diagnosis_engine.py)
+Run with: python -m pytest test_diagnosis_engine.py
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+
+from agents import triage_agent
+from services.diagnosis_engine import LinearEngine, export_linear_model, load_npz
+
+TEXTS = ["fever cough chills", "Fever, body ache and chills", "chest pain sweating", "chest pain breathless",
+         "itchy rash on skin", "skin rash redness", "loose motions vomiting", "vomiting stomach cramps"]
+LABELS = ["Flu", "Flu", "Heart attack", "Heart attack", "Dermatitis", "Dermatitis", "Gastroenteritis",
+          "Gastroenteritis"]
+QUERIES = ["FEVER and cough", "chest pain, chest pain", "red rash", "unknown words only", ""]
+
+
+def fit(model, **vectorizer_params):
+    vectorizer = TfidfVectorizer(stop_words="english", **vectorizer_params)
+    return vectorizer, model.fit(vectorizer.fit_transform(TEXTS), LABELS)
+
+
+@pytest.mark.parametrize("model", [LogisticRegression(C=10, max_iter=1000), MultinomialNB(alpha=0.1)])
+def test_linear_engine_matches_predict_proba(tmp_path, model):
+    vectorizer, model = fit(model)
+    path = str(tmp_path / "linear.npz")
+    export_linear_model(path, vectorizer, model)
+    engine = LinearEngine.load(path)
+
+    for query in QUERIES:
+        expected = model.predict_proba(vectorizer.transform([query]))[0]
+        np.testing.assert_allclose(engine.probabilities(query), expected, rtol=1e-4, atol=1e-6)
+
+    top = engine.top_n("chest pain sweating", top_n=2)
+    assert [d["disease"] for d in top][0] == "Heart attack"
+    assert top[0]["confidence"] >= top[1]["confidence"]
+    assert len(engine.top_n("fever", top_n=10)) == len(model.classes_)
+
+
+def test_exported_arrays_are_memory_mapped(tmp_path):
+    vectorizer, model = fit(LogisticRegression(max_iter=1000))
+    path = str(tmp_path / "linear.npz")
+    export_linear_model(path, vectorizer, model)
+
+    arrays = load_npz(path)
+    assert isinstance(arrays["coef"], np.memmap)
+    assert arrays["coef"].shape == (len(model.classes_), len(vectorizer.vocabulary_))
+
+    # Compressed archives cannot be mapped and are read into memory instead
+    compressed = str(tmp_path / "compressed.npz")
+    np.savez_compressed(compressed, **{name: np.asarray(a) for name, a in arrays.items()})
+    assert LinearEngine.load(compressed).top_n("rash", 1) == LinearEngine.load(path).top_n("rash", 1)
+
+
+def test_export_rejects_features_the_engine_cannot_reproduce(tmp_path):
+    vectorizer, model = fit(LogisticRegression(max_iter=1000), ngram_range=(1, 2))
+    with pytest.raises(ValueError, match="ngram_range"):
+        export_linear_model(str(tmp_path / "linear.npz"), vectorizer, model)
+
+
+def test_triage_uses_the_configured_engine(tmp_path, monkeypatch):
+    vectorizer, model = fit(LogisticRegression(C=10, max_iter=1000))
+    export_linear_model(str(tmp_path / "linear.npz"), vectorizer, model)
+    monkeypatch.setattr(triage_agent, "LINEAR_MODEL_PATH", str(tmp_path / "linear.npz"))
+    # The linear engine needs only its .npz; no pickles or CSV in the working directory
+    monkeypatch.chdir(tmp_path)
+
+    for engine, state in (("linear", "ready"), ("boosted", "unavailable")):
+        monkeypatch.setattr(triage_agent, "DIAGNOSIS_ENGINE", engine)
+        monkeypatch.setattr(triage_agent, "_model", None)
+        monkeypatch.setattr(triage_agent, "_model_status", {"state": "not_loaded"})
+        status = triage_agent.warm_up()
+        assert (status["engine"], status["state"]) == (engine, state)
+        assert (status["identity"] or "").startswith("linear:linear.npz@") == (state == "ready")
+
+    monkeypatch.setattr(triage_agent, "DIAGNOSIS_ENGINE", "linear")
+    monkeypatch.setattr(triage_agent, "_model_status", {"state": "not_loaded"})
+    differential = triage_agent.get_differential_diagnosis("itchy skin rash", top_n=3)
+    assert differential[0]["disease"] == "Dermatitis"
+    assert isinstance(differential[0]["disease"], str) and len(differential) == 3
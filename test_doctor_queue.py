@@ -0,0 +1,111 @@
+"""
+Tests for the doctor dashboard's high-risk queue (services/doctor_queue.py, migration 013)
+Run with: python -m pytest test_doctor_queue.py
+Timings of the legacy and rewritten queries: python bench_doctor_queue.py
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import migrate
+from bench_doctor_queue import LEGACY_HIGH_RISK_SQL, seed
+from services.doctor_queue import HIGH_RISK_PATIENTS_SQL, load_high_risk_patients
+
+
+def ts(days_ago: float) -> str:
+    return (datetime.utcnow() - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def make_db(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    migrate.run_migrations(conn, verbose=False)
+    conn.execute("DELETE FROM patient_alerts")  # demo alert from migration 002
+    return conn
+
+
+def add_report(conn, patient_id, days_ago, risk="Low", reviewed=0, complaint="fever"):
+    conn.execute("INSERT INTO triage_reports (patient_id, chief_complaint, risk, doctor_reviewed, ai_prediction, timestamp) "
+                 "VALUES (?, ?, ?, ?, ?, ?)", (patient_id, complaint, risk, reviewed, "<p>" + "x" * 500 + "</p>", ts(days_ago)))
+
+
+def add_patient(conn, patient_id):
+    conn.execute("INSERT INTO patients (id, name, phone_number, password_hash, age, village) "
+                 "VALUES (?, ?, ?, 'x', 40, 'Songir')", (patient_id, f"P{patient_id}", f"ph{patient_id}"))
+
+
+@pytest.fixture
+def large_db(tmp_path):
+    """3,000 patients with 12 reports each; 400 with open HIGH alerts, 300 with a recent high-risk report"""
+    conn = make_db(str(tmp_path / "large.db"))
+    seed(conn)
+    return conn
+
+
+def test_one_row_per_flagged_patient(large_db):
+    legacy_rows = large_db.execute(LEGACY_HIGH_RISK_SQL).fetchall()
+    rows = large_db.execute(HIGH_RISK_PATIENTS_SQL).fetchall()
+
+    flagged = {row["id"] for row in legacy_rows}
+    assert len(rows) == len({row["id"] for row in rows}) == len(flagged)
+    assert {row["id"] for row in rows} == flagged
+    assert len(legacy_rows) > 5 * len(rows)  # alerts x reports before this change
+
+
+def test_filters_are_answered_from_indexes(large_db):
+    plan = [row[3] for row in large_db.execute("EXPLAIN QUERY PLAN " + HIGH_RISK_PATIENTS_SQL)]
+    assert any(step.startswith("SEARCH triage_reports USING INDEX idx_triage_reports_risk_review_ts")
+               for step in plan)
+    assert any(step.startswith("SEARCH patient_alerts USING COVERING INDEX idx_patient_alerts_open_severity")
+               for step in plan)
+    # Only the small intermediate results are scanned, never a base table
+    assert not [step for step in plan if step.startswith("SCAN")
+                and step.split()[1] in ("triage_reports", "patient_alerts", "patients", "latest_triage")]
+
+
+def test_sources_and_latest_complaint(tmp_path):
+    conn = make_db(str(tmp_path / "health.db"))
+    for pid in (1, 2, 3, 4):
+        add_patient(conn, pid)
+    # 1: alert only -> latest triage of any risk
+    conn.execute("INSERT INTO patient_alerts (patient_id, alert_type, severity, message) VALUES (1, 'BP', 'HIGH', 'x')")
+    add_report(conn, 1, 20, complaint="old")
+    add_report(conn, 1, 2, complaint="cough")
+    # 2: alert and an unreviewed high-risk report -> one TRIAGE row for that report
+    conn.execute("INSERT INTO patient_alerts (patient_id, alert_type, severity, message) VALUES (2, 'BP', 'HIGH', 'x')")
+    add_report(conn, 2, 3, risk="Critical", complaint="chest pain")
+    add_report(conn, 2, 1, risk="Low", complaint="follow-up")
+    # 3: reviewed high-risk report, 4: high-risk report older than 7 days -> not flagged
+    add_report(conn, 3, 1, risk="High", reviewed=1)
+    add_report(conn, 4, 9, risk="High")
+    conn.commit()
+
+    rows = {row["id"]: row for row in load_high_risk_patients(conn)}
+    assert set(rows) == {1, 2}
+    assert rows[1]["source"] == "ALERT" and rows[1]["latest_complaint"] == "cough"
+    assert rows[2]["source"] == "TRIAGE" and rows[2]["latest_complaint"] == "chest pain"
+    assert rows[2]["latest_risk"] == "Low"
+
+
+def test_latest_triage_follows_inserts_updates_and_deletes(tmp_path):
+    conn = make_db(str(tmp_path / "health.db"))
+    add_patient(conn, 1)
+
+    def latest():
+        row = conn.execute("SELECT chief_complaint, risk FROM latest_triage WHERE patient_id = 1").fetchone()
+        return tuple(row) if row else None
+
+    add_report(conn, 1, 5, complaint="first")
+    add_report(conn, 1, 1, complaint="second", risk="High")
+    add_report(conn, 1, 9, complaint="back-dated")
+    assert latest() == ("second", "High")
+
+    conn.execute("UPDATE triage_reports SET doctor_reviewed = 1, risk = 'Moderate' WHERE chief_complaint = 'second'")
+    assert latest() == ("second", "Moderate")
+
+    conn.execute("DELETE FROM triage_reports WHERE chief_complaint = 'second'")
+    assert latest() == ("first", "Low")
+
+    conn.execute("DELETE FROM triage_reports")
+    assert latest() is None
@@ -0,0 +1,104 @@
+"""
+Tests for the live event bus (services/events.py)
+Run with: python -m pytest test_events.py
+"""
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import migrate
+from services import events
+from services.data_versions import DOCTOR_QUEUE_SCOPE, worker_scope
+from services.events import EventBus, publish_alert, publish_referral, sse_stream
+
+
+def drain(sub):
+    items = []
+    while True:
+        item = sub.get(timeout=0)
+        if item is None:
+            return items
+        items.append(item)
+
+
+def test_publish_reaches_only_the_channel_subscribers():
+    bus = EventBus()
+    a, b = bus.subscribe("worker:+911"), bus.subscribe("worker:+912")
+    bus.publish("worker:+911", "alert", {"patient_id": 1})
+    assert [e["data"] for e in drain(a)] == [{"patient_id": 1}]
+    assert drain(b) == []
+
+    bus.unsubscribe(a)
+    bus.publish("worker:+911", "alert", {"patient_id": 2})
+    assert drain(a) == []
+    assert bus.stats()["subscribers"] == 1
+
+
+def test_slow_subscriber_is_disconnected_and_resumes_from_history():
+    bus = EventBus(queue_size=3, history_size=10)
+    slow = bus.subscribe("doctor_queue")
+    first = bus.publish("doctor_queue", "referral", {"n": 0})
+    assert slow.get(timeout=0)["id"] == first
+    ids = [bus.publish("doctor_queue", "referral", {"n": n}) for n in range(1, 6)]
+
+    assert drain(slow) == [events._CLOSED] and slow.overflowed
+    resumed = bus.subscribe("doctor_queue", last_event_id=first)
+    assert [e["id"] for e in drain(resumed)] == ids
+    assert bus.stats()["overflows"] == 1
+
+
+def test_subscriber_limit():
+    bus = EventBus(max_subscribers=1)
+    assert bus.subscribe("a") is not None
+    assert bus.subscribe("b") is None
+    assert bus.stats()["rejected"] == 1
+
+
+def test_sse_stream_format_and_heartbeat():
+    bus = EventBus()
+    sub = bus.subscribe("worker:+911")
+    stream = sse_stream(bus, sub, heartbeat=0.01)
+    assert next(stream).startswith("retry:")
+    assert next(stream) == ": keep-alive\n\n"
+
+    event_id = bus.publish("worker:+911", "alert", {"message": "SOS"})
+    assert next(stream) == f'id: {event_id}\nevent: alert\ndata: {json.dumps({"message": "SOS"})}\n\n'
+    stream.close()
+    assert bus.stats()["subscribers"] == 0
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(events, "event_bus", EventBus())
+    conn = sqlite3.connect(str(tmp_path / "health.db"), check_same_thread=False)
+    migrate.run_migrations(conn, verbose=False)
+    conn.execute("INSERT INTO patients (id, name, phone_number, password_hash, village, asha_worker_phone) "
+                 "VALUES (1, 'Asha Patil', 'ph1', 'x', 'Songir', '+911')")
+    conn.commit()
+    return conn
+
+
+def test_alert_and_referral_routing(conn):
+    bus = events.event_bus
+    worker, doctor = bus.subscribe(worker_scope("+911")), bus.subscribe(DOCTOR_QUEUE_SCOPE)
+
+    publish_alert(conn, 1, "MODERATE", "VITAL_TREND_WORSENING", "BP rising")
+    publish_alert(conn, 1, "CRITICAL", "SOS_TRIGGERED", "Manual SOS triggered by ASHA")
+    publish_alert(conn, 1, "MODERATE", "TRIAGE_RISK", "High risk triage", notify_doctors=True)
+    publish_referral(conn, 1, "+911", "chest pain", "Emergency")
+
+    assert [e["data"]["alert_type"] for e in drain(worker)] == ["VITAL_TREND_WORSENING", "SOS_TRIGGERED", "TRIAGE_RISK"]
+    doctor_events = drain(doctor)
+    assert [e["type"] for e in doctor_events] == ["alert", "alert", "referral"]
+    assert doctor_events[0]["data"]["patient_name"] == "Asha Patil"
+    assert doctor_events[2]["data"]["priority"] == "Emergency"
+
+
+def test_waiting_stream_receives_event_from_another_thread():
+    bus = EventBus()
+    sub = bus.subscribe(DOCTOR_QUEUE_SCOPE)
+    threading.Timer(0.05, bus.publish, args=(DOCTOR_QUEUE_SCOPE, "alert", {"severity": "CRITICAL"})).start()
+    event = sub.get(timeout=2)
+    assert event["data"] == {"severity": "CRITICAL"}
@@ -0,0 +1,98 @@
+"""
+Tests for district hotspot detection (services/hotspots.py, migration 015)
+Run with: python -m pytest test_hotspots.py
+"""
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+import migrate
+from services.hotspots import detect_hotspots, score, village_signals, window_index
+
+TODAY = date(2025, 6, 30)
+
+BUCKETS_SQL = """
+    SELECT COALESCE(p.district, ''), COALESCE(p.village, ''), substr(tr.timestamp, 1, 10),
+           COUNT(*), SUM(CASE WHEN tr.risk IN ('High', 'Critical') THEN 1 ELSE 0 END)
+    FROM triage_reports tr JOIN patients p ON p.id = tr.patient_id
+    GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "health.db"))
+    migrate.run_migrations(conn, verbose=False)
+    patients = [(1, "Dhule", "Songir"), (2, "Dhule", "Kapadne"), (3, "Nashik", "Igatpuri"), (4, "Dhule", "Nimgul")]
+    conn.executemany(
+        "INSERT INTO patients (id, name, phone_number, password_hash, district, village) VALUES (?, 'P', 'ph' || ?, 'x', ?, ?)",
+        [(pid, pid, district, village) for pid, district, village in patients]
+    )
+    return conn
+
+
+def add_reports(conn, patient_id, days_ago, count=1, risk="High"):
+    day = (TODAY - timedelta(days=days_ago)).strftime("%Y-%m-%d 10:00:00")
+    conn.executemany("INSERT INTO triage_reports (patient_id, chief_complaint, risk, timestamp) VALUES (?, 'c', ?, ?)",
+                     [(patient_id, risk, day)] * count)
+
+
+def buckets(conn):
+    return conn.execute("SELECT district, village, day, reports, high_risk FROM village_daily "
+                        "WHERE reports != 0 ORDER BY 1, 2, 3").fetchall()
+
+
+def test_window_index():
+    assert [window_index(d, 7, 4, 0) for d in (0, 6, 7, 13, 14, 34, 35)] == [0, 0, 1, 1, 2, 4, None]
+    assert [window_index(d, 7, 2, 2) for d in (6, 7, 8, 9, 22, 23)] == [0, None, None, 1, 2, None]
+
+
+def test_score_methods():
+    assert score(8, [1, 0, 2, 1], "poisson")["trend"] == "RISING"
+    assert score(2, [1, 0, 2, 1], "poisson")["trend"] == "STABLE"
+    assert score(3, [0, 0, 0, 0], "poisson") == {"expected": 0.0, "z": 3.0, "trend": "NEW"}
+    assert score(9, [2, 3, 2, 3], "ears_c2")["z"] == 6.5
+    assert score(0, [9, 10, 8, 9], "poisson")["trend"] == "FALLING"
+
+
+def test_buckets_follow_report_and_patient_changes(conn):
+    add_reports(conn, 1, 0, count=2)
+    add_reports(conn, 1, 3, risk="Low")
+    add_reports(conn, 2, 1)
+    conn.execute("INSERT INTO triage_reports (patient_id, chief_complaint) VALUES (3, 'default timestamp')")
+    assert buckets(conn) == conn.execute(BUCKETS_SQL).fetchall()
+
+    conn.execute("UPDATE triage_reports SET risk = 'High' WHERE risk = 'Low'")
+    conn.execute("DELETE FROM triage_reports WHERE id = (SELECT MIN(id) FROM triage_reports)")
+    conn.execute("UPDATE triage_reports SET patient_id = 4 WHERE patient_id = 2")
+    conn.execute("UPDATE patients SET village = 'Dondaicha' WHERE id = 1")
+    assert buckets(conn) == conn.execute(BUCKETS_SQL).fetchall()
+
+
+def test_hotspots_compare_window_to_baseline_within_the_district(conn):
+    # Songir: steady 2 high-risk cases a week, then 9 this week -> hotspot
+    # Kapadne: steady 3 a week, 4 this week -> normal
+    # Nimgul: first cases ever, 3 this week -> NEW
+    # Igatpuri (Nashik): surge, but not part of Dhule
+    for week in range(1, 5):
+        add_reports(conn, 1, week * 7 + 2, count=2)
+        add_reports(conn, 2, week * 7 + 1, count=3)
+    add_reports(conn, 1, 1, count=9)
+    add_reports(conn, 2, 2, count=4)
+    add_reports(conn, 4, 0, count=3)
+    add_reports(conn, 3, 0, count=20)
+    add_reports(conn, 1, 60, count=50)  # outside the baseline
+    conn.commit()
+
+    signals = {s["village"]: s for s in village_signals("Dhule", conn=conn, today=TODAY)}
+    assert set(signals) == {"Songir", "Kapadne", "Nimgul"}
+    assert signals["Songir"]["cases"] == 9 and signals["Songir"]["baseline"] == [2, 2, 2, 2]
+    assert signals["Songir"]["trend"] == "RISING" and signals["Songir"]["hotspot"]
+    assert signals["Kapadne"]["trend"] == "STABLE" and not signals["Kapadne"]["hotspot"]
+    assert signals["Nimgul"]["trend"] == "NEW"
+
+    assert [s["village"] for s in detect_hotspots("Dhule", conn=conn, today=TODAY)] == ["Songir", "Nimgul"]
+    assert [s["village"] for s in detect_hotspots("Nashik", conn=conn, today=TODAY)] == ["Igatpuri"]
+    with pytest.raises(ValueError):
+        village_signals("Dhule", conn=conn, method="cusum")
@@ -0,0 +1,171 @@
+"""
+Tests for the persistent LLM response cache (services/llm_cache.py)
+Run with: python -m pytest test_llm_cache.py
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import db
+import migrate
+from services.llm_cache import LLMCache, bp_bucket, describe_bp, describe_sugar, sugar_bucket, triage_cache_key
+from services.llm_client import LLMClient, LLMUnavailable
+from test_llm_client import FakeProvider
+
+
+@pytest.fixture
+def cache_db(tmp_path):
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    conn.close()
+
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    db.configure(path=previous)
+
+
+class Upstream:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"answer {self.calls}"
+
+
+def test_triage_key_ignores_order_case_and_nearby_vitals():
+    a = triage_cache_key(34, "Fever ", ["Cough", "fever"], {"latest_bp": "122/80", "latest_sugar": "110 mg/dL"}, [])
+    b = triage_cache_key(38, "fever", ["fever", "cough", "FEVER"], {"latest_bp": "118/78", "latest_sugar": "95 mg/dL"}, [])
+    assert a == b
+    c = triage_cache_key(38, "fever", ["fever", "cough"], {"latest_bp": "165/100", "latest_sugar": "95 mg/dL"}, [])
+    assert c != b and c["bp"] == "critical"
+    assert triage_cache_key(70, "fever", ["fever", "cough"], {}, [])["age_band"] == "60+"
+    assert (bp_bucket("N/A"), sugar_bucket("260 mg/dL"), sugar_bucket("N/A")) == ("unknown", "critical", "unknown")
+
+
+def test_triage_key_separates_notes_and_prompt_shows_only_buckets():
+    vitals = {"latest_bp": "122/80", "latest_sugar": "110 mg/dL", "risk_check": "Normal"}
+    plain = triage_cache_key(34, "fever", ["fever"], vitals, [], notes=" ")
+    assert plain == triage_cache_key(34, "fever", ["fever"], vitals, [], notes=None)
+    assert triage_cache_key(34, "fever", ["fever"], vitals, [], notes="7 months pregnant") != plain
+    assert triage_cache_key(34, "fever", ["fever"], {**vitals, "risk_check": "High"}, []) != plain
+
+    assert describe_bp("150/95") == "high (below 160/100)"
+    assert describe_bp("170/90") == "critical (160/100 or above)"
+    assert describe_bp("N/A") == "not recorded"
+    assert describe_sugar("180 mg/dL") == "elevated (below 200 mg/dL)"
+
+
+
+def test_triage_key_covers_differential_remedies_and_engine():
+    vitals = {"latest_bp": "122/80", "latest_sugar": "110 mg/dL", "risk_check": "Normal"}
+    differential = [{"disease": "Common Cold", "confidence": 0.61234}, {"disease": "Flu", "confidence": 0.2}]
+    engine = "forest:final_disease_model.pkl@1/10,final_vectorizer.pkl@1/5"
+
+    def key(**kwargs):
+        args = {"differential": differential, "remedies": "Ginger tea", "engine": engine, **kwargs}
+        return triage_cache_key(34, "fever", ["fever"], vitals, [], **args)
+
+    full = key()
+    assert full["differential"] == [["Common Cold", 0.612], ["Flu", 0.2]]
+    # An answer from a prompt that said "Not available" is not reused once the differential is there
+    assert key(differential=[], engine=None) != full
+    assert key(differential=[{"disease": "Common Cold", "confidence": 0.6124}, differential[1]]) == full
+    assert key(differential=[{"disease": "Common Cold", "confidence": 0.7}, differential[1]]) != full
+    assert key(differential=differential[::-1]) != full
+    assert key(remedies="Turmeric milk") != full
+    assert key(engine=engine.replace("@1/10", "@2/10")) != full
+
+def test_hits_survive_a_new_cache_instance_and_expire_after_ttl(cache_db):
+    upstream = Upstream()
+    key = {"extract_symptoms": "bukhar hai"}
+    assert LLMCache().get_or_call("chat", "m", 0.1, key, upstream) == "answer 1"
+
+    cache = LLMCache()
+    assert cache.get_or_call("chat", "m", 0.1, key, upstream) == "answer 1"
+    assert cache.get_or_call("chat", "other-model", 0.1, key, upstream) == "answer 2"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 2)
+
+    expired = LLMCache(ttl_seconds=-1)
+    assert expired.get_or_call("chat", "m", 0.1, key, upstream) == "answer 3"
+    assert expired.stats()["expired"] >= 1
+
+
+def test_least_recently_used_entries_are_evicted(cache_db):
+    cache = LLMCache(max_entries=2)
+    upstream = Upstream()
+    for name in ("a", "b"):
+        cache.get_or_call("chat", "m", 0, {"k": name}, upstream)
+        time.sleep(0.01)
+    cache.get_or_call("chat", "m", 0, {"k": "a"}, upstream)      # a is now more recent than b
+    cache.get_or_call("chat", "m", 0, {"k": "c"}, upstream)
+
+    assert cache.stats()["evictions"] == 1
+    calls = upstream.calls
+    cache.get_or_call("chat", "m", 0, {"k": "a"}, upstream)
+    assert upstream.calls == calls
+    cache.get_or_call("chat", "m", 0, {"k": "b"}, upstream)
+    assert upstream.calls == calls + 1
+
+
+def test_concurrent_identical_calls_share_one_upstream_request(cache_db):
+    cache = LLMCache()
+    upstream = Upstream(delay=0.3)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_call("triage", "m", 0.1, {"k": 1}, upstream)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert upstream.calls == 1
+    assert results == ["answer 1"] * 5
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] == 4
+
+
+def test_waiting_caller_gives_up_at_its_deadline(cache_db):
+    cache = LLMCache()
+    key = {"k": "slow"}
+    leader = threading.Thread(target=cache.get_or_call, args=("triage", "m", 0.7, key, Upstream(delay=2.0)))
+    leader.start()
+    time.sleep(0.1)
+    provider = FakeProvider()
+    try:
+        client = LLMClient(url=provider.url, api_key="test", agent_limits={}, cache=cache)
+        start = time.monotonic()
+        with pytest.raises(LLMUnavailable):
+            client.chat("triage", [], model="m", temperature=0.7, deadline=0.2, cache_key=key)
+        assert time.monotonic() - start < 1.5     # not the leader's 2 s
+    finally:
+        provider.close()
+        leader.join()
+
+    assert provider.requests == []
+    assert cache.stats()["wait_timeouts"] == 1
+    assert client.stats()["agents"]["triage"]["rejected"] == 1
+
+
+def test_client_serves_cached_triage_without_calling_upstream(cache_db):
+    provider = FakeProvider()
+    try:
+        client = LLMClient(url=provider.url, api_key="test", agent_limits={}, cache=LLMCache())
+        key = triage_cache_key(40, "cough", ["cough"], {"latest_bp": "120/80"}, [])
+        for _ in range(3):
+            assert client.chat("triage", [{"role": "user", "content": "prompt"}], model="m", cache_key=key) == "ok m"
+        client.chat("triage", [], model="m")         # no key: always upstream
+    finally:
+        provider.close()
+
+    assert len(provider.requests) == 2
+    stats = client.stats()
+    assert stats["agents"]["triage"]["calls"] == 2
+    assert stats["cache"]["hits"] == 2 and stats["cache"]["hit_rate"] == round(2 / 3, 3)
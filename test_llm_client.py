@@ -0,0 +1,129 @@
+"""
+Tests for the shared LLM client (services/llm_client.py)
+Run with: python -m pytest test_llm_client.py
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.llm_client import LLMClient, LLMError, LLMUnavailable, parse_agent_limits
+
+
+class FakeProvider:
+    """Local chat-completions endpoint that replays a script of (status, delay) responses"""
+
+    def __init__(self, script=None):
+        self.script = list(script or [])
+        self.requests = []
+        self.connections = set()
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                provider.requests.append(body)
+                provider.connections.add(self.client_address)
+                status, delay = provider.script.pop(0) if provider.script else (200, 0)
+                time.sleep(delay)
+                if status == 200:
+                    payload = {"choices": [{"message": {"content": "ok " + body["model"]}}],
+                               "usage": {"prompt_tokens": 7, "completion_tokens": 3}}
+                else:
+                    payload = {"error": status}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/chat"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def provider():
+    fake = FakeProvider()
+    yield fake
+    fake.close()
+
+
+def make_client(provider, **kwargs):
+    options = {"api_key": "test", "agent_limits": {}, "backoff_base": 0.01, "backoff_max": 0.02}
+    options.update(kwargs)
+    return LLMClient(url=provider.url, **options)
+
+
+def test_calls_reuse_pooled_connections_and_record_tokens(provider):
+    client = make_client(provider)
+    for _ in range(3):
+        assert client.chat("chat", [{"role": "user", "content": "hi"}], model="m", max_tokens=50) == "ok m"
+
+    assert len(provider.connections) == 1
+    assert provider.requests[0]["max_tokens"] == 50
+    stats = client.stats()["agents"]["chat"]
+    assert stats["calls"] == stats["succeeded"] == 3
+    assert (stats["prompt_tokens"], stats["completion_tokens"]) == (21, 9)
+    assert stats["p50_ms"] is not None and stats["in_flight"] == 0
+
+
+def test_retries_transient_errors_but_not_client_errors(provider):
+    client = make_client(provider, max_retries=2)
+    provider.script = [(503, 0), (429, 0)]
+    assert client.chat("triage", [], model="m") == "ok m"
+    assert client.stats()["agents"]["triage"]["retries"] == 2
+
+    provider.script = [(400, 0), (200, 0)]
+    with pytest.raises(LLMError):
+        client.chat("triage", [], model="m")
+    provider.script = [(500, 0)] * 3
+    with pytest.raises(LLMError):
+        client.chat("triage", [], model="m")
+    stats = client.stats()["agents"]["triage"]
+    assert (stats["calls"], stats["succeeded"], stats["failed"], stats["retries"]) == (3, 1, 2, 4)
+
+
+def test_deadline_bounds_slow_calls(provider):
+    client = make_client(provider, max_retries=5)
+    provider.script = [(200, 1.0)]
+    start = time.monotonic()
+    with pytest.raises(LLMError):
+        client.chat("chat", [], model="m", deadline=0.3)
+    assert time.monotonic() - start < 0.9
+
+
+def test_agent_limit_rejects_when_slots_stay_busy(provider):
+    client = make_client(provider, agent_limits={"case_prep": 1})
+    provider.script = [(200, 0.5)]
+    slow = threading.Thread(target=client.chat, args=("case_prep", [], "m"))
+    slow.start()
+    time.sleep(0.1)
+    with pytest.raises(LLMUnavailable):
+        client.chat("case_prep", [], model="m", deadline=0.1)
+    # Other agents are not held up by the busy one
+    assert client.chat("chat", [], model="m") == "ok m"
+    slow.join()
+    assert client.stats()["agents"]["case_prep"]["rejected"] == 1
+
+
+def test_missing_key_is_unavailable(provider, monkeypatch):
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    client = make_client(provider, api_key=None)
+    assert not client.available
+    with pytest.raises(LLMUnavailable):
+        client.chat("chat", [], model="m")
+    assert provider.requests == []
+    assert parse_agent_limits("triage=4, chat=2,") == {"triage": 4, "chat": 2}
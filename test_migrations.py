@@ -0,0 +1,137 @@
+"""
+Tests for the versioned migration runner (migrate.py)
+Run with: python -m pytest test_migrations.py
+"""
+import sqlite3
+
+import migrate
+
+
+def versions(conn):
+    return [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+
+
+def test_fresh_database_applies_every_migration(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "fresh.db"))
+    applied = migrate.run_migrations(conn, verbose=False)
+
+    expected = [m["version"] for m in migrate.discover_migrations()]
+    assert applied == expected
+    assert versions(conn) == expected
+
+    # Second run is a no-op
+    assert migrate.run_migrations(conn, verbose=False) == []
+    conn.close()
+
+
+def seed(conn, patients=200, readings_per_patient=20):
+    """Enough rows for ANALYZE to produce realistic planner statistics"""
+    for pid in range(1, patients + 1):
+        conn.execute(
+            "INSERT INTO patients (id, name, phone_number, password_hash, village, district, asha_worker_phone) "
+            "VALUES (?, ?, ?, 'x', ?, 'Dhule', ?)",
+            (pid, f"P{pid}", f"+91{pid:010d}", f"V{pid % 10}", f"+9199{pid % 20:08d}")
+        )
+        conn.executemany(
+            "INSERT INTO readings (patient_id, reading_type, value1, value2, timestamp) "
+            "VALUES (?, ?, 120, 80, datetime('now', ?))",
+            [(pid, "BP" if i % 2 else "Sugar", f"-{i} days") for i in range(readings_per_patient)]
+        )
+        conn.execute(
+            "INSERT INTO patient_alerts (patient_id, alert_type, severity, message, is_acknowledged) "
+            "VALUES (?, 'VITAL_TREND_WORSENING', 'HIGH', 'm', ?)", (pid, pid % 3 == 0)
+        )
+        conn.execute(
+            "INSERT INTO triage_reports (patient_id, chief_complaint, timestamp) VALUES (?, 'fever', datetime('now'))",
+            (pid,)
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "plans.db"))
+    migrate.run_migrations(conn, verbose=False)
+    seed(conn)
+
+    failures = migrate.check_query_plans(conn)
+    assert failures == [], failures
+    conn.close()
+
+
+def test_full_scan_is_reported(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "scan.db"))
+    migrate.run_migrations(conn, verbose=False)
+
+    failures = migrate.check_query_plans(conn, [
+        ("unindexed column", "SELECT * FROM readings WHERE value1 > ?", (140,)),
+    ])
+    assert len(failures) == 1
+    assert failures[0]["scans"][0].startswith("SCAN readings")
+    conn.close()
+
+
+def test_existing_database_is_adopted_without_rerunning_legacy_migrations(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "legacy.db"))
+    # Schema as built by the old setup_database.py
+    conn.execute("""CREATE TABLE patients (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+        phone_number TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, village TEXT,
+        district TEXT DEFAULT 'Dhule', asha_worker_phone TEXT)""")
+    conn.execute("""CREATE TABLE pharmacy_inventory (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pharmacy_id INTEGER, medication_name TEXT NOT NULL, stock_status TEXT NOT NULL)""")
+    conn.commit()
+
+    applied = migrate.run_migrations(conn, verbose=False)
+
+    assert not set(applied) & migrate.LEGACY_VERSIONS
+    assert set(versions(conn)) >= migrate.LEGACY_VERSIONS | set(applied)
+    # 002 inserts sample alerts; adoption must not have run it
+    assert conn.execute("SELECT COUNT(*) FROM patient_alerts").fetchone()[0] == 0
+    conn.close()
+
+
+def test_setup_database_schema_gets_fix_script_columns(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "setup.db"))
+    # Tables as built by setup_database.py, before the fix_* scripts patched them
+    conn.execute("""CREATE TABLE patients (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+        phone_number TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, village TEXT,
+        district TEXT DEFAULT 'Dhule', asha_worker_phone TEXT)""")
+    conn.execute("CREATE TABLE pharmacies (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, location TEXT)")
+    conn.execute("""CREATE TABLE pharmacy_inventory (id INTEGER PRIMARY KEY AUTOINCREMENT, pharmacy_id INTEGER,
+        medication_name TEXT NOT NULL, stock_status TEXT NOT NULL, last_updated DATETIME DEFAULT CURRENT_TIMESTAMP)""")
+    conn.execute("""CREATE TABLE prescriptions (id INTEGER PRIMARY KEY AUTOINCREMENT, patient_id INTEGER,
+        medication_name TEXT NOT NULL, dosage TEXT, notes TEXT, is_active INTEGER DEFAULT 1,
+        dispensing_pharmacy_id INTEGER, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)""")
+    conn.execute("INSERT INTO prescriptions (patient_id, medication_name) VALUES (1, 'Metformin 500mg')")
+    conn.execute("INSERT INTO pharmacy_inventory (pharmacy_id, medication_name, stock_status) VALUES (1, 'ORS', 'In Stock')")
+    conn.commit()
+
+    migrate.run_migrations(conn, verbose=False)
+
+    row = conn.execute("SELECT medication, status, dispensed_by, is_active FROM prescriptions").fetchone()
+    assert row == ("Metformin 500mg", "Pending", None, 1)
+    assert conn.execute("SELECT medication FROM pharmacy_inventory").fetchone()[0] == "ORS"
+    assert migrate.check_query_plans(conn) == []
+    conn.close()
+
+
+def test_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir()
+    (migrations_dir / "001_ok.sql").write_text("CREATE TABLE a (id INTEGER);")
+    (migrations_dir / "002_broken.sql").write_text("CREATE TABLE b (id INTEGER);\nINSERT INTO missing VALUES (1);")
+    monkeypatch.setattr(migrate, "MIGRATIONS_DIR", str(migrations_dir))
+    monkeypatch.setattr(migrate.discover_migrations, "__defaults__", (str(migrations_dir),))
+
+    conn = sqlite3.connect(str(tmp_path / "broken.db"))
+    try:
+        migrate.run_migrations(conn, verbose=False)
+    except sqlite3.OperationalError:
+        pass
+    else:
+        raise AssertionError("broken migration should raise")
+
+    assert versions(conn) == [1]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "a" in tables and "b" not in tables
+    conn.close()
@@ -0,0 +1,96 @@
+"""
+Tests for the monthly readings archive (services/readings_archive.py)
+Run with: python -m pytest test_readings_archive.py
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import db
+import migrate
+from services.readings_archive import archive_old_readings, get_readings
+
+NOW = datetime(2025, 6, 15, 12, 0, 0)
+
+
+@pytest.fixture
+def seeded_db(tmp_path):
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    rows = []
+    for days_ago in range(0, 400, 5):
+        ts = (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+        rows.append((1, "BP", 120 + days_ago % 30, 80, ts))
+        rows.append((1, "SUGAR", 100 + days_ago % 50, None, ts))
+        rows.append((2, "BP", 130, 85, ts))
+    conn.executemany(
+        "INSERT INTO readings (patient_id, reading_type, value1, value2, timestamp) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    db.configure(path=previous)
+
+
+def count(table):
+    conn = db.get_db_connection()
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_archive_moves_old_rows_by_month(seeded_db):
+    full_history = get_readings(1, "BP")
+    total = count("readings")
+
+    result = archive_old_readings(horizon_days=90, now=NOW)
+
+    assert result["rows_archived"] > 0
+    assert count("readings") == total - result["rows_archived"]
+    assert all(month < "2025-03-18" for month in result["months"])
+    conn = db.get_db_connection()
+    hot_oldest = conn.execute("SELECT MIN(timestamp) FROM readings").fetchone()[0]
+    registry = conn.execute("SELECT SUM(row_count) FROM readings_archive_index").fetchone()[0]
+    conn.close()
+    assert hot_oldest >= "2025-03-17"
+    assert registry == result["rows_archived"]
+
+    # Full history is unchanged, served from hot + archive
+    assert get_readings(1, "BP") == full_history
+
+    # Re-running is a no-op
+    assert archive_old_readings(horizon_days=90, now=NOW)["rows_archived"] == 0
+
+
+def test_short_windows_only_touch_hot_table(seeded_db):
+    archive_old_readings(horizon_days=90, now=NOW)
+    conn = db.get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        recent = get_readings(1, "BP", since=NOW - timedelta(days=7), conn=conn)
+        long_range = get_readings(1, "BP", since=NOW - timedelta(days=198), conn=conn)
+    finally:
+        conn.set_trace_callback(None)
+        conn.close()
+
+    reads = [s for s in statements if s.lstrip().startswith("SELECT id")]
+    assert "readings_archive_" not in reads[0]
+    assert "readings_archive_" in reads[1]
+    assert len(recent) == 2
+    assert len(long_range) == 40
+    assert [r["timestamp"] for r in long_range] == sorted(r["timestamp"] for r in long_range)
+
+
+def test_newest_first_limit_fills_from_archive(seeded_db):
+    archive_old_readings(horizon_days=30, now=NOW)
+    latest = get_readings(1, limit=20, newest_first=True, time_formats={"formatted_time": "%Y-%m-%d"})
+    assert len(latest) == 20
+    assert latest[0]["timestamp"] > latest[-1]["timestamp"]
+    assert latest[0]["formatted_time"] == "2025-06-15"
@@ -0,0 +1,100 @@
+"""
+Tests for the district symptom counters (services/symptom_stats.py, migrations 014 and 022)
+Run with: python -m pytest test_symptom_stats.py
+"""
+import sqlite3
+
+import pytest
+
+import migrate
+from services.analytics import symptom_categories
+from services.symptom_stats import district_symptom_counts, rebuild_symptom_counts
+
+REPORTS = [
+    (1, "fever, cough"),
+    (1, "High Temperature"),
+    (2, "chest pain"),
+    (2, "rash"),
+    (3, "fever"),         # Nashik
+    (4, "fever"),         # no district: not counted
+    (2, None),            # no symptom text: Other
+]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "health.db"))
+    migrate.run_migrations(conn, verbose=False)
+    patients = [(1, "Dhule"), (2, "Dhule"), (3, "Nashik"), (4, None)]
+    conn.executemany(
+        "INSERT INTO patients (id, name, phone_number, password_hash, district) VALUES (?, 'P', 'ph' || ?, 'x', ?)",
+        [(pid, pid, district) for pid, district in patients]
+    )
+    conn.commit()
+    return conn
+
+
+def add_report(conn, patient_id, symptoms):
+    """What add_triage_report does: insert the report (the triggers count it)"""
+    conn.execute("INSERT INTO triage_reports (patient_id, chief_complaint, symptoms) VALUES (?, 'c', ?)",
+                 (patient_id, symptoms))
+
+
+def counters(conn):
+    return conn.execute("SELECT * FROM symptom_daily WHERE reports != 0 ORDER BY 1, 2, 3").fetchall()
+
+
+def test_symptom_categories():
+    assert symptom_categories("Fever, Sore throat") == ["Fever", "Cough"]
+    assert symptom_categories("rash") == ["Other"]
+    assert symptom_categories(None) == ["Other"]
+
+
+def test_counters_are_scoped_to_the_district(conn):
+    for patient_id, symptoms in REPORTS:
+        add_report(conn, patient_id, symptoms)
+    conn.commit()
+
+    assert district_symptom_counts("Dhule", conn=conn) == {"Fever": 2, "Cough": 1, "Headache": 1, "Other": 2}
+    assert district_symptom_counts("Nashik", since_days=7, conn=conn) == {"Fever": 1, "Cough": 0, "Headache": 0, "Other": 0}
+    assert district_symptom_counts("Pune", conn=conn) == {"Fever": 0, "Cough": 0, "Headache": 0, "Other": 0}
+
+
+def test_rebuild_matches_incremental_counters(conn):
+    for patient_id, symptoms in REPORTS:
+        add_report(conn, patient_id, symptoms)
+    conn.execute("INSERT INTO triage_reports (patient_id, chief_complaint, symptoms, timestamp) "
+                 "VALUES (2, 'c', 'headache', '2024-01-05 10:00:00')")
+    conn.commit()
+    incremental = counters(conn)
+    assert ("Dhule", "2024-01-05", "Headache", 1) in incremental
+
+    rebuild_symptom_counts(conn)
+    assert counters(conn) == incremental
+    assert district_symptom_counts("Dhule", since_days=30, conn=conn)["Headache"] == 1
+
+
+def test_counters_follow_edits_deletes_and_district_moves(conn):
+    for patient_id, symptoms in REPORTS:
+        add_report(conn, patient_id, symptoms)
+    conn.execute("UPDATE triage_reports SET symptoms = 'cough' WHERE symptoms = 'rash'")
+    conn.execute("UPDATE triage_reports SET timestamp = '2024-01-05 10:00:00' WHERE symptoms = 'chest pain'")
+    conn.execute("UPDATE triage_reports SET symptoms = NULL WHERE symptoms = 'fever, cough'")
+    conn.execute("DELETE FROM triage_reports WHERE symptoms = 'High Temperature'")
+    conn.execute("UPDATE patients SET district = 'Nashik' WHERE id = 2")
+    conn.execute("UPDATE patients SET district = 'Pune' WHERE id = 4")
+    conn.execute("DELETE FROM patients WHERE id = 3")
+    conn.commit()
+
+    assert district_symptom_counts("Dhule", conn=conn) == {"Fever": 0, "Cough": 0, "Headache": 0, "Other": 1}
+    assert district_symptom_counts("Nashik", conn=conn) == {"Fever": 0, "Cough": 1, "Headache": 1, "Other": 1}
+    assert district_symptom_counts("Pune", conn=conn) == {"Fever": 1, "Cough": 0, "Headache": 0, "Other": 0}
+    incremental = counters(conn)
+    rebuild_symptom_counts(conn)
+    assert counters(conn) == incremental
+
+
+def test_counters_roll_back_with_the_report(conn):
+    add_report(conn, 1, "fever")
+    conn.rollback()
+    assert conn.execute("SELECT COUNT(*) FROM symptom_daily").fetchone()[0] == 0
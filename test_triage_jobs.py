@@ -0,0 +1,177 @@
+"""
+Tests for time-budgeted triage and the triage job queue
+(agents/triage_agent.py, agents/orchestrator.py, services/triage_jobs.py)
+Run with: python -m pytest test_triage_jobs.py
+"""
+import sqlite3
+import time
+
+import pytest
+
+import db
+import migrate
+from agents import orchestrator as orchestrator_module
+from agents import triage_agent as triage_module
+from services.agent_log import agent_log_writer
+from services.triage_jobs import DuplicateSubmission, TriageJobQueue, enqueue_triage
+from services.triage_outcome import decode_assessment
+
+CHEST_PAIN = {"age": 60, "chief_complaint": "chest pain", "symptoms": ["chest pain"], "notes": ""}
+
+
+@pytest.fixture
+def triage_db(tmp_path, monkeypatch):
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    conn.execute(
+        "INSERT INTO patients (id, name, phone_number, password_hash, age, gender, village, district, asha_worker_phone) "
+        "VALUES (1, 'P1', 'ph1', 'x', 60, 'M', 'Songir', 'Dhule', '+919100000001')"
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    agent_log_writer.flush()  # write queued entries to this test's database
+    db.configure(path=previous)
+
+
+def submit(triage_data, key=None):
+    conn = db.get_db_connection()
+    try:
+        report_id = enqueue_triage(conn, 1, triage_data, ", ".join(triage_data["symptoms"]), key)
+        conn.commit()
+        return report_id
+    finally:
+        conn.close()
+
+
+def query(sql, params=()):
+    conn = db.get_db_connection()
+    try:
+        return [dict(row) for row in conn.execute(sql, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def report(report_id):
+    return query("SELECT status, risk, primary_diagnosis, assessment, ai_prediction FROM triage_reports WHERE id = ?",
+                 (report_id,))[0]
+
+
+def make_queue(**kwargs):
+    return TriageJobQueue(**{"retry_seconds": 0, **kwargs})
+
+
+def test_slow_steps_do_not_hold_up_red_flags(monkeypatch):
+    def slow_differential(text, top_n=3):
+        time.sleep(1)
+        return [{"disease": "Late", "confidence": 1.0}]
+
+    monkeypatch.setattr(triage_module, "get_differential_diagnosis", slow_differential)
+    monkeypatch.setattr(triage_module, "check_critical_vitals", lambda pid: {"latest_bp": "170/105", "latest_sugar": "N/A", "risk_check": "High"})
+
+    start = time.monotonic()
+    context = triage_module.gather_triage_context(
+        {"patient_id": 1, "chief_complaint": "pain", "symptoms": ["chest pain"], "notes": ""}, budget_seconds=0.2)
+    assert time.monotonic() - start < 0.8
+    assert context["timed_out"] == ["differential"] and context["differential"] == []
+    assert context["red_flags"] == ["chest pain"]
+
+    provisional = triage_module.rule_based_assessment(context)
+    assert (provisional["risk"], provisional["decision"]) == ("High", "Emergency")
+
+
+def test_llm_cannot_lower_risk_below_red_flag_floor():
+    context = {"red_flags": ["seizure"], "vitals": {"risk_check": "Normal"}}
+    assert triage_module.apply_risk_floor({"risk": "Low"}, context)["risk"] == "High"
+    assert triage_module.apply_risk_floor({"risk": "Critical"}, context)["risk"] == "Critical"
+    assert triage_module.apply_risk_floor({"risk": "Low"}, {"red_flags": [], "vitals": {"risk_check": "Normal"}})["risk"] == "Low"
+
+
+def test_job_assesses_then_upgrades_report(triage_db, monkeypatch):
+    report_id = submit(CHEST_PAIN, key="form-1")
+    assert report(report_id)["status"] == "processing"
+
+    def llm(triage_input, context):
+        assert context["red_flags"] == ["chest pain"]
+        return {"risk": "Critical", "decision": "Emergency", "primary_diagnosis": "Heart attack",
+                "reasoning": "LLM", "detected_red_flags": context["red_flags"]}
+
+    monkeypatch.setattr(orchestrator_module, "llm_assessment", llm)
+    queue = make_queue()
+
+    # Stage 1: provisional, rule-based; the red flag raises the alert straight away
+    assert queue.process_one()
+    stored = report(report_id)
+    assert (stored["status"], stored["risk"]) == ("provisional", "High")
+    assert decode_assessment(stored["assessment"])["triage"]["provisional"]
+    assert query("SELECT stage, status FROM triage_jobs") == [{"stage": "upgrade", "status": "queued"}]
+
+    # Stage 2: the LLM assessment replaces it and escalates the alert
+    assert queue.process_one() and not queue.process_one()
+    stored = report(report_id)
+    assert (stored["status"], stored["risk"], stored["primary_diagnosis"]) == ("complete", "Critical", "Heart attack")
+    assert "provisional" not in decode_assessment(stored["assessment"])["triage"]
+    alerts = query("SELECT severity FROM patient_alerts WHERE patient_id = 1 AND alert_type = 'TRIAGE_RISK' ORDER BY id")
+    assert alerts == [{"severity": "MODERATE"}, {"severity": "HIGH"}]
+
+    stats = queue.stats()
+    assert (stats["assessed"], stats["upgraded"], stats["risk_raised"], stats["queue_depth"]) == (1, 1, 1, 0)
+    assert stats["latency"]["assess"]["samples"] == stats["latency"]["upgrade"]["samples"] == 1
+    job = query("SELECT status, wait_ms, assess_ms, upgrade_ms FROM triage_jobs")[0]
+    assert job["status"] == "done" and job["assess_ms"] is not None and job["upgrade_ms"] is not None
+    assert job["wait_ms"] >= 0 and stats["latency"]["wait"]["p50_ms"] == round(job["wait_ms"], 1)
+
+
+def test_resubmitted_form_does_not_create_a_second_report(triage_db):
+    report_id = submit(CHEST_PAIN, key="form-1")
+    with pytest.raises(DuplicateSubmission) as excinfo:
+        submit(CHEST_PAIN, key="form-1")
+    assert excinfo.value.report_id == report_id
+    assert len(query("SELECT id FROM triage_reports")) == 1
+    submit(CHEST_PAIN)  # no key: always a new report
+    assert len(query("SELECT id FROM triage_jobs")) == 2
+
+
+def test_failing_llm_is_retried_then_rule_based_result_stands(triage_db, monkeypatch):
+    report_id = submit({"age": 30, "chief_complaint": "cold", "symptoms": ["cough"], "notes": ""})
+    calls = []
+    monkeypatch.setattr(orchestrator_module, "llm_assessment", lambda triage_input, context: calls.append(1))
+    queue = make_queue(max_attempts=2)
+
+    assert queue.run_pending() == 3          # assess + two upgrade attempts
+    stored = report(report_id)
+    assert (stored["status"], stored["risk"]) == ("complete", "Moderate")
+    assert "provisional" not in decode_assessment(stored["assessment"])["triage"]
+    assert len(calls) == 2
+    stats = queue.stats()
+    assert (stats["retries"], stats["kept_provisional"]) == (1, 1)
+
+
+def test_assess_failures_leave_report_for_manual_review(triage_db, monkeypatch):
+    report_id = submit(CHEST_PAIN)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("model crashed")
+
+    monkeypatch.setattr(orchestrator_module.orchestrator, "execute_triage_workflow", broken)
+    queue = make_queue(max_attempts=2)
+    assert queue.run_pending() == 2
+    stored = report(report_id)
+    assert (stored["status"], stored["ai_prediction"]) == ("failed", "Manual Review Needed")
+    assert queue.stats()["failed_jobs"] == 1
+
+
+def test_expired_lease_is_picked_up_again(triage_db):
+    submit({"age": 30, "chief_complaint": "cold", "symptoms": ["cough"], "notes": ""})
+    crashed = make_queue(lease_seconds=-1)
+    first = crashed._claim()                         # claimed, then the worker "dies"
+    assert first["attempts"] == 1
+
+    job = make_queue()._claim()
+    assert job is not None and job["attempts"] == 2
+    assert job["wait_ms"] == first["wait_ms"]         # the queue wait is that of the first claim
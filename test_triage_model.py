@@ -0,0 +1,87 @@
+"""
+Tests for lazy loading of the differential-diagnosis model (agents/triage_agent.py)
+Run with: python -m pytest test_triage_model.py
+"""
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from agents import triage_agent
+
+
+@pytest.fixture
+def fresh_model(monkeypatch):
+    """Model state as in a new process"""
+    monkeypatch.setattr(triage_agent, "_model", None)
+    monkeypatch.setattr(triage_agent, "_model_status",
+                        {"state": "not_loaded", "engine": "forest", "load_ms": None, "loaded_at": None,
+                         "error": None})
+
+
+@pytest.fixture
+def model_files(tmp_path, monkeypatch):
+    ensemble = pytest.importorskip("sklearn.ensemble")
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    texts = ["fever cough chills", "fever body ache", "chest pain sweating", "chest pain breathless",
+             "itchy rash skin", "skin rash redness"]
+    labels = ["Flu", "Flu", "Heart attack", "Heart attack", "Dermatitis", "Dermatitis"]
+    vectorizer = TfidfVectorizer()
+    model = ensemble.RandomForestClassifier(n_estimators=5, random_state=0).fit(vectorizer.fit_transform(texts), labels)
+    paths = {name: str(tmp_path / name) for name in ("model.pkl", "vectorizer.pkl")}
+    with open(paths["model.pkl"], "wb") as f:
+        pickle.dump(model, f)
+    with open(paths["vectorizer.pkl"], "wb") as f:
+        pickle.dump(vectorizer, f)
+
+    monkeypatch.setattr(triage_agent, "DISEASE_MODEL_PATH", paths["model.pkl"])
+    monkeypatch.setattr(triage_agent, "VECTORIZER_PATH", paths["vectorizer.pkl"])
+
+
+def test_import_does_not_load_the_model():
+    code = ("import agents.orchestrator; from agents import triage_agent; "
+            "print(triage_agent.model_status()['state'])")
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == "not_loaded"
+
+
+def test_concurrent_first_calls_load_once(fresh_model, model_files, monkeypatch):
+    loads = []
+    real_load = triage_agent._load_model
+
+    def counted_load():
+        loads.append(1)
+        time.sleep(0.2)          # keep the other callers waiting on the lock
+        real_load()
+
+    monkeypatch.setattr(triage_agent, "_load_model", counted_load)
+    assert not triage_agent.model_ready()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(triage_agent.get_differential_diagnosis("chest pain sweating")))
+               for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(loads) == 1
+    assert all(r and r[0]["disease"] == "Heart attack" for r in results)
+    status = triage_agent.model_status()
+    assert status["ready"] and status["state"] == "ready" and status["load_ms"] is not None
+
+
+def test_missing_files_mark_model_unavailable_once(fresh_model, monkeypatch, tmp_path):
+    monkeypatch.setattr(triage_agent, "DISEASE_MODEL_PATH", str(tmp_path / "missing.pkl"))
+    status = triage_agent.warm_up()
+    assert (status["state"], status["ready"]) == ("unavailable", False)
+    assert "missing.pkl" in status["error"]
+
+    monkeypatch.setattr(triage_agent, "_load_model", lambda: pytest.fail("load retried"))
+    assert triage_agent.get_differential_diagnosis("fever") == []
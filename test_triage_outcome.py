@@ -0,0 +1,148 @@
+"""
+Tests for the typed triage outcome columns and JSON assessments
+(services/triage_outcome.py, migrations 008 and 009)
+Run with: python -m pytest test_triage_outcome.py
+"""
+import sqlite3
+
+import pytest
+
+import migrate
+from services.triage_outcome import (
+    assessment_from_legacy_html, decode_assessment, encode_assessment,
+    outcome_columns, parse_legacy_prediction,
+)
+
+CARD_HTML = """
+<div class="triage-report-content">
+    <div class="mb-2">
+        <h6 class="fw-bold text-muted text-uppercase small">Diagnosis</h6>
+        <p class="fw-bold mb-0 text-primary">Hypertensive Crisis</p>
+    </div>
+    <div class="mb-2">
+         <h6 class="fw-bold text-muted text-uppercase small">Decision</h6>
+         <p class="mb-0">Emergency</p>
+    </div>
+    <div class="mb-2">
+        <h6 class="fw-bold text-muted text-uppercase small">Risk Level</h6>
+        <span class="badge bg-danger">Critical</span>
+    </div>
+    <div class="mb-2">
+        <h6 class="fw-bold text-muted text-uppercase small">Red Flags</h6>
+        <p class="mb-0 text-danger fw-bold">chest pain, blurred vision</p>
+    </div>
+    <div class="mt-3">
+        <h6 class="fw-bold text-muted text-uppercase small">Reasoning</h6>
+        <p class="text-muted small">Low risk of stroke if treated. Highly likely hypertension &amp; anxiety.</p>
+    </div>
+    <div class="mt-3">
+        <h6 class="fw-bold text-muted text-uppercase small">ASHA Task List</h6>
+        <div class="small"><ul><li>Call 108</li><li>Stay with patient</li></ul></div>
+    </div>
+</div>
+"""
+
+
+def test_parse_rich_card():
+    fields = parse_legacy_prediction(CARD_HTML)
+    assert fields == {
+        "risk": "Critical",
+        "decision": "Emergency",
+        "primary_diagnosis": "Hypertensive Crisis",
+        "red_flag_count": 2,
+    }
+
+
+def test_parse_seed_format_and_manual_reports():
+    fields = parse_legacy_prediction("<b>Risk:</b> Moderate<br><b>Decision:</b> ASHA Follow-up<br><b>Diagnosis:</b> Fever")
+    assert fields["risk"] == "Moderate"
+    assert fields["decision"] == "ASHA Follow-up"
+    assert fields["primary_diagnosis"] == "Fever"
+
+    # 'High' in free text must not be mistaken for a risk level
+    assert parse_legacy_prediction("Manual Review Needed - High fever")["risk"] is None
+
+
+def test_outcome_columns_from_orchestrator_result():
+    columns = outcome_columns(
+        {"risk": "high", "action": "Doctor Consultation"},
+        {"primary_diagnosis": "Pneumonia", "detected_red_flags": ["breathlessness"]},
+    )
+    assert columns == {"risk": "High", "decision": "Doctor Consultation",
+                       "primary_diagnosis": "Pneumonia", "red_flag_count": 1}
+
+
+def test_assessment_round_trip_and_compression():
+    triage = {"risk": "High", "primary_diagnosis": "Pneumonia", "reasoning": "x" * 40}
+    decision = {"risk": "High", "action": "Doctor Consultation"}
+    small = encode_assessment(triage, decision)
+    assert isinstance(small, str) and ", " not in small and '": ' not in small
+    assert decode_assessment(small) == {"triage": triage, "decision": decision}
+
+    triage["reasoning"] = "Persistent fever with productive cough. " * 40
+    large = encode_assessment(triage, decision)
+    assert isinstance(large, bytes) and len(large) < len(triage["reasoning"])
+    assert decode_assessment(large)["triage"] == triage
+
+    assert decode_assessment(None) is None
+    assert decode_assessment("Manual Review Needed") is None
+
+
+def test_assessment_from_legacy_html():
+    assessment = assessment_from_legacy_html(CARD_HTML)
+    assert assessment["decision"] == {"risk": "Critical", "action": "Emergency"}
+    assert assessment["triage"]["detected_red_flags"] == ["chest pain", "blurred vision"]
+    assert assessment["triage"]["reasoning"].endswith("hypertension & anxiety.")
+    assert assessment["triage"]["asha_instructions"] == ["Call 108", "Stay with patient"]
+    assert assessment_from_legacy_html("Manual Review Needed") is None
+
+
+def test_triage_card_macro_renders_assessment():
+    jinja2 = pytest.importorskip("jinja2")
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader("english/templates"), autoescape=True)
+    env.filters["triage_assessment"] = decode_assessment
+    card = env.get_template("triage_report_card.html").module.triage_card
+
+    report = {"assessment": encode_assessment({"primary_diagnosis": "<b>Flu</b>", "home_remedies": ["Rest"]},
+                                              {"risk": "Low", "action": "Home Care"}),
+              "ai_prediction": None, "risk": "Low"}
+    html = str(card(report))
+    assert "&lt;b&gt;Flu&lt;/b&gt;" in html  # agent text is escaped, not injected
+    assert "Home Remedies" in html and "bg-success" in html
+
+    legacy = {"assessment": None, "ai_prediction": "<em>Manual Review Needed</em>", "risk": None}
+    assert "<em>Manual Review Needed</em>" in str(card(legacy))
+
+
+def test_backfill_migration(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "backfill.db"))
+    # Schema as built by the old setup_database.py
+    conn.execute("""CREATE TABLE patients (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+        phone_number TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, village TEXT,
+        district TEXT DEFAULT 'Dhule', asha_worker_phone TEXT)""")
+    conn.execute("""CREATE TABLE triage_reports (id INTEGER PRIMARY KEY AUTOINCREMENT, patient_id INTEGER,
+        chief_complaint TEXT NOT NULL, symptoms TEXT, notes TEXT, ai_prediction TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)""")
+    conn.executemany(
+        "INSERT INTO triage_reports (patient_id, chief_complaint, ai_prediction) VALUES (?, ?, ?)",
+        [(1, "chest pain", CARD_HTML), (2, "fever", "Manual Review Needed")]
+    )
+    conn.commit()
+
+    migrate.run_migrations(conn, verbose=False)
+
+    rows = conn.execute(
+        "SELECT patient_id, risk, decision, red_flag_count, doctor_reviewed FROM triage_reports ORDER BY id"
+    ).fetchall()
+    assert rows == [(1, "Critical", "Emergency", 2, 0), (2, None, None, 0, 0)]
+
+    plan = migrate.explain(conn, "SELECT COUNT(*) FROM triage_reports WHERE risk IN ('High', 'Critical') "
+                                 "AND timestamp >= datetime('now', '-7 days')")
+    assert any("idx_triage_reports_risk_ts" in step for step in plan)
+
+    # 009 moved the card into the JSON column and kept the unparseable free text
+    converted, manual = conn.execute("SELECT assessment, ai_prediction FROM triage_reports ORDER BY id").fetchall()
+    assert converted[1] is None
+    assert decode_assessment(converted[0])["triage"]["primary_diagnosis"] == "Hypertensive Crisis"
+    assert manual == (None, "Manual Review Needed")
+    conn.close()
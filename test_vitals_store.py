@@ -0,0 +1,148 @@
+"""
+Tests for the memory-mapped vitals store (services/vitals_store.py)
+Run with: python -m pytest test_vitals_store.py
+"""
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import db
+import migrate
+from agents import vital_trend_analyzer
+from services.agent_log import agent_log_writer
+from services.vitals_store import VitalsStore
+
+
+def make_db(path):
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    rng = random.Random(7)
+    now = datetime.now()
+    rows = []
+    for patient_id in range(1, 41):
+        for hours_ago in range(0, 24 * 20, 13):
+            ts = (now - timedelta(hours=hours_ago)).strftime("%Y-%m-%d %H:%M:%S")
+            drift = (20 * 24 - hours_ago) // 24 * (patient_id % 4)  # some patients trend upwards
+            rows.append((patient_id, "BP", 120 + drift + rng.randint(-3, 3), 80 + rng.randint(-3, 3), ts))
+            rows.append((patient_id, "SUGAR", 110 + 2 * drift + rng.randint(-5, 5), None, ts))
+    rng.shuffle(rows)  # ids out of time order, like readings synced late from devices
+    conn.executemany(
+        "INSERT INTO readings (patient_id, reading_type, value1, value2, timestamp) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def readings_db(tmp_path):
+    path = str(tmp_path / "health.db")
+    make_db(path)
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    agent_log_writer.flush()  # write queued entries to this test's database
+    db.configure(path=previous)
+
+
+def sql_history(patient_id, vital_type, days=7):
+    return vital_trend_analyzer.get_vital_history(patient_id, vital_type, days=days)
+
+
+def test_history_matches_sql_and_follows_inserts(readings_db, tmp_path):
+    store = VitalsStore(str(tmp_path / "store"), enabled=True)
+    store.rebuild()
+    since = datetime.now() - timedelta(days=7)
+    for patient_id in (1, 2, 17, 40):
+        for vital_type in ("BP", "SUGAR"):
+            assert store.history(patient_id, vital_type, since=since) == sql_history(patient_id, vital_type)
+
+    # New readings show up without a rebuild (served from the unindexed tail)
+    conn = db.get_db_connection()
+    conn.execute("INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (2, 'BP', 190, 110)")
+    conn.commit()
+    conn.close()
+    latest = store.history(2, "BP", limit=1)
+    assert latest[0]["value1"] == 190 and latest[0]["value2"] == 110
+    assert store.status()["rows"] == store.status()["indexed_rows"] + 1
+
+    # Reopening maps the existing files instead of reloading from SQLite
+    reopened = VitalsStore(str(tmp_path / "store"), enabled=True)
+    assert reopened.history(2, "BP", since=since) == store.history(2, "BP", since=since)
+    assert reopened.status()["rows_appended"] == 0
+
+
+def test_corrected_and_deleted_readings_trigger_a_rebuild(readings_db, tmp_path):
+    store = VitalsStore(str(tmp_path / "store"), enabled=True)
+    store.rebuild()
+    latest = store.history(3, "BP", limit=1)[0]
+
+    conn = db.get_db_connection()
+    reading_id = conn.execute(
+        "SELECT id FROM readings WHERE patient_id = 3 AND reading_type = 'BP' ORDER BY timestamp DESC LIMIT 1"
+    ).fetchone()[0]
+    conn.execute("UPDATE readings SET value1 = 200 WHERE id = ?", (reading_id,))
+    conn.commit()
+    assert store.history(3, "BP", limit=1)[0] == {**latest, "value1": 200}
+    assert store.status()["rebuilds"] == 1
+
+    conn.execute("DELETE FROM readings WHERE id = ?", (reading_id,))
+    conn.commit()
+    conn.close()
+    assert store.history(3, "BP") == sql_history(3, "BP", days=30)
+    assert store.status()["rebuilds"] == 2
+
+
+def test_stores_sharing_a_directory_see_each_others_appends(readings_db, tmp_path):
+    first = VitalsStore(str(tmp_path / "store"), enabled=True)
+    second = VitalsStore(str(tmp_path / "store"), enabled=True)
+    first.rebuild()
+    rows = first.status()["rows"]
+
+    conn = db.get_db_connection()
+    conn.execute("INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (5, 'BP', 185, 105)")
+    conn.commit()
+    assert second.sync() == 1
+
+    # The first store picks up the append from meta.json instead of writing it again
+    conn.execute("INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (5, 'BP', 150, 95)")
+    conn.commit()
+    conn.close()
+    assert first.sync() == 1
+    assert second.sync() == 0
+    assert first.status()["rows"] == second.status()["rows"] == rows + 2
+    assert [r["value1"] for r in first.history(5, "BP", limit=2)] == [185, 150]
+    assert second.history(5, "BP", limit=2) == first.history(5, "BP", limit=2)
+
+
+def test_vectorized_population_scan_matches_per_patient_path(tmp_path, monkeypatch):
+    results = {}
+    for mode in ("sql", "store"):
+        path = str(tmp_path / f"{mode}.db")
+        make_db(path)
+        previous = db.pool_stats()["path"]
+        db.configure(path=path)
+        try:
+            store = VitalsStore(str(tmp_path / f"{mode}_store"), enabled=(mode == "store"))
+            monkeypatch.setattr(vital_trend_analyzer, "vitals_store", store)
+            summary = vital_trend_analyzer.analyze_all_patients()
+            conn = db.get_db_connection()
+            alerts = conn.execute(
+                "SELECT patient_id, vital_name, severity, message FROM patient_alerts ORDER BY patient_id, vital_name"
+            ).fetchall()
+            conn.close()
+            results[mode] = (summary, [tuple(a) for a in alerts])
+        finally:
+            agent_log_writer.flush()  # write queued entries to this test's database
+            db.configure(path=previous)
+
+    sql_summary, sql_alerts = results["sql"]
+    store_summary, store_alerts = results["store"]
+    assert sql_summary["total_alerts_created"] > 0
+    assert store_summary["total_patients_analyzed"] == sql_summary["total_patients_analyzed"]
+    assert sorted(store_summary["patients_with_alerts"]) == sorted(sql_summary["patients_with_alerts"])
+    assert store_summary["high_severity_alerts"] == sql_summary["high_severity_alerts"]
+    assert store_alerts == sql_alerts
@@ -0,0 +1,169 @@
+"""
+Tests for the set-based ASHA monitoring dashboard loader (services/worker_dashboard.py)
+Run with: python -m pytest test_worker_dashboard.py
+"""
+import sqlite3
+
+import pytest
+
+import migrate
+from services.triage_outcome import encode_assessment
+from services.worker_dashboard import KEYSET_SQL, SUMMARY_SQL, load_patient_detail, load_worklist_page
+
+WORKER = "+919000000001"
+
+
+def make_db(path, patients):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    migrate.run_migrations(conn, verbose=False)
+    conn.execute("DELETE FROM patient_alerts")  # demo alert from migration 002
+    for pid in range(1, patients + 1):
+        conn.execute(
+            "INSERT INTO patients (id, name, phone_number, password_hash, asha_worker_phone) VALUES (?, ?, ?, 'x', ?)",
+            (pid, f"P{pid}", f"ph{pid}", WORKER)
+        )
+        for day in range(1, 11):
+            ts = f"2025-05-{day:02d} 09:00:00"
+            conn.execute("INSERT INTO readings (patient_id, reading_type, value1, value2, timestamp) "
+                         "VALUES (?, 'BP', ?, 80, ?)", (pid, 120 + day, ts))
+            conn.execute("INSERT INTO readings (patient_id, reading_type, value1, timestamp) "
+                         "VALUES (?, 'SUGAR', 100, ?)", (pid, ts))
+        for day in range(1, 5):
+            conn.execute("INSERT INTO triage_reports (patient_id, chief_complaint, risk, assessment, timestamp) "
+                         "VALUES (?, 'fever', 'Low', ?, ?)",
+                         (pid, encode_assessment({"reasoning": "x" * 2000}, {"risk": "Low"}), f"2025-05-0{day} 10:00:00"))
+        conn.execute("INSERT INTO care_workflows (patient_id, current_state, status, created_at) "
+                     "VALUES (?, 'old', 'active', '2025-05-01 00:00:00')", (pid,))
+        conn.execute("INSERT INTO care_workflows (patient_id, current_state, status, created_at) "
+                     "VALUES (?, 'new', 'active', '2025-05-02 00:00:00')", (pid,))
+    conn.execute("INSERT INTO patient_alerts (patient_id, alert_type, severity, message) VALUES (2, 'X', 'HIGH', 'bp')")
+    conn.commit()
+    return conn
+
+
+def count_queries(conn, patient_id):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        card = load_patient_detail(conn, WORKER, patient_id)
+    finally:
+        conn.set_trace_callback(None)
+    return card, len(statements)
+
+
+def test_detail_query_count_does_not_grow_with_caseload(tmp_path):
+    small, small_queries = count_queries(make_db(str(tmp_path / "small.db"), 3), 2)
+    large, large_queries = count_queries(make_db(str(tmp_path / "large.db"), 60), 2)
+    assert small["info"]["id"] == large["info"]["id"] == 2
+    assert small_queries == large_queries <= 8
+
+
+def test_cards_match_per_patient_expectations(tmp_path):
+    conn = make_db(str(tmp_path / "health.db"), 3)
+    conn.execute("UPDATE asha_worklists SET urgency_score = 50, priority_level = 'MODERATE' "
+                 "WHERE worker_phone = ? AND patient_id = 3", (WORKER,))
+    cards = {pid: load_patient_detail(conn, WORKER, pid) for pid in (1, 2, 3)}
+
+    # Priority: persisted worklist first, open HIGH alert as fallback
+    assert cards[2]["info"]["priority"] == "HIGH" and cards[2]["info"]["urgency_score"] == 90
+    assert cards[3]["info"]["priority"] == "MODERATE" and cards[3]["info"]["urgency_score"] == 50
+    assert cards[1]["info"]["priority"] == "LOW"
+    assert [a["message"] for a in cards[2]["alerts"]] == ["bp"] and cards[1]["alerts"] == []
+
+    card = cards[1]
+    assert card["info"]["workflow"]["current_state"] == "new"
+    assert len(card["readings"]) == 5
+    assert card["readings"][0]["formatted_time"] == "2025-05-10 09:00 AM"
+    assert [r["timestamp"][:10] for r in card["reports"]] == ["2025-05-04", "2025-05-03", "2025-05-02"]
+    assert card["reports"][0]["assessment"]["triage"]["reasoning"] == "x" * 2000  # zlib-compressed in the table
+    assert card["info"]["latest_triage_date"] == "2025-05-04 10:00:00"
+
+    # Chart shows the latest 7 BP readings, oldest first
+    assert card["chart_data"]["systolic"] == [124, 125, 126, 127, 128, 129, 130]
+    assert card["chart_data"]["labels"][0] == "04-May"
+
+
+def walk_pages(conn, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = load_worklist_page(conn, WORKER, limit=limit, cursor=cursor)
+        ids += [p["id"] for p in page["patients"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids, pages
+
+
+def test_pages_follow_card_order_without_gaps(tmp_path):
+    conn = make_db(str(tmp_path / "health.db"), 12)
+    conn.execute("UPDATE asha_worklists SET urgency_score = 50, priority_level = 'HIGH' "
+                 "WHERE worker_phone = ? AND patient_id = 7", (WORKER,))
+    conn.commit()
+    cards = [load_patient_detail(conn, WORKER, pid)["info"] for pid in range(1, 13)]
+    cards.sort(key=lambda c: (c["urgency_score"], c["latest_triage_date"], c["id"]), reverse=True)
+
+    ids, pages = walk_pages(conn, limit=5)
+    assert ids == [card["id"] for card in cards]
+    assert ids[:2] == [2, 7]  # open HIGH alert (90), then worklist score 50
+    assert pages == 3
+
+    first = load_worklist_page(conn, WORKER, limit=5)["patients"][0]
+    assert first["priority"] == "HIGH" and [a["message"] for a in first["alerts"]] == ["bp"]
+
+
+def test_page_query_count_does_not_grow_with_caseload(tmp_path):
+    small = make_db(str(tmp_path / "small.db"), 3)
+    large = make_db(str(tmp_path / "large.db"), 60)
+    counts = []
+    for conn in (small, large):
+        statements = []
+        conn.set_trace_callback(statements.append)
+        page = load_worklist_page(conn, WORKER, limit=3)
+        conn.set_trace_callback(None)
+        assert len(page["patients"]) == 3
+        counts.append(len(statements))
+    assert counts[0] == counts[1] <= 2
+
+
+def test_pages_seek_the_worklist_index(tmp_path):
+    conn = make_db(str(tmp_path / "health.db"), 1)
+    for keyset, params in (("", [WORKER, 6]), (KEYSET_SQL, [WORKER, 0, "", 1, 6])):
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + SUMMARY_SQL.format(keyset=keyset), params)]
+        assert plan[0].startswith("SEARCH w USING INDEX idx_asha_worklists_page (worker_phone=?")
+        assert not any("TEMP B-TREE" in step for step in plan)  # no sort of the caseload
+    assert "(page_score,latest_triage_date,patient_id)<(?,?,?)" in plan[0]
+
+
+def test_page_keys_follow_alerts_reports_and_reassignment(tmp_path):
+    conn = make_db(str(tmp_path / "health.db"), 3)
+
+    def first_ids():
+        return [p["id"] for p in load_worklist_page(conn, WORKER, limit=3)["patients"]]
+
+    assert first_ids() == [2, 3, 1]          # open HIGH alert, then latest triage (same date), id
+    conn.execute("UPDATE patient_alerts SET is_acknowledged = 1 WHERE patient_id = 2")
+    conn.execute("INSERT INTO triage_reports (patient_id, chief_complaint, risk, timestamp) "
+                 "VALUES (1, 'cough', 'Low', '2025-06-01 08:00:00')")
+    assert first_ids() == [1, 3, 2]
+
+    conn.execute("DELETE FROM triage_reports WHERE patient_id = 1 AND timestamp = '2025-06-01 08:00:00'")
+    conn.execute("UPDATE patients SET asha_worker_phone = '+919000000999' WHERE id = 3")
+    assert first_ids() == [2, 1]
+    moved = conn.execute("SELECT worker_phone FROM asha_worklists WHERE patient_id = 3").fetchall()
+    assert [row["worker_phone"] for row in moved] == ["+919000000999"]
+
+
+def test_invalid_cursor_is_rejected(tmp_path):
+    conn = make_db(str(tmp_path / "health.db"), 1)
+    with pytest.raises(ValueError):
+        load_worklist_page(conn, WORKER, cursor="not-a-cursor")
+
+
+def test_patient_detail_stays_in_caseload(tmp_path):
+    conn = make_db(str(tmp_path / "health.db"), 3)
+    conn.execute("INSERT INTO patients (id, name, phone_number, password_hash, asha_worker_phone) "
+                 "VALUES (99, 'Other', 'ph99', 'x', '+919000000999')")
+
+    assert load_patient_detail(conn, WORKER, 2)["info"]["id"] == 2
+    assert load_patient_detail(conn, WORKER, 99) is None
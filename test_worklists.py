@@ -0,0 +1,90 @@
+"""
+Tests for persisted ASHA worklists (services/worklists.py)
+Run with: python -m pytest test_worklists.py
+"""
+import sqlite3
+
+import pytest
+
+import db
+import migrate
+from services.agent_log import agent_log_writer
+from services.worklists import get_worklist, refresh_worklist
+
+ASHA_A = "+919100000001"
+ASHA_B = "+919100000002"
+
+
+@pytest.fixture
+def worklist_db(tmp_path):
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    migrate.run_migrations(conn, verbose=False)
+    conn.execute("DELETE FROM patient_alerts")  # demo alert from migration 002
+    for pid, asha in [(1, ASHA_A), (2, ASHA_A), (3, ASHA_A), (4, ASHA_B)]:
+        conn.execute(
+            "INSERT INTO patients (id, name, phone_number, password_hash, age, gender, village, asha_worker_phone) "
+            "VALUES (?, ?, ?, 'x', 50, 'F', 'Songir', ?)", (pid, f"P{pid}", f"ph{pid}", asha)
+        )
+    conn.execute("INSERT INTO patient_alerts (patient_id, alert_type, severity, message) VALUES (1, 'X', 'HIGH', 'bp rising')")
+    conn.execute("INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (2, 'BP', 170, 100)")
+    conn.execute("INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (3, 'BP', 120, 80)")
+    conn.commit()
+    conn.close()
+
+    previous = db.pool_stats()["path"]
+    db.configure(path=path)
+    yield path
+    agent_log_writer.flush()  # write queued entries to this test's database
+    db.configure(path=previous)
+
+
+def execute(sql, params=()):
+    conn = db.get_db_connection()
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def scores(worker):
+    return {item["patient"]["id"]: item["urgency_score"] for item in get_worklist(worker)}
+
+
+def test_first_read_builds_then_reads_are_served_from_table(worklist_db):
+    assert refresh_worklist(ASHA_A)["mode"] == "full"
+    assert scores(ASHA_A) == {1: 50, 2: 15}
+    assert refresh_worklist(ASHA_A) == {"mode": "fresh", "patients_rescored": 0}
+
+
+def test_only_changed_patients_are_rescored(worklist_db):
+    get_worklist(ASHA_A)
+
+    execute("INSERT INTO readings (patient_id, reading_type, value1, value2) VALUES (3, 'SUGAR', 300, NULL)")
+    assert refresh_worklist(ASHA_A) == {"mode": "incremental", "patients_rescored": 1}
+    assert scores(ASHA_A) == {1: 50, 2: 15, 3: 15}
+
+    # Acknowledged alert: the patient no longer needs attention
+    execute("UPDATE patient_alerts SET is_acknowledged = 1 WHERE patient_id = 1")
+    assert scores(ASHA_A) == {2: 15, 3: 15}
+
+    # Overdue follow-up raises the score
+    execute("INSERT INTO follow_up_schedule (patient_id, scheduled_date, visit_type, priority) "
+            "VALUES (2, DATE('now', '-2 days'), 'BP check', 'HIGH')")
+    assert scores(ASHA_A)[2] == 15 + 30
+
+
+def test_reassigned_patient_moves_between_worklists(worklist_db):
+    get_worklist(ASHA_A)
+    get_worklist(ASHA_B)
+
+    execute("UPDATE patients SET asha_worker_phone = ? WHERE id = 2", (ASHA_B,))
+    assert 2 in scores(ASHA_B)
+    assert 2 not in scores(ASHA_A)
+
+
+def test_stale_build_is_rebuilt(worklist_db):
+    get_worklist(ASHA_A)
+    execute("UPDATE asha_worklist_builds SET built_on = DATE('now', '-1 day')")
+    assert refresh_worklist(ASHA_A)["mode"] == "full"